@@ -1 +1,3 @@
-from .sift import Sift
\ No newline at end of file
+from .sift import Sift
+from .orb import Orb
+from .fast_brief import FastBrief
\ No newline at end of file
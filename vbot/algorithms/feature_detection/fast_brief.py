@@ -0,0 +1,29 @@
+import cv2 as cv
+
+from .feature_detector import FeatureDetector
+
+# BRIEF lives in opencv-contrib (xfeatures2d), it is optional
+BRIEF_AVAILABLE = hasattr(cv, 'xfeatures2d') and hasattr(cv.xfeatures2d, 'BriefDescriptorExtractor_create')
+
+BRIEF_MARGIN = 28   # BRIEF skips 24 + 4 pixels (half kernel and smoothing) at borders
+
+class FastBrief(FeatureDetector):
+    """FAST keypoints and BRIEF binary descriptors (Hamming matching). Cheapest backend, not rotation invariant
+    and less discriminative than SIFT (same matching caveats as Orb), so not a drop-in replacement.
+    Without opencv-contrib, descriptors come from the ORB extractor (rotated BRIEF) instead.
+    """
+    def __init__(self, fast_threshold=10, num_bytes=32, patch_size=15):
+        """
+        Args:
+            fast_threshold (int, optional): FAST intensity threshold. Defaults to 10.
+            num_bytes (int, optional): BRIEF descriptor length (16, 32 or 64 bytes). Defaults to 32.
+            patch_size (int, optional): ORB extractor patch size, used without opencv-contrib. Defaults to 15.
+        """
+        detector = cv.FastFeatureDetector_create(threshold=fast_threshold, nonmaxSuppression=True)
+        if BRIEF_AVAILABLE:
+            extractor = cv.xfeatures2d.BriefDescriptorExtractor_create(num_bytes)
+            margin = BRIEF_MARGIN
+        else:
+            extractor = cv.ORB_create(edgeThreshold=patch_size, patchSize=patch_size)
+            margin = patch_size
+        super().__init__(detector, extractor, margin=margin)
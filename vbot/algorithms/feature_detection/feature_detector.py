@@ -0,0 +1,144 @@
+import cv2 as cv
+
+class FeatureDetector:
+    """Base of feature detectors. Keypoints and descriptors can be restricted to a bounding box, the image is
+    then cropped to the (clamped) bounding box, widened by margin pixels so detectors and extractors that
+    skip image borders still see the whole box. Subclasses set detector, extractor and margin.
+    """
+    def __init__(self, detector, extractor=None, margin=0):
+        """
+        Args:
+            detector (cv.Feature2D): Keypoint detector
+            extractor (cv.Feature2D, optional): Descriptor extractor. Defaults to None (use detector).
+            margin (int, optional): Border skipped by detector/extractor (pixels). Defaults to 0.
+        """
+        self.detector = detector
+        self.extractor = detector if extractor is None else extractor
+        self.margin = margin
+
+    @staticmethod
+    def draw_keypoints(img, keypoints):
+        """Takes as input an image and keypoints and outputs the image with keypoints drawn over it
+
+        Args:
+            img (np.ndarray): Image over which keypoints are to be drawn
+            keypoints (np.ndarray): Keypoints of the given image
+
+        Returns:
+            np.ndarray: Image with keypoints drawn over it
+        """
+        return cv.drawKeypoints(img, keypoints, None)
+
+    @staticmethod
+    def draw_rich_keypoints(img, keypoints):
+        """Takes as input an image and keypoints and outputs the image with rich representation of keypoints drawn over it
+
+        Args:
+            img (np.ndarray): Image over which keypoints will be richly drawn
+            keypoints (np.ndarray): Keypoints of the given image
+
+        Returns:
+            np.ndarray: Image with richly drawn keypoints
+        """
+        return cv.drawKeypoints(img,
+                                keypoints,
+                                None,
+                                flags=cv.DRAW_MATCHES_FLAGS_DRAW_RICH_KEYPOINTS)
+
+    @staticmethod
+    def get_clamped_bb(img, bb):
+        """Returns bounding box clipped to image bounds, so image crops are never shifted by negative indices
+
+        Args:
+            img (np.ndarray): Image
+            bb (tuple): Bounding box (x, y, w, h)
+
+        Returns:
+            tuple: Clipped bounding box (x, y, w, h)
+        """
+        x, y, w, h = bb
+        x_1, y_1 = max(int(x), 0), max(int(y), 0)
+        x_2, y_2 = min(int(x + w), img.shape[1]), min(int(y + h), img.shape[0])
+        return x_1, y_1, max(x_2 - x_1, 0), max(y_2 - y_1, 0)
+
+    def get_crop_bb(self, img, bb):
+        """Returns bounding box widened by margin, clipped to image bounds"""
+        x, y, w, h = bb
+        return self.get_clamped_bb(img, (x - self.margin, y - self.margin, w + 2*self.margin, h + 2*self.margin))
+
+    def get_keypoints(self, img, mask=None, bb=None):
+        """Computes keypoints in image. Takes in the image and optional mask or bounding box.
+        Returns computed keypoints
+
+        Args:
+            img (np.ndarray): Image in which keypoints are to be computed
+            mask (np.ndarray, optional): Mask specifies where to look for keypoints in the image. Defaults to None.
+            bb (tuple, optional): Bounding box (x, y, w, h), detects only in this crop of the image, mask is ignored. Defaults to None.
+
+        Returns:
+            np.ndarray: Computed keypoints
+        """
+        if bb is None:
+            return self.detector.detect(img, mask)
+
+        x, y, w, h = self.get_clamped_bb(img, bb)
+        if w == 0 or h == 0:
+            return ()
+        c_x, c_y, c_w, c_h = self.get_crop_bb(img, (x, y, w, h)) if self.margin else (x, y, w, h)
+        keypoints = self.detector.detect(img[c_y:c_y+c_h, c_x:c_x+c_w])
+        for kp in keypoints:
+            kp.pt = (kp.pt[0] + c_x, kp.pt[1] + c_y)
+
+        if self.margin:
+            keypoints = [kp for kp in keypoints if x <= kp.pt[0] < x + w and y <= kp.pt[1] < y + h]
+        return keypoints
+
+    def get_descriptors_at_keypoints(self, img, keypoints, bb=None):
+        """Computes descriptors at given keypoints, using only bounding box region of image if given.
+        Keypoints an extractor cannot describe (too close to image border) are dropped.
+
+        Args:
+            img (np.ndarray): Image
+            keypoints (list): Keypoints (cv.KeyPoint) in image coordinates
+            bb (tuple, optional): Bounding box (x, y, w, h). Defaults to None.
+
+        Returns:
+            tuple: Keypoints kept, descriptors (one per row)
+        """
+        if bb is None:
+            return self.extractor.compute(img, keypoints)
+
+        x, y, w, h = self.get_crop_bb(img, bb) if self.margin else self.get_clamped_bb(img, bb)
+        img_patch = img[y:y+h, x:x+w]
+        for kp in keypoints:
+            kp.pt = (kp.pt[0] - x, kp.pt[1] - y)
+        keypoints, descriptors = self.extractor.compute(img_patch, keypoints)
+        for kp in keypoints:
+            kp.pt = (kp.pt[0] + x, kp.pt[1] + y)
+
+        return keypoints, descriptors
+
+    def get_descriptors(self, img, mask=None):
+        _, descriptors = self.get_keypoints_and_descriptors(img, mask)
+
+        return descriptors
+
+    def get_keypoints_and_descriptors(self, img, mask=None):
+        if self.extractor is self.detector:
+            return self.detector.detectAndCompute(img, mask)
+
+        return self.extractor.compute(img, self.detector.detect(img, mask))
+
+    def detect_and_show(self, img, mask=None):
+        """Takes in an image, detects features and displays original image and image with rich keypoints drawn over it.
+
+        Args:
+            img (np.ndarray): Image in which features are to be detected
+            mask (np.ndarray, optional): Specify using a mask where to look in the image for features. Defaults to None.
+        """
+        kp = self.detector.detect(img, mask)
+        img_FD = self.draw_rich_keypoints(img, kp)
+        cv.imshow('Original', img)
+        cv.imshow(f'{type(self).__name__} Features Detected', img_FD)
+        cv.waitKey(0)
+        cv.destroyAllWindows()
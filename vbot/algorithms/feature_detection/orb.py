@@ -0,0 +1,24 @@
+import cv2 as cv
+
+from .feature_detector import FeatureDetector
+
+class Orb(FeatureDetector):
+    """ORB keypoints (oriented FAST) and 256 bit rotated BRIEF descriptors (Hamming matching).
+    Much cheaper than SIFT, but less discriminative, matches need a tight Hamming threshold and a ratio test
+    to keep background patches out, so not a drop-in replacement. Patch size defaults to the 15 pixel keypoint
+    size used by the tracker, targets seen from the drone are small.
+    """
+    def __init__(self, num_features=500, patch_size=15, num_levels=3, fast_threshold=10):
+        """
+        Args:
+            num_features (int, optional): Maximum number of keypoints. Defaults to 500.
+            patch_size (int, optional): Descriptor patch size, also border skipped (pixels). Defaults to 15.
+            num_levels (int, optional): Pyramid levels. Defaults to 3.
+            fast_threshold (int, optional): FAST intensity threshold. Defaults to 10.
+        """
+        super().__init__(cv.ORB_create(nfeatures=num_features,
+                                       nlevels=num_levels,
+                                       edgeThreshold=patch_size,
+                                       patchSize=patch_size,
+                                       fastThreshold=fast_threshold),
+                         margin=patch_size)
@@ -1 +1,3 @@
-from .brute_l2 import BruteL2
\ No newline at end of file
+from .brute_l2 import BruteL2, BruteL2Index
+from .brute_hamming import BruteHamming, BruteHammingIndex
+from .flann import FlannIndex
\ No newline at end of file
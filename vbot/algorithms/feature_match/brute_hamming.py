@@ -0,0 +1,70 @@
+import cv2 as cv
+import numpy as np
+
+from .brute_l2 import best_matches
+
+# number of set bits of every byte value
+POPCOUNT_TABLE = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+class BruteHamming:
+    """Brute force Hamming matching of binary descriptors (ORB, BRIEF), same interface as BruteL2
+    """
+    def __init__(self):
+        self.matcher = cv.BFMatcher(cv.NORM_HAMMING)
+
+    def compute_matches(self, descriptors_1, descriptors_2, threshold=-1):
+        matches = self.matcher.match(descriptors_1, descriptors_2)
+
+        if threshold == -1:
+            return matches
+
+        return [m for m in matches if m.distance < threshold]
+
+    def compute_descriptor_match_distance(self, des_1, des_2):
+        return float(cv.norm(des_1, des_2, cv.NORM_HAMMING))
+
+
+class BruteHammingIndex:
+    """Brute force Hamming matching against a fixed reference set of binary descriptors, array native.
+    Same interface as BruteL2Index, distances are numbers of differing bits.
+    """
+    def __init__(self, reference_descriptors):
+        """
+        Args:
+            reference_descriptors (np.ndarray): Reference binary descriptors (uint8), one per row
+        """
+        self.reference = as_binary_descriptor_array(reference_descriptors)
+
+    def compute_distances(self, descriptors):
+        """Returns Hamming distances between every reference descriptor and every given descriptor
+
+        Args:
+            descriptors (np.ndarray): Binary descriptors (uint8), one per row
+
+        Returns:
+            np.ndarray: Distances, shape (num_reference, num_descriptors)
+        """
+        descriptors = as_binary_descriptor_array(descriptors, self.reference.shape[1])
+        differing_bits = POPCOUNT_TABLE[self.reference[:, None, :] ^ descriptors[None, :, :]]
+        return differing_bits.sum(axis=2, dtype=np.int32).astype(np.float32)
+
+    def match(self, descriptors, ratio=None):
+        """For every reference descriptor, finds the closest of given descriptors
+
+        Args:
+            descriptors (np.ndarray): Descriptors to search, one per row (None if there are none)
+            ratio (float, optional): Ratio test, best match is kept only if its distance is below ratio times
+                the second best distance. Defaults to None (no ratio test).
+
+        Returns:
+            tuple(np.ndarray, np.ndarray): Indices into descriptors and distances, one per reference descriptor.
+                Unmatched reference descriptors get index -1 and distance inf.
+        """
+        return best_matches(self.compute_distances(descriptors), ratio)
+
+
+def as_binary_descriptor_array(descriptors, length=None):
+    """Returns binary descriptors as a contiguous uint8 (N, length) array, empty if descriptors is None"""
+    if descriptors is None:
+        return np.zeros((0, 0 if length is None else length), dtype=np.uint8)
+    return np.ascontiguousarray(descriptors, dtype=np.uint8).reshape(len(descriptors), -1)
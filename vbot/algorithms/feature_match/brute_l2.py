@@ -38,4 +38,81 @@ class BruteL2:
 
         m = self.matcher.match(des_1, des_2)
 
-        return m[0].distance
\ No newline at end of file
+        return m[0].distance
+
+class BruteL2Index:
+    """Brute force L2 matching against a fixed reference set of descriptors, array native.
+    Reference descriptors are stored once as contiguous float32 with their squared norms, distances to new
+    descriptors come from one matrix product (|a|^2 + |b|^2 - 2ab). Same pairing as BruteL2.compute_matches,
+    without DMatch objects.
+    """
+    def __init__(self, reference_descriptors):
+        """
+        Args:
+            reference_descriptors (np.ndarray): Reference (query) descriptors, one per row
+        """
+        self.reference = as_descriptor_array(reference_descriptors)
+        self.reference_sq_norms = np.einsum('ij,ij->i', self.reference, self.reference)
+
+    def compute_distances(self, descriptors):
+        """Returns L2 distances between every reference descriptor and every given descriptor
+
+        Args:
+            descriptors (np.ndarray): Descriptors, one per row
+
+        Returns:
+            np.ndarray: Distances, shape (num_reference, num_descriptors)
+        """
+        descriptors = as_descriptor_array(descriptors, self.reference.shape[1])
+        distances = self.reference @ descriptors.T
+        distances *= -2
+        distances += self.reference_sq_norms[:, None]
+        distances += np.einsum('ij,ij->i', descriptors, descriptors)
+        np.maximum(distances, 0, out=distances)
+        return np.sqrt(distances, out=distances)
+
+    def match(self, descriptors, ratio=None):
+        """For every reference descriptor, finds the closest of given descriptors
+
+        Args:
+            descriptors (np.ndarray): Descriptors to search, one per row (None if there are none)
+            ratio (float, optional): Ratio test, best match is kept only if its distance is below ratio times
+                the second best distance. Defaults to None (no ratio test).
+
+        Returns:
+            tuple(np.ndarray, np.ndarray): Indices into descriptors and distances, one per reference descriptor.
+                Unmatched reference descriptors get index -1 and distance inf.
+        """
+        return best_matches(self.compute_distances(descriptors), ratio)
+
+
+def as_descriptor_array(descriptors, length=None):
+    """Returns descriptors as a contiguous float32 (N, length) array, empty if descriptors is None"""
+    if descriptors is None:
+        return np.zeros((0, 0 if length is None else length), dtype=np.float32)
+    return np.ascontiguousarray(descriptors, dtype=np.float32).reshape(len(descriptors), -1)
+
+
+def best_matches(distances, ratio=None):
+    """Returns index and distance of the smallest distance of every row, with optional ratio test
+
+    Args:
+        distances (np.ndarray): Distances, shape (num_reference, num_descriptors)
+        ratio (float, optional): Ratio test threshold. Defaults to None.
+
+    Returns:
+        tuple(np.ndarray, np.ndarray): Best indices (-1 if unmatched) and distances (inf if unmatched)
+    """
+    num_reference, num_descriptors = distances.shape
+    if num_descriptors == 0:
+        return np.full(num_reference, -1, dtype=np.int64), np.full(num_reference, np.inf)
+
+    rows = np.arange(num_reference)
+    indices = distances.argmin(axis=1)
+    best_distances = distances[rows, indices]
+    if ratio is not None and num_descriptors > 1:
+        second_distances = np.partition(distances, 1, axis=1)[:, 1]
+        rejected = ~(best_distances < ratio * second_distances)
+        indices[rejected] = -1
+        best_distances[rejected] = np.inf
+    return indices, best_distances
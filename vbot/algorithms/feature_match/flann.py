@@ -0,0 +1,69 @@
+import cv2 as cv
+import numpy as np
+
+from .brute_l2 import as_descriptor_array
+
+FLANN_INDEX_KDTREE = 1
+
+class FlannIndex:
+    """Approximate L2 matching against a fixed reference set of descriptors, array native.
+    A randomized kd-tree FLANN index is built once over the reference descriptors. New descriptors are
+    looked up in the index, and every reference descriptor keeps the closest of the new descriptors that
+    found it as nearest neighbour. Same output as BruteL2Index.match, suits large reference sets.
+    """
+    def __init__(self, reference_descriptors, trees=4, checks=32):
+        """
+        Args:
+            reference_descriptors (np.ndarray): Reference descriptors, one per row
+            trees (int, optional): Number of randomized kd-trees. Defaults to 4.
+            checks (int, optional): Leaves visited per lookup, higher is more exact. Defaults to 32.
+        """
+        self.reference = as_descriptor_array(reference_descriptors)
+        self.search_params = dict(checks=checks)
+        self.index = None
+        if len(self.reference) > 0:
+            self.index = cv.flann_Index(self.reference, dict(algorithm=FLANN_INDEX_KDTREE, trees=trees))
+
+    def knn_search(self, descriptors, k):
+        """Returns k nearest reference descriptors of every given descriptor
+
+        Args:
+            descriptors (np.ndarray): Descriptors, one per row
+            k (int): Number of neighbours, at most number of reference descriptors
+
+        Returns:
+            tuple(np.ndarray, np.ndarray): Reference indices and L2 distances, shape (num_descriptors, k)
+        """
+        descriptors = as_descriptor_array(descriptors, self.reference.shape[1])
+        indices, sq_distances = self.index.knnSearch(descriptors, k, params=self.search_params)
+        return indices.astype(np.int64), np.sqrt(sq_distances.astype(np.float64))   # L2 index returns squared distances
+
+    def match(self, descriptors, ratio=None):
+        """For every reference descriptor, finds the closest of given descriptors
+
+        Args:
+            descriptors (np.ndarray): Descriptors to search, one per row (None if there are none)
+            ratio (float, optional): Ratio test on the nearest neighbours of each given descriptor.
+                Defaults to None (no ratio test).
+
+        Returns:
+            tuple(np.ndarray, np.ndarray): Indices into descriptors and distances, one per reference descriptor.
+                Unmatched reference descriptors get index -1 and distance inf.
+        """
+        num_reference = len(self.reference)
+        match_indices = np.full(num_reference, -1, dtype=np.int64)
+        match_distances = np.full(num_reference, np.inf)
+        if self.index is None or descriptors is None or len(descriptors) == 0:
+            return match_indices, match_distances
+
+        k = 2 if ratio is not None and num_reference > 1 else 1
+        reference_indices, distances = self.knn_search(descriptors, k)
+        accepted = distances[:, 0] < ratio * distances[:, 1] if k == 2 else np.ones(len(distances), dtype=bool)
+
+        # closest accepted descriptor of every reference descriptor (first of sorted candidates per reference)
+        candidates = np.flatnonzero(accepted)
+        candidates = candidates[np.lexsort((distances[candidates, 0], reference_indices[candidates, 0]))]
+        matched, first = np.unique(reference_indices[candidates, 0], return_index=True)
+        match_indices[matched] = candidates[first]
+        match_distances[matched] = distances[candidates[first], 0]
+        return match_indices, match_distances
@@ -1,3 +1,3 @@
 from .horn_schunk import compute_optical_flow_HS
 from .farneback import compute_optical_flow_farneback
-from .lucas_kanade import compute_optical_flow_LK
\ No newline at end of file
+from .lucas_kanade import compute_optical_flow_LK, compute_optical_flow_LK_batch
\ No newline at end of file
@@ -62,6 +62,64 @@ def compute_optical_flow_LK(img_1,
     return pts_1, pts_2, st, err
 
 
+def compute_optical_flow_LK_batch(img_1,
+                                  img_2,
+                                  pts_list,
+                                  lk_params=None,
+                                  init_pts_list=None):
+    """Implements Lucas-Kanade for several sets of points (e.g. one set per target) in one call.
+    Image pyramids of I_1 and I_2 are built only once for all sets, results are split back per set.
+    Note: OpenCV python bindings do not accept prebuilt pyramids, so batching is how pyramids are shared.
+
+    Args:
+        img_1 (np.ndarray): Previous frame image 
+        img_2 (np.ndarray): Current frame image
+        pts_list (list): List of float32 point arrays, shape (-1,1,2), one per set
+        lk_params (dict): Parameters to be fed to LK optical flow function. Defaults to None.
+        init_pts_list (list): Initial guesses of new points (e.g. motion predicted), one per set, None entries 
+            start from old points. Defaults to None (all sets start from old points).
+
+    Returns:
+        list: (old_points, new_points, found_status, error) for each set, same as compute_optical_flow_LK.
+    """
+    if lk_params is None:
+        lk_params = dict( winSize  = (15,15),
+                          maxLevel = 3,
+                          criteria = (cv.TERM_CRITERIA_EPS | cv.TERM_CRITERIA_COUNT, 10, 0.03) )
+
+    pts_list = [np.asarray(pts, dtype=np.float32).reshape(-1, 1, 2) for pts in pts_list]
+    num_pts = [pts.shape[0] for pts in pts_list]
+    if sum(num_pts) == 0:
+        return [(pts, None, None, None) for pts in pts_list]
+
+    pts_1 = np.concatenate(pts_list, axis=0)
+
+    # with initial flow, search of each point starts at its guess (at every pyramid level) instead of at old point
+    init_pts = None
+    if init_pts_list is not None and any(init_pts is not None for init_pts in init_pts_list):
+        init_pts = np.concatenate([pts if init_pts is None else np.asarray(init_pts, dtype=np.float32).reshape(-1, 1, 2)
+                                   for pts, init_pts in zip(pts_list, init_pts_list)], axis=0)
+        lk_params = dict(lk_params, flags=lk_params.get('flags', 0) | cv.OPTFLOW_USE_INITIAL_FLOW)
+
+    pts_2, st, err = cv.calcOpticalFlowPyrLK( prevImg=img_1, 
+                                              nextImg=img_2, 
+                                              prevPts=pts_1, 
+                                              nextPts=init_pts,
+                                              **lk_params )
+
+    # split back per set (empty sets get None, just like a single call with no points)
+    flow_outputs = []
+    start = 0
+    for pts, n in zip(pts_list, num_pts):
+        if n == 0:
+            flow_outputs.append((pts, None, None, None))
+        else:
+            flow_outputs.append((pts, pts_2[start:start+n], st[start:start+n], err[start:start+n]))
+        start += n
+
+    return flow_outputs
+
+
 if __name__ == "__main__":
     """ test Lucas Kanade implementation """
 
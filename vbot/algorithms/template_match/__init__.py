@@ -1 +1,2 @@
-from .corr_coeff_norm import CorrelationCoeffNormed, TemplateMatcher
\ No newline at end of file
+from .corr_coeff_norm import CorrelationCoeffNormed, TemplateMatcher
+from .multi_template_matcher import MultiTemplateMatcher
\ No newline at end of file
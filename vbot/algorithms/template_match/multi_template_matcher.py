@@ -0,0 +1,201 @@
+import cv2 as cv
+import numpy as np
+
+class MultiTemplateMatcher:
+    """Finds several templates in the same search region in one call, normalized correlation coefficient
+    (same scores as cv.TM_CCOEFF_NORMED).
+    Template statistics (zero mean template, norm) are computed once at construction. Per call, the search
+    region is cropped and converted once, its window sums (integral images) are shared by all templates of
+    the same size, and best locations and scores of all templates are found together on stacked results.
+    Optionally matches on grayscale, and/or on a downscaled pyramid level first, refining each coarse
+    location at full resolution in a small neighbourhood.
+    """
+    FLAT_VARIANCE = 0.25    # window variance sums below this are constant intensity (integer images differ by at least 0.5)
+
+    def __init__(self, templates, use_gray=False, pyramid_levels=0):
+        """
+        Args:
+            templates (list): Template images (np.ndarray), all gray or all color, sizes may differ
+            use_gray (bool, optional): Match grayscale versions of templates and image. Defaults to False.
+            pyramid_levels (int, optional): Number of pyrDown levels for the coarse search, 0 disables. Defaults to 0.
+        """
+        self.use_gray = use_gray
+        self.pyramid_levels = pyramid_levels
+        self.templates = [self.prepare_image(template) for template in templates]
+        self.num_templates = len(self.templates)
+
+        # templates grouped by size, share window statistics of search region
+        self.groups = self.make_groups(self.templates)
+
+        # coarse templates, for pyramid search
+        self.coarse_groups = None
+        if self.pyramid_levels > 0:
+            coarse_templates = [self.pyr_down(template.astype(np.float32), self.pyramid_levels) for template in self.templates]
+            self.coarse_groups = self.make_groups(coarse_templates)
+
+    def prepare_image(self, img):
+        if self.use_gray and img.ndim == 3:
+            return cv.cvtColor(img, cv.COLOR_BGR2GRAY)
+        return img
+
+    @staticmethod
+    def pyr_down(img, levels):
+        for _ in range(levels):
+            img = cv.pyrDown(img)
+        return img
+
+    @staticmethod
+    def make_groups(templates):
+        """Returns templates grouped by size, with precomputed statistics
+
+        Args:
+            templates (list): Template images
+
+        Returns:
+            list: Tuples (indices, (h, w), zero mean float32 templates, inverse template norms, flat template flags)
+        """
+        indices_by_size = {}
+        for i, template in enumerate(templates):
+            indices_by_size.setdefault(template.shape[:2], []).append(i)
+
+        groups = []
+        for size, indices in indices_by_size.items():
+            zero_mean_templates = []
+            norms = np.empty(len(indices))
+            for j, i in enumerate(indices):
+                template = templates[i].astype(np.float32)
+                template = template - template.reshape(-1, 1 if template.ndim == 2 else template.shape[2]).mean(axis=0)
+                zero_mean_templates.append(template)
+                norms[j] = np.sqrt((template.astype(np.float64)**2).sum())
+            flat_templates = norms < np.finfo(np.float64).eps
+            inv_norms = np.where(flat_templates, 0, 1 / np.where(flat_templates, 1, norms)).astype(np.float32)
+            groups.append((np.array(indices), size, zero_mean_templates, inv_norms, flat_templates))
+        return groups
+
+    @staticmethod
+    def get_window_variances(img, size):
+        """Returns sum of squared deviations from window mean, for every window of given size in image.
+        Channels are summed, as in cv.TM_CCOEFF_NORMED.
+
+        Args:
+            img (np.ndarray): float32 image
+            size (tuple): Window (h, w)
+
+        Returns:
+            np.ndarray: Window variance sums, shape (H-h+1, W-w+1)
+        """
+        h, w = size
+        sums, sq_sums = cv.integral2(img, sdepth=cv.CV_64F, sqdepth=cv.CV_64F)
+        sums = sums.reshape(sums.shape[0], sums.shape[1], -1)
+        sq_sums = sq_sums.reshape(sq_sums.shape[0], sq_sums.shape[1], -1)
+        window_sums = sums[h:, w:] - sums[:-h, w:] - sums[h:, :-w] + sums[:-h, :-w]
+        window_sq_sums = sq_sums[h:, w:] - sq_sums[:-h, w:] - sq_sums[h:, :-w] + sq_sums[:-h, :-w]
+        return (window_sq_sums - window_sums**2 / (h * w)).sum(axis=2)
+
+    def match_groups(self, img, groups, locations, scores):
+        """Matches groups of templates in image, writes best top left locations and scores at template indices
+
+        Args:
+            img (np.ndarray): float32 search image
+            groups (list): Template groups (make_groups)
+            locations (np.ndarray): Output top left locations (x, y), shape (N, 2)
+            scores (np.ndarray): Output best scores, shape (N,)
+        """
+        for indices, (h, w), zero_mean_templates, inv_norms, flat_templates in groups:
+            if img.shape[0] < h or img.shape[1] < w:
+                continue
+            # windows of (nearly) constant intensity score 0, as in OpenCV
+            window_variances = self.get_window_variances(img, (h, w))
+            inv_window_stds = np.zeros(window_variances.shape, dtype=np.float32)
+            np.divide(1, np.sqrt(np.maximum(window_variances, 0)), out=inv_window_stds,
+                      where=window_variances > self.FLAT_VARIANCE, casting='unsafe')
+
+            # correlation with zero mean template is the correlation coefficient numerator
+            results = np.empty((len(indices),) + window_variances.shape, dtype=np.float32)
+            for result, template in zip(results, zero_mean_templates):
+                cv.matchTemplate(img, template, cv.TM_CCORR, result=result)
+            results *= inv_window_stds
+            results *= inv_norms[:, None, None]
+
+            flat_results = results.reshape(len(indices), -1)
+            best = flat_results.argmax(axis=1)
+            # rounding may push scores slightly beyond 1, flat templates match everywhere (as in OpenCV)
+            scores[indices] = np.where(flat_templates, 1, np.clip(flat_results[np.arange(len(indices)), best], -1, 1))
+            best[flat_templates] = 0
+            locations[indices, 0] = best % results.shape[2]
+            locations[indices, 1] = best // results.shape[2]
+
+    def refine(self, img, coarse_locations, scores):
+        """Refines coarse (pyramid level) locations at full resolution, in a neighbourhood of each upscaled location
+
+        Args:
+            img (np.ndarray): Search image, full resolution
+            coarse_locations (np.ndarray): Top left locations found at coarse level, shape (N, 2)
+            scores (np.ndarray): Output best scores, shape (N,)
+
+        Returns:
+            np.ndarray: Refined top left locations, shape (N, 2)
+        """
+        scale = 2**self.pyramid_levels
+        radius = scale
+        locations = coarse_locations * scale
+        for i, template in enumerate(self.templates):
+            if np.isnan(scores[i]):
+                continue
+            h, w = template.shape[:2]
+            x_1 = max(locations[i, 0] - radius, 0)
+            y_1 = max(locations[i, 1] - radius, 0)
+            x_2 = min(locations[i, 0] + radius + w, img.shape[1])
+            y_2 = min(locations[i, 1] + radius + h, img.shape[0])
+            if y_2 - y_1 < h or x_2 - x_1 < w:
+                continue
+            result = cv.matchTemplate(img[y_1:y_2, x_1:x_2], template, cv.TM_CCOEFF_NORMED)
+            _, max_val, _, max_loc = cv.minMaxLoc(result)
+            scores[i] = max_val
+            locations[i] = (x_1 + max_loc[0], y_1 + max_loc[1])
+        return locations
+
+    def find_templates_in_image(self, img):
+        """Finds best match of every template in image
+
+        Args:
+            img (np.ndarray): Search image
+
+        Returns:
+            tuple(np.ndarray, np.ndarray): Top left locations (x, y) [shape: (N, 2)], best scores [shape: (N,)].
+                Score is nan for templates larger than the image.
+        """
+        img = self.prepare_image(img)
+        locations = np.zeros((self.num_templates, 2), dtype=np.int64)
+        scores = np.full(self.num_templates, np.nan, dtype=np.float32)
+        if self.num_templates == 0:
+            return locations, scores
+
+        if self.pyramid_levels > 0:
+            self.match_groups(self.pyr_down(img.astype(np.float32), self.pyramid_levels), self.coarse_groups, locations, scores)
+            return self.refine(img, locations, scores), scores
+
+        self.match_groups(img.astype(np.float32), self.groups, locations, scores)
+        return locations, scores
+
+    def find_template_centers_in_image_bb(self, img, bb):
+        """Finds best match centers of every template inside bounding box of image.
+        Bounding box is clipped to image bounds.
+
+        Args:
+            img (np.ndarray): Image
+            bb (tuple): Bounding box (x, y, w, h) to search in
+
+        Returns:
+            tuple(np.ndarray, np.ndarray): Centers (x, y) in image coordinates [shape: (N, 2)], best scores [shape: (N,)].
+                Templates not fitting in the bounding box get nan score and bounding box center.
+        """
+        x, y, w, h = bb
+        x_1, y_1 = max(int(x), 0), max(int(y), 0)
+        x_2, y_2 = min(int(x + w), img.shape[1]), min(int(y + h), img.shape[0])
+        locations, scores = self.find_templates_in_image(img[y_1:max(y_2, y_1), x_1:max(x_2, x_1)])
+
+        sizes = np.array([template.shape[1::-1] for template in self.templates], dtype=np.int64).reshape(-1, 2)
+        centers = locations + np.array([x_1, y_1]) + sizes // 2
+        centers[np.isnan(scores)] = ((x_1 + x_2) // 2, (y_1 + y_2) // 2)
+        return centers, scores
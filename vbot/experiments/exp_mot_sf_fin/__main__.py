@@ -10,7 +10,9 @@ from .exp_manager import ExperimentManager
 from .settings import *
 
 from .my_imports import _prep_temp_folder, bf
+from .telemetry import load_plot_info
 from .plotter import *
+from .plot_jobs import PlotJobRunner, PLOT_JOBS
 from .arg_parser import VBOTParser
 
 if __name__ == '__main__':
@@ -25,6 +27,7 @@ if __name__ == '__main__':
     USE_TRUE_KINEMATICS = 0 
     USE_REAL_CLOCK = 0 
     DRAW_OCCLUSION_BARS = 0 
+    HEADLESS = 1 if ARGS.headless else 0
 
     RUN_EXPERIMENT = 0 if ARGS.norun else 1
     RUN_TRACK_PLOT = 1 if ARGS.plot else 0
@@ -41,6 +44,7 @@ if __name__ == '__main__':
                                                use_true_kin=USE_TRUE_KINEMATICS,
                                                use_real_clock=USE_REAL_CLOCK,
                                                draw_occlusion_bars=DRAW_OCCLUSION_BARS,
+                                               headless=HEADLESS,
                                                args=ARGS)
         print(bf(f'\nExperiment started. [{time.strftime("%H:%M:%S")}]\n'))
         EXPERIMENT_MANAGER.run()
@@ -48,8 +52,6 @@ if __name__ == '__main__':
         print(bf(f'\n\nExperiment finished. [{time.strftime("%H:%M:%S")}]\n'))
 
     if RUN_TRACK_PLOT:
-        FILE = open('plot_info.csv', 'r')
-        
         # plot switches
         SHOW_ALL = 1    # set to 1 to show all plots 
 
@@ -65,507 +67,34 @@ if __name__ == '__main__':
         SHOW_Y1_Y2 = 0
 
 
-        TIME = []
-
-        FP_1_X = []
-        FP_1_Y = []
-        FP_1_VX = []
-        FP_1_VY = []
-        FP_1_AX = []
-        FP_1_AY = []
-        FP_1_R = []
-        FP_1_THETA = []
-        FP_1_V_R = []
-        FP_1_V_THETA = []
-        FP_1_SPEED = []
-        FP_1_HEADING = []
-        FP_1_ACC = []
-        FP_1_DELTA = []
-        FP_2_X = []
-        FP_2_Y = []
-        FP_2_VX = []
-        FP_2_VY = []
-        FP_2_AX = []
-        FP_2_AY = []
-        FP_2_R = []
-        FP_2_THETA = []
-        FP_2_V_R = []
-        FP_2_V_THETA = []
-        FP_2_SPEED = []
-        FP_2_HEADING = []
-        FP_2_ACC = []
-        FP_2_DELTA = []
-        Y_1 = []
-        Y_2 = []
-        A_LAT = []
-        A_LNG = []
-        S = []
-        C = []
-        Z_W = []
-        S_DOT = []
-        C_DOT = []
-        Z_W_DOT = []
-        AZ_S = []
-        AZ_C = []
-        AZ_Z = []
-        AZ = []
-
-        T_1_OCCLUSION_CASE = []
-        T_1_X_MEAS = []
-        T_1_Y_MEAS = []
-        T_1_R_MEAS = []
-        T_1_THETA_MEAS = []
-        T_1_X_EST = []
-        T_1_Y_EST = []
-        T_1_VX_EST = []
-        T_1_VY_EST = []
-        T_1_AX_EST = []
-        T_1_AY_EST = []
-        T_1_R_EST = []
-        T_1_THETA_EST = []
-        T_1_V_R_EST = []
-        T_1_V_THETA_EST = []
-        T_1_SPEED_EST = []
-        T_1_BETA_EST = []
-        T_1_ACC_EST = []
-        T_1_DELTA_EST = []
-        T_1_TRUE_R = []
-        T_1_TRUE_THETA = []
-        T_1_TRUE_V_R = []
-        T_1_TRUE_V_THETA = []
-
-        T_2_OCCLUSION_CASE = []
-        T_2_X_MEAS = []
-        T_2_Y_MEAS = []
-        T_2_R_MEAS = []
-        T_2_THETA_MEAS = []
-        T_2_X_EST = []
-        T_2_Y_EST = []
-        T_2_VX_EST = []
-        T_2_VY_EST = []
-        T_2_AX_EST = []
-        T_2_AY_EST = []
-        T_2_R_EST = []
-        T_2_THETA_EST = []
-        T_2_V_R_EST = []
-        T_2_V_THETA_EST = []
-        T_2_SPEED_EST = []
-        T_2_BETA_EST = []
-        T_2_ACC_EST = []
-        T_2_DELTA_EST = []
-        T_2_TRUE_R = []
-        T_2_TRUE_THETA = []
-        T_2_TRUE_V_R = []
-        T_2_TRUE_V_THETA = []
-
-        T_3_OCCLUSION_CASE = []
-        T_3_X_MEAS = []
-        T_3_Y_MEAS = []
-        T_3_R_MEAS = []
-        T_3_THETA_MEAS = []
-        T_3_X_EST = []
-        T_3_Y_EST = []
-        T_3_VX_EST = []
-        T_3_VY_EST = []
-        T_3_AX_EST = []
-        T_3_AY_EST = []
-        T_3_R_EST = []
-        T_3_THETA_EST = []
-        T_3_V_R_EST = []
-        T_3_V_THETA_EST = []
-        T_3_SPEED_EST = []
-        T_3_BETA_EST = []
-        T_3_ACC_EST = []
-        T_3_DELTA_EST = []
-        T_3_TRUE_R = []
-        T_3_TRUE_THETA = []
-        T_3_TRUE_V_R = []
-        T_3_TRUE_V_THETA = []
-
-        DRONE_POS_X = []
-        DRONE_POS_Y = []
-        DRONE_VEL_X = []
-        DRONE_VEL_Y = []
-        CAM_ORIGIN_X = []
-        CAM_ORIGIN_Y = []
-        DRONE_POS_X_W = []
-        DRONE_POS_Y_W = []
-        DRONE_SPEED = []
-        DRONE_ALPHA = []
-        C_DESIRED = []
-        SCZ_IND = []
-        ELLIPSE_MAJOR = []
-        ELLIPSE_MINOR = []
-        ELLIPSE_ROT_ANG = []
-        A_LAT_LONG_DENOM = []
-
-        # get all the data in memory
-        for line in FILE.readlines():
-            # skip first line (header)
-            if line.split(',')[0].strip().lower()=='time':
-                continue
-            data = tuple(map(float, list(map(str.strip, line.strip().split(',')))))
-            TIME.append(data[0])
-            FP_1_X.append(data[1])
-            FP_1_Y.append(data[2])
-            FP_1_VX.append(data[3])
-            FP_1_VY.append(data[4])
-            FP_1_AX.append(data[5])
-            FP_1_AY.append(data[6])
-            FP_1_R.append(data[7])
-            FP_1_THETA.append(data[8])
-            FP_1_V_R.append(data[9])
-            FP_1_V_THETA.append(data[10])
-            FP_1_SPEED.append(data[11])
-            FP_1_HEADING.append(data[12])
-            FP_1_ACC.append(data[13])
-            FP_1_DELTA.append(data[14])
-            FP_2_X.append(data[15])
-            FP_2_Y.append(data[16])
-            FP_2_VX.append(data[17])
-            FP_2_VY.append(data[18])
-            FP_2_AX.append(data[19])
-            FP_2_AY.append(data[20])
-            FP_2_R.append(data[21])
-            FP_2_THETA.append(data[22])
-            FP_2_V_R.append(data[23])
-            FP_2_V_THETA.append(data[24])
-            FP_2_SPEED.append(data[25])
-            FP_2_HEADING.append(data[26])
-            FP_2_ACC.append(data[27])
-            FP_2_DELTA.append(data[28])
-            Y_1.append(data[29])
-            Y_2.append(data[30])
-            A_LAT.append(data[31])
-            A_LNG.append(data[32])
-            S.append(data[33])
-            C.append(data[34])
-            Z_W.append(data[35])
-            S_DOT.append(data[36])
-            C_DOT.append(data[37])
-            Z_W_DOT.append(data[38])
-            AZ_S.append(data[39])
-            AZ_C.append(data[40])
-            AZ_Z.append(data[41])
-            AZ.append(data[42])
-            T_1_OCCLUSION_CASE.append(data[43])
-            T_1_X_MEAS.append(data[44])
-            T_1_Y_MEAS.append(data[45])
-            T_1_R_MEAS.append(data[46])
-            T_1_THETA_MEAS.append(data[47])
-            T_1_X_EST.append(data[48])
-            T_1_Y_EST.append(data[49])
-            T_1_VX_EST.append(data[50])
-            T_1_VY_EST.append(data[51])
-            T_1_AX_EST.append(data[52])
-            T_1_AY_EST.append(data[53])
-            T_1_R_EST.append(data[54])
-            T_1_THETA_EST.append(data[55])
-            T_1_V_R_EST.append(data[56])
-            T_1_V_THETA_EST.append(data[57])
-            T_1_SPEED_EST.append(data[58])
-            T_1_BETA_EST.append(data[59])
-            T_1_ACC_EST.append(data[60])
-            T_1_DELTA_EST.append(data[61])
-            T_1_TRUE_R.append(data[62])
-            T_1_TRUE_THETA.append(data[63])
-            T_1_TRUE_V_R.append(data[64])
-            T_1_TRUE_V_THETA.append(data[65])
-            T_2_OCCLUSION_CASE.append(data[66])
-            T_2_X_MEAS.append(data[67])
-            T_2_Y_MEAS.append(data[68])
-            T_2_R_MEAS.append(data[69])
-            T_2_THETA_MEAS.append(data[70])
-            T_2_X_EST.append(data[71])
-            T_2_Y_EST.append(data[72])
-            T_2_VX_EST.append(data[73])
-            T_2_VY_EST.append(data[74])
-            T_2_AX_EST.append(data[75])
-            T_2_AY_EST.append(data[76])
-            T_2_R_EST.append(data[77])
-            T_2_THETA_EST.append(data[78])
-            T_2_V_R_EST.append(data[79])
-            T_2_V_THETA_EST.append(data[80])
-            T_2_SPEED_EST.append(data[81])
-            T_2_BETA_EST.append(data[82])
-            T_2_ACC_EST.append(data[83])
-            T_2_DELTA_EST.append(data[84])
-            T_2_TRUE_R.append(data[85])
-            T_2_TRUE_THETA.append(data[86])
-            T_2_TRUE_V_R.append(data[87])
-            T_2_TRUE_V_THETA.append(data[88])
-            T_3_OCCLUSION_CASE.append(data[89])
-            T_3_X_MEAS.append(data[90])
-            T_3_Y_MEAS.append(data[91])
-            T_3_R_MEAS.append(data[92])
-            T_3_THETA_MEAS.append(data[93])
-            T_3_X_EST.append(data[94])
-            T_3_Y_EST.append(data[95])
-            T_3_VX_EST.append(data[96])
-            T_3_VY_EST.append(data[97])
-            T_3_AX_EST.append(data[98])
-            T_3_AY_EST.append(data[99])
-            T_3_R_EST.append(data[100])
-            T_3_THETA_EST.append(data[101])
-            T_3_V_R_EST.append(data[102])
-            T_3_V_THETA_EST.append(data[103])
-            T_3_SPEED_EST.append(data[104])
-            T_3_BETA_EST.append(data[105])
-            T_3_ACC_EST.append(data[106])
-            T_3_DELTA_EST.append(data[107])
-            T_3_TRUE_R.append(data[108])
-            T_3_TRUE_THETA.append(data[109])
-            T_3_TRUE_V_R.append(data[110])
-            T_3_TRUE_V_THETA.append(data[111])
-            DRONE_POS_X.append(data[112])
-            DRONE_POS_Y.append(data[113])
-            DRONE_VEL_X.append(data[114])
-            DRONE_VEL_Y.append(data[115])
-            CAM_ORIGIN_X.append(data[116])
-            CAM_ORIGIN_Y.append(data[117])
-            DRONE_POS_X_W.append(data[118])
-            DRONE_POS_Y_W.append(data[119])
-            DRONE_SPEED.append(data[120])
-            DRONE_ALPHA.append(data[121])
-            C_DESIRED.append(data[122])
-            SCZ_IND.append(data[123])
-            ELLIPSE_MAJOR.append(data[124])
-            ELLIPSE_MINOR.append(data[125])
-            ELLIPSE_ROT_ANG.append(data[126])
-            A_LAT_LONG_DENOM.append(data[127])
-
-        FILE.close()
+        # get all the data in memory (one vectorized parse, cached binary sidecar is reused when csv is unchanged)
+        PLOT_DATA = load_plot_info('plot_info.csv')
 
         # plot
-        if len(TIME) < 5:
+        if len(PLOT_DATA) < 5:
             print('Not enough data to plot.')
             sys.exit()
         import matplotlib.pyplot as plt
-        import scipy.stats as st
 
         _PATH = f'./sim_outputs/{time.strftime("%Y-%m-%d_%H-%M-%S")}'
         _prep_temp_folder(os.path.realpath(_PATH))
 
         # copy the plot_info file to the where plots figured will be saved
         shutil.copyfile('plot_info.csv', f'{_PATH}/plot_info.csv')
-        plt.style.use(['seaborn-paper', 'fast'])
-
-        los_1_plotter = LOS1DataPlotter(_PATH,
-                                        TIME,
-                                        T_1_TRUE_R,
-                                        T_1_R_MEAS,
-                                        T_1_R_EST,
-                                        T_2_TRUE_R,
-                                        T_2_R_MEAS,
-                                        T_2_R_EST,
-                                        T_3_TRUE_R,
-                                        T_3_R_MEAS,
-                                        T_3_R_EST,
-                                        FP_1_R,
-                                        FP_2_R,
-                                        T_1_TRUE_THETA,
-                                        T_1_THETA_MEAS,
-                                        T_1_THETA_EST,
-                                        T_2_TRUE_THETA,
-                                        T_2_THETA_MEAS,
-                                        T_2_THETA_EST,
-                                        T_3_TRUE_THETA,
-                                        T_3_THETA_MEAS,
-                                        T_3_THETA_EST,
-                                        FP_1_THETA,
-                                        FP_2_THETA
-                                        )
-
-        los_1_plotter.plot()
-
-        los_2_plotter = LOS2DataPlotter(_PATH,
-                                        TIME,
-                                        T_1_TRUE_V_R,
-                                        T_1_V_R_EST,
-                                        T_2_TRUE_V_R,
-                                        T_2_V_R_EST,
-                                        T_3_TRUE_V_R,
-                                        T_3_V_R_EST,
-                                        FP_1_V_R,
-                                        FP_2_V_R,
-                                        T_1_TRUE_V_THETA,
-                                        T_1_V_THETA_EST,
-                                        T_2_TRUE_V_THETA,
-                                        T_2_V_THETA_EST,
-                                        T_3_TRUE_V_THETA,
-                                        T_3_V_THETA_EST,
-                                        FP_1_V_THETA,
-                                        FP_2_V_THETA
-                                        )
-
-        los_2_plotter.plot()
-
-        accl_comm_plotter = AccelerationCommandDataPlotter(_PATH,
-                                                           TIME,
-                                                           A_LAT,
-                                                           A_LNG,
-                                                           AZ
-                                                           )
-
-        accl_comm_plotter.plot()
-
-        ellipse_plotter = EllipseDataPlotter(_PATH,
-                                             TIME,
-                                             ELLIPSE_MAJOR,
-                                             ELLIPSE_MINOR,
-                                             ELLIPSE_ROT_ANG
-                                             )
-
-        ellipse_plotter.plot()
-
-        obj_func_plotter = ObjectiveFunctionDataPlotter(_PATH,
-                                                        TIME,
-                                                        Y_1,
-                                                        Y_2
-                                                        )
-
-        obj_func_plotter.plot()
-
-        speeds_headings_plotter = SpeedsHeadingsDataPlotter(_PATH,
-                                                            TIME,
-                                                            T_1_SPEED_EST,
-                                                            T_2_SPEED_EST,
-                                                            T_3_SPEED_EST,
-                                                            FP_1_SPEED,
-                                                            FP_2_SPEED,
-                                                            DRONE_SPEED,
-                                                            T_1_BETA_EST,
-                                                            T_2_BETA_EST,
-                                                            T_3_BETA_EST,
-                                                            FP_1_HEADING,
-                                                            FP_2_HEADING,
-                                                            DRONE_ALPHA
-                                                            )
-
-        speeds_headings_plotter.plot()
-
-        trajectory_world_plotter = TrajectoryWorldDataPlotter(_PATH,
-                                                              TIME,
-                                                              T_1_X_EST,
-                                                              T_1_Y_EST,
-                                                              T_2_X_EST,
-                                                              T_2_Y_EST,
-                                                              T_3_X_EST,
-                                                              T_3_Y_EST,
-                                                              FP_1_X,
-                                                              FP_1_Y,
-                                                              FP_2_X,
-                                                              FP_2_Y,
-                                                              DRONE_POS_X_W,
-                                                              DRONE_POS_Y_W,
-                                                              )
-
-        trajectory_world_plotter.plot()
-
-        trajectory_camera_plotter = TrajectoryCameraDataPlotter(_PATH,
-                                                               TIME,
-                                                               T_1_X_EST,
-                                                               T_1_Y_EST,
-                                                               T_2_X_EST,
-                                                               T_2_Y_EST,
-                                                               T_3_X_EST,
-                                                               T_3_Y_EST,
-                                                               FP_1_X,
-                                                               FP_1_Y,
-                                                               FP_2_X,
-                                                               FP_2_Y,
-                                                               DRONE_POS_X_W,
-                                                               DRONE_POS_Y_W,
-                                                               )
-
-        trajectory_camera_plotter.plot()
-
-        altitude_control_plotter = AltitudeControlDataPlotter(_PATH,
-                                                              TIME,
-                                                              S,
-                                                              C,
-                                                              Z_W,
-                                                              C_DESIRED
-                                                              )
-
-        altitude_control_plotter.plot()
-
-        traj3d_plotter = Traj3DDataPlotter(_PATH,
-                                                              TIME,
-                                                              T_1_X_EST,
-                                                              T_1_Y_EST,
-                                                              T_2_X_EST,
-                                                              T_2_Y_EST,
-                                                              T_3_X_EST,
-                                                              T_3_Y_EST,
-                                                              FP_1_X,
-                                                              FP_1_Y,
-                                                              FP_2_X,
-                                                              FP_2_Y,
-                                                              DRONE_POS_X_W,
-                                                              DRONE_POS_Y_W,
-                                                              Z_W
-                                                              )
-
-        traj3d_plotter.plot()
-
-
-        f1 ,a1 = plt.subplots()
-        a1.plot(TIME, C_DOT)
-        a1.grid(True, which='minor', alpha=0.1)
-        a1.grid(True, which='major', alpha=0.3)
-        f1.suptitle(r'$\dot{C}$')
-        f1.savefig(f'{_PATH}/8_cdot.pdf')
-        f1.show()
-
-        f2 ,a2 = plt.subplots()
-        a2.plot(TIME, SCZ_IND)
-        a2.grid(True, which='minor', alpha=0.1)
-        a2.grid(True, which='major', alpha=0.3)
-        f2.suptitle(f'SCZ - 012')
-        f2.savefig(f'{_PATH}/9_scz_ind.pdf')
-        f2.show()
-
-        f3 ,a3 = plt.subplots()
-        a3.plot(Z_W, S)
-        a3.grid(True, which='minor', alpha=0.1)
-        a3.grid(True, which='major', alpha=0.3)
-        a3.axis('equal')
-        f3.suptitle(f'z vs S')
-        f3.savefig(f'{_PATH}/10_zs.pdf')
-        f3.show()
-
-        f4 ,a4 = plt.subplots()
-        a4.plot(Z_W, C)
-        a4.grid(True, which='minor', alpha=0.1)
-        a4.grid(True, which='major', alpha=0.3)
-        a4.axis('equal')
-        f4.suptitle(f'z vs C')
-        f4.savefig(f'{_PATH}/11_zc.pdf')
-        f4.show()
-
-
-        dist_SC = [0 for _ in TIME]
-        for i in range(len(TIME)):
-            dist_SC[i] = (S_DES - S[i] - min(0,C_DESIRED[i] - C[i]))
-        prod_SC = [0 for _ in TIME]
-        for i in range(len(TIME)):
-            prod_SC[i] = ((S_DES - S[i])*min(0, C_DESIRED[i] - C[i]))
-
-        f5 ,a5 = plt.subplots()
-        a5.plot(TIME, dist_SC)
-        a5.grid(True, which='minor', alpha=0.1)
-        a5.grid(True, which='major', alpha=0.3)
-        f5.suptitle(f'dist_SC_err')
-        # f5.savefig(f'{_PATH}/11_zc.pdf')
-        f5.show()
-        f6 ,a6 = plt.subplots()
-        a6.plot(TIME, prod_SC)
-        a6.grid(True, which='minor', alpha=0.1)
-        a6.grid(True, which='major', alpha=0.3)
-        f6.suptitle(f'prod_SC_err')
-        # f6.savefig(f'{_PATH}/11_zc.pdf')
-        f6.show()
+        if os.path.isfile(TELEMETRY_FILE):
+            shutil.copyfile(TELEMETRY_FILE, f'{_PATH}/{TELEMETRY_FILE}')
+
+        # render figures; in batch mode in worker processes (Agg), copying figures that are unchanged
+        # since their last render from the plot cache. Otherwise in this process, to be shown.
+        PLOT_RUNNER = PlotJobRunner(_PATH,
+                                    PLOT_DATA,
+                                    show=not ARGS.batch,
+                                    num_workers=PLOT_NUM_WORKERS,
+                                    cache_folder=PLOT_CACHE_FOLDER if ARGS.batch else None,
+                                    style=['seaborn-paper', 'fast'])
+        PLOT_RUNNER.run(PLOT_JOBS)
+        print(PLOT_RUNNER.get_report())
+
         """ 
         A1 = r1*Vtheta1/V1
         A2 = r2*Vtheta2/V2
@@ -657,146 +186,6 @@ if __name__ == '__main__':
         # # f11.savefig(f'{_PATH}/11_zc.pdf')
         # f11.show()
 
-        f12 ,a12 = plt.subplots()
-        a12.plot(TIME, A_LAT_LONG_DENOM, alpha=0.7,lw=3)
-        a12.grid(True, which='minor', alpha=0.1)
-        a12.grid(True, which='major', alpha=0.3)
-        f12.suptitle(f'A_LAT_LONG_DENOM')
-        f12.savefig(f'{_PATH}/12_denom.pdf')
-        f12.show()
-
-        f13 ,a13 = plt.subplots()
-        a13.plot(C, S)
-        a13.grid(True, which='minor', alpha=0.1)
-        a13.grid(True, which='major', alpha=0.3)
-        a13.axis('equal')
-        f13.suptitle(f'C vs S')
-        f13.savefig(f'{_PATH}/13_cs.pdf')
-        f13.show()
-
-        DN = [0 for _ in TIME]
-        for i in range(len(A_LAT_LONG_DENOM)):
-            if abs(A_LAT_LONG_DENOM[i]) >= 1000:
-                DN[i] = 0#abs(1/A_LAT_LONG_DENOM[i])
-            else:
-                DN[i] = 1
-
-        f14 ,a14 = plt.subplots()
-        a14.plot(TIME, DN, alpha=0.7,lw=3)
-        a14.grid(True, which='minor', alpha=0.1)
-        a14.grid(True, which='major', alpha=0.3)
-        f14.suptitle(f'A_LAT_LONG_DENOM < 10')
-        f14.savefig(f'{_PATH}/14_denom_10.pdf')
-        f14.show()
-
-        X = [0 for _ in TIME]
-        Y = [0 for _ in TIME]
-
-        for i in range(len(TIME)):
-            X[i] = T_1_X_MEAS[i] - T_2_X_MEAS[i]
-            Y[i] = T_1_Y_MEAS[i] - T_2_Y_MEAS[i]
-
-        f15 ,a15 = plt.subplots()
-        a15.plot(TIME, X, alpha=0.7,lw=3)
-        a15.plot(TIME, Y, alpha=0.7,lw=3)
-        a15.grid(True, which='minor', alpha=0.1)
-        a15.grid(True, which='major', alpha=0.3)
-        f15.suptitle(f'T1 - T2 xy pos')
-        f15.savefig(f'{_PATH}/15_t1_pos_meas.pdf')
-        f15.show()
-
-        f16 ,a16 = plt.subplots()
-        # a16.plot(TIME, FP_1_X, alpha=0.7,lw=3)
-        a16.plot(TIME, FP_1_Y, alpha=0.7,lw=3)
-        a16.plot(TIME, FP_2_Y, alpha=0.7,lw=3)
-        a16.grid(True, which='minor', alpha=0.1)
-        a16.grid(True, which='major', alpha=0.3)
-        f16.suptitle(f'FP_1')
-        f16.savefig(f'{_PATH}/16_fp_1.pdf')
-        f16.show()
-
-        MID_X = [0 for _ in TIME]
-        MID_Y = [0 for _ in TIME]
-
-        for i in range(len(TIME)):
-            MID_X[i] = (FP_1_X[i] + FP_2_X[i])/2
-            MID_Y[i] = (FP_1_Y[i] + FP_2_Y[i])/2
-
-        f17 ,a17 = plt.subplots()
-        # a17.plot(TIME, MID_X, alpha=0.7,lw=3)
-        a17.plot(TIME, MID_Y, alpha=0.7,lw=3)
-        a17.grid(True, which='minor', alpha=0.1)
-        a17.grid(True, which='major', alpha=0.3)
-        f17.suptitle(f'FP_MID')
-        f17.savefig(f'{_PATH}/17_fp_mid.pdf')
-        f17.show()
-
-        from math import sin, cos, degrees
-        DIFF_ = [0 for _ in TIME]
-        DIFF_A = [0 for _ in TIME]
-        DIFF_C = [0 for _ in TIME]
-        DIFF_S = [0 for _ in TIME]
-        for i in range(len(TIME)):
-            DIFF_[i] = (degrees(atan2(sin(radians(DRONE_ALPHA[i]-FP_1_THETA[i])), cos(radians(DRONE_ALPHA[i]-FP_1_THETA[i])))))
-            DIFF_A[i] = abs(degrees(atan2(sin(radians(DRONE_ALPHA[i]-FP_1_THETA[i])), cos(radians(DRONE_ALPHA[i]-FP_1_THETA[i])))))
-            DIFF_C[i] = (cos(atan2(sin(radians(DRONE_ALPHA[i]-FP_1_THETA[i])), cos(radians(DRONE_ALPHA[i]-FP_1_THETA[i])))))
-            DIFF_S[i] = (sin(atan2(sin(radians(DRONE_ALPHA[i]-FP_1_THETA[i])), cos(radians(DRONE_ALPHA[i]-FP_1_THETA[i])))))
-        f18 ,a18 = plt.subplots()
-        # a18.plot(TIME, MID_X, alpha=0.7,lw=3)
-        a18.plot(TIME, DRONE_ALPHA, alpha=0.7,lw=2, label=r'$\alpha$')
-        a18.plot(TIME, FP_1_THETA, alpha=0.7,lw=2, label=r'$\theta_1$')
-        a18.plot(TIME, DIFF_, alpha=0.7,lw=3, label=r'$\alpha - \theta_1$', ls='--')
-        a18.plot(TIME, DIFF_A, alpha=0.7,lw=3, label=r'$\vert \alpha - \theta_1 \vert$')
-        a18.plot(TIME, DIFF_C, alpha=0.7,lw=3, label=r'$cos(\alpha - \theta_1)$')
-        a18.plot(TIME, DIFF_S, alpha=0.7,lw=3, label=r'$sin(\alpha - \theta_1)$')
-        a18.legend()
-        a18.grid(True, which='minor', alpha=0.1)
-        a18.grid(True, which='major', alpha=0.3)
-        f18.suptitle(r'$\alpha - \theta_1$')
-        f18.savefig(f'{_PATH}/18_alpha_theta.pdf')
-        f18.show()
-
-        DIFF_ = [0 for _ in TIME]
-        DIFF_A = [0 for _ in TIME]
-        DIFF_C = [0 for _ in TIME]
-        DIFF_S = [0 for _ in TIME]
-        for i in range(len(TIME)):
-            DIFF_[i] = (degrees(atan2(sin(radians(-DRONE_ALPHA[i]+FP_1_THETA[i])), cos(radians(-DRONE_ALPHA[i]+FP_1_THETA[i])))))
-            DIFF_A[i] = abs(degrees(atan2(sin(radians(-DRONE_ALPHA[i]+FP_1_THETA[i])), cos(radians(-DRONE_ALPHA[i]+FP_1_THETA[i])))))
-            DIFF_C[i] = (cos(atan2(sin(radians(-DRONE_ALPHA[i]+FP_1_THETA[i])), cos(radians(-DRONE_ALPHA[i]+FP_1_THETA[i])))))
-            DIFF_S[i] = (sin(atan2(sin(radians(-DRONE_ALPHA[i]+FP_1_THETA[i])), cos(radians(-DRONE_ALPHA[i]+FP_1_THETA[i])))))
-        f19 ,a19 = plt.subplots()
-        # a19.plot(TIME, MID_X, alpha=0.7,lw=3)
-        a19.plot(TIME, DRONE_ALPHA, alpha=0.7,lw=2, label=r'$\alpha$')
-        a19.plot(TIME, FP_1_THETA, alpha=0.7,lw=2, label=r'$\theta_1$')
-        a19.plot(TIME, DIFF_, alpha=0.7,lw=3, label=r'$\theta_1 - \alpha$', ls='--')
-        a19.plot(TIME, DIFF_A, alpha=0.7,lw=3, label=r'$\vert \theta_1 - \alpha \vert$')
-        a19.plot(TIME, DIFF_C, alpha=0.7,lw=3, label=r'$cos(\theta_1 - \alpha)$')
-        a19.plot(TIME, DIFF_S, alpha=0.7,lw=3, label=r'$sin(\theta_1 - \alpha)$')
-        a19.legend()
-        a19.grid(True, which='minor', alpha=0.1)
-        a19.grid(True, which='major', alpha=0.3)
-        f19.suptitle(r'$\theta_1 - \alpha$')
-        f19.savefig(f'{_PATH}/19_theta_alpha.pdf')
-        f19.show()
-
-        DIFF_ = [0 for _ in TIME]
-        for i in range(len(TIME)):
-            DIFF_[i] = (degrees(atan2(sin(radians(-DRONE_ALPHA[i]+FP_1_HEADING[i])), cos(radians(-DRONE_ALPHA[i]+FP_1_HEADING[i])))))
-        f20 ,a20 = plt.subplots()
-        # a20.plot(TIME, MID_X, alpha=0.7,lw=3)
-        a20.plot(TIME, DRONE_ALPHA, alpha=0.7,lw=2, label=r'$\alpha$')
-        a20.plot(TIME, FP_1_HEADING, alpha=0.7,lw=2, label=r'$\beta_{fp_1}$')
-        a20.plot(TIME, DIFF_, alpha=0.7,lw=3, label=r'$\beta_{fp_1} - \alpha$')
-        a20.legend()
-        a20.grid(True, which='minor', alpha=0.1)
-        a20.grid(True, which='major', alpha=0.3)
-        f20.suptitle(r'$\beta_{fp_1} - \alpha$')
-        f20.savefig(f'{_PATH}/20_beta_alpha.pdf')
-        f20.show()
-
-
-        plt.show()
 
         # # -------------------------------------------------------------------------------- figure 1
         # # line of sight kinematics 1
@@ -1424,6 +813,13 @@ if __name__ == '__main__':
         # create folder path inside ./sim_outputs
         _PATH = f'./sim_outputs/{time.strftime("%Y-%m-%d_%H-%M-%S")}'
         _prep_temp_folder(os.path.realpath(_PATH))
-        VID_PATH = f'{_PATH}/sim_track_control.avi'
-        print('Making video.')
-        EXPERIMENT_MANAGER.make_video(VID_PATH, SIMULATOR_TEMP_FOLDER)
+        VID_PATH = f'{_PATH}/{SAVE_VIDEO_NAME}'
+        STREAMED_VID_PATH = os.path.join(SIMULATOR_TEMP_FOLDER, SAVE_VIDEO_NAME)
+        if SAVE_VIDEO and os.path.isfile(STREAMED_VID_PATH):
+            # video was already streamed during the run, only move it
+            print('Moving video.')
+            shutil.move(STREAMED_VID_PATH, VID_PATH)
+            shutil.rmtree(SIMULATOR_TEMP_FOLDER)
+        else:
+            print('Making video.')
+            EXPERIMENT_MANAGER.make_video(VID_PATH, SIMULATOR_TEMP_FOLDER)
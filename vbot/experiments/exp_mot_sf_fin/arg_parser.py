@@ -1,5 +1,7 @@
 import argparse
 
+from .settings import PROFILE_TRACE_FILE, FEATURE_BACKENDS
+
 class VBOTParser:
     def __init__(self):
         # create a parser
@@ -27,6 +29,10 @@ class VBOTParser:
                             default=False,
                             action='store_true'
                             )
+        self.parser.add_argument('--headless',
+                            default=False,
+                            action='store_true'
+                            )
         self.parser.add_argument('--k1',
                             action='store',
                             metavar='K_1 gain affects a_lat more (float)',
@@ -48,6 +54,37 @@ class VBOTParser:
                             type=float,
                             required=False
                             )
+        self.parser.add_argument('--seed',
+                            action='store',
+                            metavar='RANDOM_SEED (int)',
+                            type=int,
+                            required=False
+                            )
+        self.parser.add_argument('--track_every',
+                            action='store',
+                            metavar='TRACKER_STEP_INTERVAL (int)',
+                            type=int,
+                            required=False
+                            )
+        self.parser.add_argument('--features',
+                            action='store',
+                            choices=FEATURE_BACKENDS,
+                            metavar='FEATURE_BACKEND (' + '|'.join(FEATURE_BACKENDS) + ')',
+                            type=str,
+                            required=False
+                            )
+        self.parser.add_argument('--profile',
+                            default=False,
+                            action='store_true'
+                            )
+        self.parser.add_argument('--trace',
+                            action='store',
+                            nargs='?',
+                            const=PROFILE_TRACE_FILE,
+                            metavar='TRACE_FILE (json)',
+                            type=str,
+                            required=False
+                            )
 
 
 
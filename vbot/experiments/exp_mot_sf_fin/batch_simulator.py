@@ -0,0 +1,901 @@
+"""Ground truth batch simulation of many independent drone/car scenarios in one process.
+
+No rendering and no vision: car trajectories (Car.update_kinematics) and quadrotor states
+(DroneCamera dynamics) of all scenarios are stacked NumPy arrays stepped together. True car
+kinematics feed the tracking manager (enclosing ellipse, ellipse EKF) and controller, vectorized across
+scenarios by default, or per scenario TrackingManager and Controller instances (reference path).
+Meant for controller gain sweeps. Run from vbot/experiments:
+    python -m exp_mot_sf_fin.batch_simulator
+"""
+import time
+from math import atan2, degrees, pi, tau
+from types import SimpleNamespace
+
+import numpy as np
+import numpy.linalg as LA
+import pygame
+from scipy.spatial.transform import Rotation as R
+
+from .car import Car
+from .controller import Controller
+from .ellipse_ekf import ELLIPSE_EKF_CHANNELS
+from .quadrotor_dynamics import integrate_quadrotor_rk4_batch, body_to_inertial_velocity_batch
+from .singer_model import get_singer_matrices
+from .target import Target
+from .tracking_manager import TrackingManager
+from .settings import *
+
+
+class CarKinematics:
+    """Car without sprite, image or simulator, stepped with Car.update_kinematics.
+    Trajectories depend on time only, so one instance per car serves all scenarios.
+    """
+    update_kinematics = Car.update_kinematics
+
+    def __init__(self, clock, x, y, vx=0.0, vy=0.0, ax=0.0, ay=0.0, traj=DEFAULT_TRAJECTORY):
+        """
+        Args:
+            clock (SimpleNamespace): Shared clock with time and dt attributes (stands in for simulator)
+            x (float): Initial position x component (m)
+            y (float): Initial position y component (m)
+            vx (float, optional): Initial velocity x component (m/s). Defaults to 0.0.
+            vy (float, optional): Initial velocity y component (m/s). Defaults to 0.0.
+            ax (float, optional): Acceleration x component (m/s^2). Defaults to 0.0.
+            ay (float, optional): Acceleration y component (m/s^2). Defaults to 0.0.
+            traj (int, optional): Trajectory. Defaults to DEFAULT_TRAJECTORY.
+        """
+        self.simulator = clock
+        self.position = pygame.Vector2(x, y)
+        self.initial_velocity = pygame.Vector2(vx, vy)
+        self.velocity = pygame.Vector2(vx, vy)
+        self.acceleration = pygame.Vector2(ax, ay)
+        self.angle = 0.0
+        self.traj = traj
+
+        # same as Car, closed form trajectories start from their own velocity
+        if traj in (ONE_HOLE_TRAJECTORY, TWO_HOLE_TRAJECTORY, SQUIRCLE_TRAJECTORY):
+            self.velocity = pygame.Vector2(0, 0)
+            self.acceleration = pygame.Vector2(0, 0)
+            self.update_kinematics()
+
+
+class ScenarioTarget:
+    """Target stand in with true (not estimated) kinematics, what TrackingManager and Controller read from Target
+    """
+    get_4_enclosing_points = Target.get_4_enclosing_points
+
+    def __init__(self):
+        self.x_est = 0.0
+        self.y_est = 0.0
+        self.beta_est = 0.0
+
+
+class ScenarioManager:
+    """Minimal ExperimentManager for one ground truth scenario.
+    Provides what TrackingManager, Ellipse2D, the EKFs and Controller query, values are set by BatchSimulator every step.
+    """
+
+    def __init__(self, clock, num_cars, k1, k2, kw):
+        self.write_plot = False
+        self.args = SimpleNamespace(k1=k1, k2=k2, kw=kw)
+
+        self.simulator = SimpleNamespace(time=0.0,
+                                         dt=0.0,
+                                         pxm_fac=PIXEL_TO_METERS_FACTOR,
+                                         camera=SimpleNamespace(altitude=ALTITUDE, vz=0.0))
+        self.clock = clock
+        self.cam_origin = (0.0, 0.0)
+        self.drone_velocity = (0.0, 0.0)
+
+        self.targets = [ScenarioTarget() for _ in range(num_cars)]
+        self.tracking_manager = TrackingManager(self)
+        self.tracking_manager.set_targets(self.targets)
+        self.controller = Controller(self)
+        self.controller.verbose = False
+
+    def get_sim_dt(self):
+        return self.simulator.dt
+
+    def get_cam_origin(self):
+        return self.cam_origin
+
+    def get_true_drone_position(self):
+        # camera motion is compensated every step, drone sits at camera origin
+        return (0.0, 0.0)
+
+    def get_true_drone_velocity(self):
+        return self.drone_velocity
+
+    def generate_acceleration(self):
+        """Runs tracking manager (ellipse enclosure, focal point EKF, control area) and controller
+
+        Returns:
+            tuple: ax, ay, az
+        """
+        self.tracking_manager.compute_enclosing_ellipse(tolerance=ELLIPSE_TOLERANCE)
+        self.tracking_manager.compute_focal_point_estimations()
+        self.tracking_manager.display()
+        return self.controller.generate_acceleration(self.tracking_manager.ellipse_params_est,
+                                                     self.tracking_manager.ellipse_params_meas[0],
+                                                     self.tracking_manager.ellipse_params_meas[1],
+                                                     degrees(self.tracking_manager.ellipse_params_meas[3]))
+
+
+class BatchEllipse2D:
+    """Minimum volume enclosing ellipses of M point sets at once, same computation as Ellipse2D.enclose_points
+    (warm-started Khachiyan iteration with rank-one inverse updates, SVD of the shape matrix).
+    Iterations run in lockstep, scenarios drop out as they converge.
+    """
+
+    def __init__(self, num_scenarios):
+        self.num_scenarios = num_scenarios
+        self._prev_u = None
+        self.enclosure_iterations = np.zeros(num_scenarios, dtype=int)
+
+    def solve_enclosure_weights(self, Q, tolerance):
+        """Khachiyan's iteration for M point sets, see Ellipse2D.solve_enclosure_weights
+
+        Args:
+            Q (np.ndarray): Augmented points, shape (M, 3, NUM_POINTS)
+            tolerance (float): Tolerance for optimization error
+
+        Returns:
+            np.ndarray: Weights, shape (M, NUM_POINTS)
+        """
+        d = 2
+        num_scenarios, _, NUM_POINTS = Q.shape
+        if NUM_POINTS == 4:
+            return np.full((num_scenarios, 4), 0.25)
+
+        if self._prev_u is not None and self._prev_u.shape[1] == NUM_POINTS:
+            u = self._prev_u.copy()
+        else:
+            u = np.full((num_scenarios, NUM_POINTS), 1 / NUM_POINTS)
+
+        X = np.einsum('mik,mk,mjk->mij', Q, u, Q)
+        lost = np.abs(LA.det(X)) < 1e-12
+        if lost.any():
+            # warm start lost support of the points, restart from uniform weights
+            u[lost] = 1 / NUM_POINTS
+            X[lost] = np.einsum('mik,mk,mjk->mij', Q[lost], u[lost], Q[lost])
+        X_inv = LA.inv(X)
+        M = np.sum(Q * (X_inv @ Q), axis=1)
+
+        iterations = np.zeros(num_scenarios, dtype=int)
+        active = np.arange(num_scenarios)
+        while len(active) > 0:
+            arg_max_M = np.argmax(M[active], axis=1)
+            max_M = M[active, arg_max_M]
+
+            step_size = (max_M - d - 1) / ((d + 1) * (max_M - 1))
+            stepping = step_size > 0
+            active, arg_max_M, step_size = active[stepping], arg_max_M[stepping], step_size[stepping]
+            if len(active) == 0:
+                break
+            new_u = (1 - step_size)[:, None] * u[active]
+            new_u[np.arange(len(active)), arg_max_M] += step_size
+
+            err = LA.norm(new_u - u[active], axis=1)
+            u[active] = new_u
+            iterations[active] += 1
+
+            # X <- (1 - s) X + s q q', update inverse and M accordingly
+            Q_a = Q[active]
+            q = Q_a[np.arange(len(active)), :, arg_max_M]
+            X_inv_a = X_inv[active] / (1 - step_size)[:, None, None]
+            M_a = M[active] / (1 - step_size)[:, None]
+            v = np.einsum('mij,mj->mi', X_inv_a, q)
+            denom = 1 / step_size + np.einsum('mi,mi->m', q, v)
+            w = np.einsum('mi,mik->mk', v, Q_a)
+            M_a -= w * w / denom[:, None]
+            X_inv_a -= v[:, :, None] * v[:, None, :] / denom[:, None, None]
+
+            # refresh from scratch once in a while to keep round-off errors in check
+            refresh = iterations[active] % 64 == 0
+            if refresh.any():
+                X_inv_a[refresh] = LA.inv(np.einsum('mik,mk,mjk->mij', Q_a[refresh], new_u[refresh], Q_a[refresh]))
+                M_a[refresh] = np.sum(Q_a[refresh] * (X_inv_a[refresh] @ Q_a[refresh]), axis=1)
+            X_inv[active] = X_inv_a
+            M[active] = M_a
+
+            active = active[err > tolerance]
+
+        self._prev_u = u
+        self.enclosure_iterations = iterations
+        return u
+
+    def enclose_points(self, points, tolerance):
+        """Encloses every point set inside an ellipse
+
+        Args:
+            points (np.ndarray): Points, shape (M, NUM_POINTS, 2)
+            tolerance (float): Tolerance for optimization error
+
+        Returns:
+            tuple: Ellipse params as in Ellipse2D.get_params, one entry per scenario
+                (semi major axes (M,), semi minor axes (M,), centers (M, 2), rotation angles (M,),
+                focal lengths (M,), focal points 1 (M, 2), focal points 2 (M, 2))
+        """
+        d = 2
+        points = points.transpose(0, 2, 1)
+        Q = np.concatenate((points, np.ones((len(points), 1, points.shape[2]))), axis=1)
+        u = self.solve_enclosure_weights(Q, tolerance)
+
+        center = np.einsum('mik,mk->mi', points, u)
+        A = (1/d) * LA.pinv(np.einsum('mik,mk,mjk->mij', points, u, points) - center[:, :, None] * center[:, None, :])
+        _, singular_values, V = LA.svd(A)
+
+        # rotation angle of rotated V as in Ellipse2D, proper rotations directly, reflections through scipy
+        rot_V = np.rot90(V, 3, axes=(1, 2))
+        rotation_angle = np.arctan2(rot_V[:, 1, 0], rot_V[:, 0, 0])
+        reflected = LA.det(rot_V) <= 0
+        if reflected.any():
+            rot_aug3_V = np.zeros((reflected.sum(), 3, 3))
+            rot_aug3_V[:, :2, :2] = rot_V[reflected]
+            rot_aug3_V[:, 2, 2] = 1
+            rotation_angle[reflected] = R.from_matrix(rot_aug3_V).as_euler('ZYX')[:, 0]
+
+        semi_minor_axis = 1 / singular_values[:, 0]**0.5
+        semi_major_axis = 1 / singular_values[:, 1]**0.5
+        focal_length = (semi_major_axis**2 - semi_minor_axis**2)**0.5
+        focal_offset = focal_length[:, None] * np.column_stack((np.cos(rotation_angle), np.sin(rotation_angle)))
+
+        return (semi_major_axis,
+                semi_minor_axis,
+                center,
+                rotation_angle,
+                focal_length,
+                center + focal_offset,
+                center - focal_offset)
+
+
+class BatchEllipseEKF:
+    """EllipseEKF of M scenarios, (M,7,3) state and (M,7,3,3) covariance predicted and corrected together.
+    Measurements are ground truth here, never occluded.
+    """
+
+    def __init__(self, num_scenarios, alpha_acc=0.1, sigma_square=0.1, R_measured=1):
+        num_channels = len(ELLIPSE_EKF_CHANNELS)
+        self.state = np.zeros((num_scenarios, num_channels, 3))
+        self.P = np.zeros((num_scenarios, num_channels, 3, 3))
+        self.alpha_acc = alpha_acc
+        self.sigma_square = sigma_square
+        self.R_measured = R_measured
+        self.filter_initialized_flag = False
+
+    def add(self, measurement, dt):
+        """Filters measurements, first call initializes the filters instead (as EllipseEKF.add)
+
+        Args:
+            measurement (np.ndarray): (M, 7) fp1_x, fp1_y, fp2_x, fp2_y, a, fpmid_x, fpmid_y per scenario
+            dt (float): Time step (s)
+        """
+        if not self.filter_initialized_flag:
+            self.state[:, :, 0] = measurement
+            self.state[:, :, 1] = (*CAR_INITIAL_VELOCITY, *CAR_INITIAL_VELOCITY, 0.0, *CAR_INITIAL_VELOCITY)
+            self.filter_initialized_flag = True
+            return
+
+        A, Q = get_singer_matrices(dt, self.alpha_acc)
+
+        # acceleration estimate is not carried over into the next prediction
+        state_est = self.state.copy()
+        state_est[:, :, 2] = 0.0
+
+        # predict
+        state_est_pre = state_est @ A.T
+        P_pre = A @ self.P @ A.T + self.sigma_square * Q
+
+        # correct, H = [1, 0, 0]
+        S = P_pre[..., 0, 0] + self.R_measured
+        K = P_pre[..., :, 0] / S[..., None]
+        self.state[:] = state_est_pre + K * (measurement - state_est_pre[..., 0])[..., None]
+        self.P[:] = P_pre - K[..., :, None] * P_pre[..., None, 0, :]
+
+    def get_estimated_state_array(self):
+        """Returns (M, 21) estimated states, rows laid out as EllipseEKF.get_estimated_state"""
+        return self.state.reshape(len(self.state), -1)
+
+
+class BatchBoundingAreaEKF:
+    """Size (S) channel of BoundingAreaEKF for M scenarios, the controller uses no other estimated rate
+    (C rate only enters with a nonzero C error, which the controller keeps at zero).
+    """
+
+    def __init__(self, num_scenarios, alpha_acc=0.1, sigma_square_width=0.1, R_width=1):
+        self.state = np.zeros((num_scenarios, 3))     # width, width_dot, width_ddot (ddot never carried over)
+        self.P = np.zeros((num_scenarios, 3, 3))
+        self.alpha_acc = alpha_acc
+        self.sigma_square_width = sigma_square_width
+        self.R_width = R_width
+        self.filter_initialized_flag = False
+
+    def add(self, width, dt):
+        """Filters size measurements, first call initializes the filters instead (as BoundingAreaEKF.add)
+
+        Args:
+            width (np.ndarray): (M,) measured size S of control area (px)
+            dt (float): Time step (s)
+        """
+        if not self.filter_initialized_flag:
+            self.state[:, 0] = width
+            self.filter_initialized_flag = True
+            return
+
+        A, Q = get_singer_matrices(dt, self.alpha_acc)
+        state_est = self.state.copy()
+        state_est[:, 2] = 0.0
+
+        # predict
+        state_est_pre = state_est @ A.T
+        P_pre = A @ self.P @ A.T + self.sigma_square_width * Q
+
+        # correct, H = [1, 0, 0]
+        S = P_pre[:, 0, 0] + self.R_width
+        K = P_pre[:, :, 0] / S[:, None]
+        self.state[:] = state_est_pre + K * (width - state_est_pre[:, 0])[:, None]
+        self.P[:] = P_pre - K[:, :, None] * P_pre[:, None, 0, :]
+
+    def get_width_dot(self):
+        """Returns (M,) estimated rate of change of S (zero until the first correction)"""
+        return self.state[:, 1]
+
+
+class BatchTrackingManager:
+    """TrackingManager of M scenarios: stacked 4 point per car enclosures, ellipse EKF and control area
+    (axis aligned bounding box of the estimated ellipse in image frame, what TrackingManager.display computes).
+    """
+
+    def __init__(self, num_scenarios):
+        self.ellipse = BatchEllipse2D(num_scenarios)
+        self.EKF = BatchEllipseEKF(num_scenarios)
+        self.bounding_area_EKF = BatchBoundingAreaEKF(num_scenarios)
+
+        self.ellipse_params_meas = None
+        self.ellipse_params_est = None
+        self.p1 = None
+        self.p2 = None
+
+    @staticmethod
+    def get_points_to_be_enclosed(car_positions):
+        """Returns 4 corners around every car, in Target.get_4_enclosing_points order
+
+        Args:
+            car_positions (np.ndarray): (M, N, 2) car positions (m)
+
+        Returns:
+            np.ndarray: (M, 4N, 2) points
+        """
+        corners = np.array([[-4, -4], [4, -4], [4, 4], [-4, 4]], dtype=np.float64)
+        return (car_positions[:, :, None, :] + corners).reshape(len(car_positions), -1, 2)
+
+    @staticmethod
+    def convert(points, cam_origins, pxm_facs):
+        """Converts (M, 2) inertial points to image frame, as TrackingManager.convert"""
+        points = (points - cam_origins) * (1, -1) / pxm_facs[:, None]
+        points = np.trunc(points) + (0, HEIGHT)
+        return points + np.array(SCREEN_CENTER) * (1, -1)
+
+    def compute(self, car_positions, cam_origins, pxm_facs, dt):
+        """Computes enclosing ellipses, focal point estimations and control areas of all scenarios
+
+        Args:
+            car_positions (np.ndarray): (M, N, 2) car positions (m)
+            cam_origins (np.ndarray): (M, 2) camera origins (m)
+            pxm_facs (np.ndarray): (M,) pixel to meters factors
+            dt (float): Time step (s)
+        """
+        self.ellipse_params_meas = self.ellipse.enclose_points(self.get_points_to_be_enclosed(car_positions),
+                                                               ELLIPSE_TOLERANCE)
+        major_axis, minor_axis, center, rotation_angle, _, fp1, fp2 = self.ellipse_params_meas
+
+        # filter focal points
+        self.EKF.add(np.column_stack((fp1, fp2, major_axis, center)), dt)
+        self.ellipse_params_est = self.EKF.get_estimated_state_array()
+
+        # axis aligned bounding box of ellipse around estimated focal points, image frame
+        semi_axes = np.trunc(np.column_stack((major_axis, minor_axis)) / pxm_facs[:, None])
+        fp1_est = self.convert(self.ellipse_params_est[:, [0, 3]], cam_origins, pxm_facs)
+        fp2_est = self.convert(self.ellipse_params_est[:, [6, 9]], cam_origins, pxm_facs)
+        h, k = ((fp1_est + fp2_est) // 2).T
+        a, b = semi_axes.T
+
+        t_x = np.arctan((-b / a) * np.tan(rotation_angle))
+        t_y = np.arctan((b / a) / (np.tan(rotation_angle) + 1e-16))
+        cos_phi, sin_phi = np.cos(rotation_angle), np.sin(rotation_angle)
+
+        x1 = h + a * cos_phi * np.cos(t_x % tau) - b * sin_phi * np.sin(t_x % tau)
+        x2 = h + a * cos_phi * np.cos((t_x + pi) % tau) - b * sin_phi * np.sin((t_x + pi) % tau)
+        y1 = k + a * sin_phi * np.cos(t_y % tau) + b * cos_phi * np.sin(t_y % tau)
+        y2 = k + a * sin_phi * np.cos((t_y + pi) % tau) + b * cos_phi * np.sin((t_y + pi) % tau)
+
+        self.p1 = np.column_stack((np.minimum(x1, x2), np.minimum(y1, y2)))
+        self.p2 = np.column_stack((np.maximum(x1, x2), np.maximum(y1, y2)))
+
+
+class BatchController:
+    """Controller of M scenarios, Controller.generate_acceleration evaluated on (M,) arrays.
+    Per scenario gains, P controller and altitude hold flags are arrays, branches become masks.
+    """
+
+    # gains of the altitude controller, as in Controller.generate_acceleration
+    KP_S = 0.027
+    KD_S = 0.018
+    KP_Z = 0.007
+    KD_Z = 0.0035
+    PD_R1 = 0.03
+
+    def __init__(self, gains):
+        """
+        Args:
+            gains (np.ndarray): (M, 3) controller gains K_1, K_2, K_W, one row per scenario
+        """
+        self.K_1, self.K_2, self.K_W = np.asarray(gains, dtype=np.float64).T
+        num_scenarios = len(self.K_1)
+
+        self.C_DES = np.full(num_scenarios, C_DES, dtype=np.float64)
+        self.C_BUFF = 10
+        self.S_GOOD_FLAG = np.zeros(num_scenarios, dtype=bool)
+        self.current_alt = np.full(num_scenarios, ALTITUDE, dtype=np.float64)
+        self.P_CONTROLLER_FLAG = np.zeros(num_scenarios, dtype=bool)
+        self.p_controller_end_time = np.full(num_scenarios, DELTA_TIME)
+
+    @staticmethod
+    def get_focal_point_accelerations(beta, fp1_ax, fp1_ay, fp2_ax, fp2_ay):
+        """Acceleration magnitudes and angles of focal points, axis aligned when car heading is.
+        Car heading is shared by all scenarios (ground truth), so the branch is taken once.
+        """
+        beta_deg = degrees(beta)
+        if np.isclose(abs(beta_deg), 0, atol=5):
+            return np.abs(fp1_ax), np.abs(fp2_ax), radians(0), radians(0)
+        if np.isclose(beta_deg, 90, atol=5):
+            return np.abs(fp1_ay), np.abs(fp2_ay), radians(90), radians(90)
+        if np.isclose(abs(beta_deg), 180, atol=5):
+            return np.abs(fp1_ax), np.abs(fp2_ax), radians(180), radians(180)
+        if np.isclose(beta_deg, -90, atol=5):
+            return np.abs(fp1_ay), np.abs(fp2_ay), radians(270), radians(270)
+        return (np.hypot(fp1_ax, fp1_ay), np.hypot(fp2_ax, fp2_ay),
+                np.arctan2(fp1_ay, fp1_ax), np.arctan2(fp2_ay, fp2_ax))
+
+    def generate_acceleration(self, time, dt, tracking_manager, cam_origins, drone_velocities, altitudes, beta):
+        """Acceleration commands of all scenarios
+
+        Args:
+            time (float): Simulation time (s)
+            dt (float): Time step (s)
+            tracking_manager (BatchTrackingManager): Tracking manager, after compute
+            cam_origins (np.ndarray): (M, 2) drone positions, camera origins (m)
+            drone_velocities (np.ndarray): (M, 3) drone velocities (m/s)
+            altitudes (np.ndarray): (M,) drone altitudes (m)
+            beta (float): Heading of first car (rad)
+
+        Returns:
+            np.ndarray: (M, 3) commands ax, ay, az
+        """
+        drone_pos_x, drone_pos_y = cam_origins.T
+        drone_vel_x, drone_vel_y, vz = drone_velocities.T
+        drone_speed = np.hypot(drone_vel_x, drone_vel_y)
+        drone_alpha = np.arctan2(drone_vel_y, drone_vel_x)
+
+        (fp1_x, fp1_vx, fp1_ax, fp1_y, fp1_vy, fp1_ay, fp2_x, fp2_vx, fp2_ax, fp2_y, fp2_vy, fp2_ay,
+         major_axis, _, _, _, fpm_vx, _, _, fpm_vy, _) = tracking_manager.ellipse_params_est.T
+        fpm_x = (fp1_x + fp2_x)/2
+        fpm_y = (fp1_y + fp2_y)/2
+
+        # r and θ, speed and heading of focal points
+        r1 = np.hypot(fp1_x - drone_pos_x, fp1_y - drone_pos_y)
+        r2 = np.hypot(fp2_x - drone_pos_x, fp2_y - drone_pos_y)
+        rm = np.hypot(fpm_x - drone_pos_x, fpm_y - drone_pos_y)
+        theta1 = np.arctan2(fp1_y - drone_pos_y, fp1_x - drone_pos_x)
+        theta2 = np.arctan2(fp2_y - drone_pos_y, fp2_x - drone_pos_x)
+        thetam = np.arctan2(fpm_y - drone_pos_y, fpm_x - drone_pos_x)
+        fp1_speed = np.hypot(fp1_vx, fp1_vy)
+        fp2_speed = np.hypot(fp2_vx, fp2_vy)
+        fpm_speed = np.hypot(fpm_vx, fpm_vy)
+        fp1_heading = np.arctan2(fp1_vy, fp1_vx)
+        fp2_heading = np.arctan2(fp2_vy, fp2_vx)
+        fpm_heading = np.arctan2(fpm_vy, fpm_vx)
+        fp1_acc, fp2_acc, fp1_delta, fp2_delta = self.get_focal_point_accelerations(beta, fp1_ax, fp1_ay, fp2_ax, fp2_ay)
+
+        # Vr and Vθ
+        Vr1 = fp1_speed*np.cos(fp1_heading - theta1) - drone_speed*np.cos(drone_alpha - theta1)
+        Vr2 = fp2_speed*np.cos(fp2_heading - theta2) - drone_speed*np.cos(drone_alpha - theta2)
+        Vrm = fpm_speed*np.cos(fpm_heading - thetam) - drone_speed*np.cos(drone_alpha - thetam)
+        Vtheta1 = fp1_speed*np.sin(fp1_heading - theta1) - drone_speed*np.sin(drone_alpha - theta1)
+        Vtheta2 = fp2_speed*np.sin(fp2_heading - theta2) - drone_speed*np.sin(drone_alpha - theta2)
+        Vthetam = fpm_speed*np.sin(fpm_heading - thetam) - drone_speed*np.sin(drone_alpha - thetam)
+
+        with np.errstate(all='ignore'):
+            # objective functions and derivatives, same (elementwise) expressions as Controller
+            y1, y2 = Controller.compute_objective_functions(r1, r2, Vr1, Vr2, Vtheta1, Vtheta2, major_axis, rm, Vrm, Vthetam)
+            dy1dVr1, dy1dVtheta1, dy1dVr2, dy1dVtheta2, dy2dVr1, dy2dVtheta1 = Controller.compute_y1_y2_derivative(
+                r1, r2, Vr1, Vr2, Vtheta1, Vtheta2, major_axis)
+
+            K1 = np.where(y1 >= 0, self.K_1, 0.0)
+            K2 = self.K_2
+            w = self.K_W
+
+            f1dt1 = fp1_delta - theta1
+            f2dt2 = fp2_delta - theta2
+            dalt1 = drone_alpha - theta1
+            dalt2 = drone_alpha - theta2
+            t1t2 = theta1 - theta2
+            cf1dt1, sf1dt1 = np.cos(f1dt1), np.sin(f1dt1)
+            cf2dt2, sf2dt2 = np.cos(f2dt2), np.sin(f2dt2)
+            cdalt1, sdalt1 = np.cos(dalt1), np.sin(dalt1)
+            cdalt2, sdalt2 = np.cos(dalt2), np.sin(dalt2)
+            ct1t2, st1t2 = np.cos(t1t2), np.sin(t1t2)
+            cdalf1d = np.cos(drone_alpha - fp1_delta)
+            dalf1dmt1t2 = drone_alpha + fp1_delta - theta1 - theta2
+            dalf2dmt1t2 = drone_alpha + fp2_delta - theta1 - theta2
+            dalmf1dt1mt2 = drone_alpha - fp1_delta + theta1 - theta2
+            dalmf2dmt1t2 = drone_alpha - fp2_delta - theta1 + theta2
+            cdalf1dmt1t2, sdalf1dmt1t2 = np.cos(dalf1dmt1t2), np.sin(dalf1dmt1t2)
+            cdalf2dmt1t2, sdalf2dmt1t2 = np.cos(dalf2dmt1t2), np.sin(dalf2dmt1t2)
+            cdalmf1dt1mt2, sdalmf1dt1mt2 = np.cos(dalmf1dt1mt2), np.sin(dalmf1dt1mt2)
+            cdalmf2dmt1t2, sdalmf2dmt1t2 = np.cos(dalmf2dmt1t2), np.sin(dalmf2dmt1t2)
+            denom_sub = dy1dVtheta1*dy2dVr1 - dy1dVr1*dy2dVtheta1
+            y1vt1dy2vr1 = dy1dVtheta2*dy2dVr1
+            y1vr2dy2vt1 = dy1dVr2*dy2dVtheta1
+            y1vr2dy2vr1 = dy1dVr2*dy2dVr1
+            y1vt2dy2vt1 = dy1dVtheta2*dy2dVtheta1
+            denom = denom_sub + (y1vt1dy2vr1 - y1vr2dy2vt1)*ct1t2 - (y1vr2dy2vr1 + y1vt2dy2vt1)*st1t2
+
+            # nonlinear control law
+            a_lat_law = -(
+                (K2*y2 + fp1_acc*dy2dVr1*cf1dt1 + fp1_acc*dy2dVtheta1*sf1dt1)
+                *(dy1dVr1*cdalt1 + dy1dVr2*cdalt2 + dy1dVtheta1*sdalt1 + dy1dVtheta2*sdalt2)
+                - (dy2dVr1*cdalt1 + dy2dVtheta1*sdalt1)
+                *(-K1*w + K1*y1 + fp1_acc*dy1dVr1*cf1dt1 + fp2_acc*dy1dVr2*cf2dt2
+                  + fp1_acc*dy1dVtheta1*sf1dt1 + fp2_acc*dy1dVtheta2*sf2dt2)
+                ) / denom
+            a_long_law = (1/2)*(
+                2*fp1_acc*denom_sub*cdalf1d
+                + 2*(dy2dVtheta1*K1*(w - y1) + dy1dVtheta1*K2*y2)*cdalt1
+                + 2*dy1dVtheta2*K2*y2*cdalt2
+                - 2*dy2dVr1*K1*w*sdalt1
+                + 2*dy2dVr1*K1*y1*sdalt1
+                - 2*dy1dVr1*K2*y2*sdalt1
+                - 2*dy1dVr2*K2*y2*sdalt2
+                + y1vt1dy2vr1*fp1_acc*cdalf1dmt1t2
+                + y1vr2dy2vt1*fp1_acc*cdalf1dmt1t2
+                + y1vt1dy2vr1*fp1_acc*cdalmf1dt1mt2
+                - y1vr2dy2vt1*fp1_acc*cdalmf1dt1mt2
+                - y1vr2dy2vr1*fp1_acc*sdalf1dmt1t2
+                + y1vt2dy2vt1*fp1_acc*sdalf1dmt1t2
+                - y1vr2dy2vr1*fp1_acc*sdalmf1dt1mt2
+                - y1vt2dy2vt1*fp1_acc*sdalmf1dt1mt2
+                - y1vt1dy2vr1*fp2_acc*cdalf2dmt1t2
+                - y1vr2dy2vt1*fp2_acc*cdalf2dmt1t2
+                + y1vt1dy2vr1*fp2_acc*cdalmf2dmt1t2
+                - y1vr2dy2vt1*fp2_acc*cdalmf2dmt1t2
+                + y1vr2dy2vr1*fp2_acc*sdalf2dmt1t2
+                - y1vt2dy2vt1*fp2_acc*sdalf2dmt1t2
+                + y1vr2dy2vr1*fp2_acc*sdalmf2dmt1t2
+                + y1vt2dy2vt1*fp2_acc*sdalmf2dmt1t2
+                ) / denom
+
+        # P controller (speed and heading matching) while starting up, near singular law or when Vr1 > 0
+        in_front = np.abs(np.arctan2(np.sin(drone_alpha - theta1), np.cos(drone_alpha - theta1))) < pi/2
+        theta_from_alpha = np.arctan2(np.sin(theta1 - drone_alpha), np.cos(theta1 - drone_alpha))
+        e_speed = fp1_speed - drone_speed
+        e_heading = np.arctan2(np.sin(fp1_heading - drone_alpha), np.cos(fp1_heading - drone_alpha))
+        a_lat_p = 10*e_heading + np.where(r1 - 5 > 0, 0.3*theta_from_alpha, 0.0)
+        a_long_p = 0.2*e_speed + np.where(in_front, 1, -1) * self.PD_R1*(r1 - 5)
+
+        start_p = ~self.P_CONTROLLER_FLAG & (np.abs(denom) < 1000)
+        hold_p = self.P_CONTROLLER_FLAG & (time < self.p_controller_end_time)
+        use_p = start_p | hold_p | (Vr1 > 0)
+        self.p_controller_end_time = np.where(start_p, time + 2.0, self.p_controller_end_time)
+        self.P_CONTROLLER_FLAG = start_p | (self.P_CONTROLLER_FLAG & use_p)
+
+        a_lat = np.clip(np.where(use_p, a_lat_p, a_lat_law), -10, 10)
+        a_long = np.clip(np.where(use_p, a_long_p, a_long_law), -10, 10)
+
+        # ax and ay
+        delta = drone_alpha + pi / 2
+        ax = a_lat * np.cos(delta) + a_long * np.cos(drone_alpha)
+        ay = a_lat * np.sin(delta) + a_long * np.sin(drone_alpha)
+
+        # control area size S and its filtered rate, altitude
+        (x_min, y_min), (x_max, y_max) = tracking_manager.p1.T, tracking_manager.p2.T
+        S = np.hypot(x_max - x_min, y_max - y_min)
+        tracking_manager.bounding_area_EKF.add(S, dt)
+        S_dot = tracking_manager.bounding_area_EKF.get_width_dot()
+        self.C_DES = HEIGHT*((250 + altitudes)/2000)
+        e_Z_W = np.where(np.abs(Z_DES - altitudes) > Z_DELTA, Z_DES - altitudes, 0.0)
+
+        return np.column_stack((ax, ay, self.generate_altitude_acceleration(S, S_dot, e_Z_W, vz, altitudes)))
+
+    def generate_altitude_acceleration(self, S, S_dot, e_Z_W, vz, altitudes):
+        """Altitude acceleration command az of all scenarios, S and altitude hold as in Controller
+        (C error is kept at zero there, so az_c is zero)
+
+        Args:
+            S (np.ndarray): (M,) control area sizes (px)
+            S_dot (np.ndarray): (M,) estimated rates of change of S (px/s)
+            e_Z_W (np.ndarray): (M,) altitude errors outside the altitude band, else 0 (m)
+            vz (np.ndarray): (M,) drone vertical velocities (m/s)
+            altitudes (np.ndarray): (M,) drone altitudes (m)
+
+        Returns:
+            np.ndarray: (M,) az
+        """
+        in_band = e_Z_W == 0.0
+        e_s_raw = S_DES - S
+
+        # S good flag turns bad only close to bounds, turns good only close to set point
+        turns_bad = in_band & self.S_GOOD_FLAG & (np.abs(e_s_raw) > S_DELTA)
+        turns_good = in_band & ~self.S_GOOD_FLAG & (np.abs(e_s_raw) < 0.25*S_DELTA) & (S_DES > S)
+        holding = in_band & self.S_GOOD_FLAG & ~turns_bad
+        self.S_GOOD_FLAG = (self.S_GOOD_FLAG & ~turns_bad) | turns_good
+        self.current_alt = np.where(turns_good, altitudes, self.current_alt)
+        e_s = np.where(holding | turns_good, 0.0, e_s_raw)
+
+        az_s = np.where(in_band & ~self.S_GOOD_FLAG, -self.KP_S*e_s + self.KD_S*S_dot, 0.0)
+        az_z = np.where(in_band, 0.0, self.KP_Z*e_Z_W - self.KD_Z*vz)
+        az_z = np.where(self.S_GOOD_FLAG & in_band, 0.84*(self.current_alt - altitudes) + 0.42*(-vz), az_z)
+
+        # largest magnitude of (az_s, az_c, az_z), first on ties
+        a = np.column_stack((az_s, np.zeros_like(az_s), az_z))
+        az = a[np.arange(len(a)), np.argmax(np.abs(a), axis=1)]
+        return np.clip(az, -10, 10)
+
+
+class BatchSimulator:
+    """Steps M independent ground truth scenarios (one drone following cars each) together.
+    Scenarios differ in controller gains and optionally in initial car positions.
+    """
+
+    # per step history recorded for every scenario
+    HISTORY_FIELDS = ('S', 'C', 'C_DES', 'ALTITUDE', 'DRONE_SPEED', 'CARS_IN_VIEW', 'CENTER_OFFSET')
+
+    def __init__(self, gains, car_positions=None, car_velocities=None, car_trajectories=None, dt=DELTA_TIME,
+                 vectorized=True):
+        """
+        Args:
+            gains (array_like): (M, 3) controller gains K_1, K_2, K_W, one row per scenario
+            car_positions (array_like, optional): (N, 2) or (M, N, 2) initial car positions (m). Defaults to settings.
+            car_velocities (array_like, optional): (N, 2) initial car velocities (m/s). Defaults to settings.
+            car_trajectories (tuple, optional): Trajectory per car. Defaults to the simulator's (squircle).
+            dt (float, optional): Step size (s). Defaults to DELTA_TIME.
+            vectorized (bool, optional): Tracking manager and controller vectorized across scenarios,
+                else one TrackingManager and Controller per scenario. Defaults to True.
+        """
+        self.gains = np.atleast_2d(np.asarray(gains, dtype=np.float64))
+        self.num_scenarios = len(self.gains)
+        self.dt = dt
+        self.time = 0.0
+        self.num_steps = 0
+
+        if car_positions is None:
+            car_positions = (CAR_INITIAL_POSITION, CAR_INITIAL_POSITION_2, CAR_INITIAL_POSITION_3)
+        if car_velocities is None:
+            car_velocities = (CAR_INITIAL_VELOCITY, CAR_INITIAL_VELOCITY_2, CAR_INITIAL_VELOCITY_3)
+        if car_trajectories is None:
+            car_trajectories = (SQUIRCLE_TRAJECTORY,) * len(car_velocities)
+        car_velocities = np.asarray(car_velocities, dtype=np.float64)
+        self.num_cars = len(car_velocities)
+
+        # cars, one kinematics instance per car shared by scenarios, positions stacked per scenario
+        self.clock = SimpleNamespace(time=0.0, dt=0.0)
+        self.cars = [CarKinematics(self.clock, 0.0, 0.0, *vel, *CAR_ACCELERATION, traj=traj)
+                     for vel, traj in zip(car_velocities, car_trajectories)]
+
+        # world frame as in Simulator, where initial camera motion compensation puts the drone at origin
+        car_positions = np.asarray(car_positions, dtype=np.float64) - np.asarray(DRONE_POSITION)
+        self.car_positions = np.broadcast_to(car_positions, (self.num_scenarios, self.num_cars, 2)).copy()
+
+        # quadrotor states (pN, pE, pH, u, v, w, φ, θ, ψ, p, q, r), pN and pE are displacement within a step
+        self.quad_states = np.zeros((self.num_scenarios, 12))
+        self.quad_states[:, 2] = ALTITUDE
+        self.quad_states[:, 3:5] = DRONE_INITIAL_VELOCITY
+        self.cam_origins = np.zeros((self.num_scenarios, 2))
+        self.drone_velocities = np.zeros((self.num_scenarios, 3))
+        self.drone_velocities[:, :2] = DRONE_INITIAL_VELOCITY
+        self.commands = np.zeros((self.num_scenarios, 3))   # ax, ay, az
+
+        self.inertia = (DRONE_MASS, DRONE_I_XX, DRONE_I_YY, DRONE_I_ZZ)
+        self.kp = np.array([K_P_PHI, K_P_THETA, K_P_PSI])
+        self.kd = np.array([K_D_PHI, K_D_THETA, K_D_PSI])
+
+        self.vectorized = vectorized
+        if self.vectorized:
+            self.tracking_manager = BatchTrackingManager(self.num_scenarios)
+            self.controller = BatchController(self.gains)
+        else:
+            self.scenarios = [ScenarioManager(self.clock, self.num_cars, *gains) for gains in self.gains]
+
+        self.history = {name: [] for name in ('TIME',) + self.HISTORY_FIELDS}
+
+    def compute_wrenches(self):
+        """Computes wrench (F, τφ, τθ, τψ) of all drones from their acceleration commands, as DroneCamera does
+
+        Returns:
+            np.ndarray: (M, 4) wrenches
+        """
+        ax, ay, az = self.commands.T
+        phi, theta, psi = self.quad_states[:, 6:9].T
+        rates = self.quad_states[:, 9:12]
+
+        # required force, commanded attitude
+        F = (ACC_GRAVITY - az) * (DRONE_MASS / (np.cos(phi)*np.cos(theta)))
+        attitude_c = np.stack((np.arctan(ay * np.cos(theta) / (ACC_GRAVITY - az)),
+                               np.arctan(ax / (az - ACC_GRAVITY)),
+                               np.zeros_like(psi)), axis=1)
+
+        # required torque
+        ang_err = attitude_c - self.quad_states[:, 6:9]
+        torques = self.kp * np.sign(ang_err) * (np.abs(ang_err) % tau) - self.kd * rates
+
+        return np.column_stack((F, torques))
+
+    def step_physics(self):
+        """Advances cars and drones of all scenarios by one step
+        """
+        self.time += self.dt
+        self.clock.time = self.time
+        self.clock.dt = self.dt
+
+        # cars
+        for car in self.cars:
+            car.update_kinematics()
+        car_velocities = np.array([car.velocity for car in self.cars])
+        self.car_positions += car_velocities * self.dt
+        self.car_velocities = car_velocities
+
+        # drones, integrate displacement from camera origin then move origin (camera motion compensation)
+        wrenches = self.compute_wrenches()
+        self.quad_states[:, :2] = 0.0
+        integrate_quadrotor_rk4_batch(self.quad_states, wrenches, ACC_GRAVITY, *self.inertia,
+                                      self.dt / DRONE_RK4_INNER_STEPS, DRONE_RK4_INNER_STEPS)
+        self.cam_origins += self.quad_states[:, :2]
+        self.drone_velocities = body_to_inertial_velocity_batch(self.quad_states)
+
+    def step_control(self):
+        """Runs tracking manager and controller of every scenario with true kinematics, stores commands
+        """
+        altitudes = self.quad_states[:, 2]
+        pxm_facs = altitudes * PIXEL_SIZE / FOCAL_LENGTH
+        car_beta = atan2(self.car_velocities[0, 1], self.car_velocities[0, 0])
+
+        if self.vectorized:
+            self.tracking_manager.compute(self.car_positions, self.cam_origins, pxm_facs, self.dt)
+            self.commands[:] = self.controller.generate_acceleration(self.time, self.dt, self.tracking_manager,
+                                                                     self.cam_origins, self.drone_velocities,
+                                                                     altitudes, car_beta)
+            return
+
+        for i, scenario in enumerate(self.scenarios):
+            scenario.simulator.time = self.time
+            scenario.simulator.dt = self.dt
+            scenario.simulator.pxm_fac = pxm_facs[i]
+            scenario.simulator.camera.altitude = altitudes[i]
+            scenario.simulator.camera.vz = self.drone_velocities[i, 2]
+            scenario.cam_origin = tuple(self.cam_origins[i])
+            scenario.drone_velocity = tuple(self.drone_velocities[i, :2])
+            for target, position in zip(scenario.targets, self.car_positions[i]):
+                target.x_est, target.y_est = position
+                target.beta_est = car_beta
+
+            self.commands[i] = scenario.generate_acceleration()
+
+    def record(self):
+        """Appends per scenario metrics of current step to history
+        """
+        if self.vectorized:
+            (x_min, y_min), (x_max, y_max) = self.tracking_manager.p1.T, self.tracking_manager.p2.T
+            C_des = self.controller.C_DES.copy()
+        else:
+            (x_min, y_min), (x_max, y_max) = np.array([(scenario.tracking_manager.p1, scenario.tracking_manager.p2)
+                                                       for scenario in self.scenarios],
+                                                      dtype=np.float64).transpose(1, 2, 0)
+            C_des = np.array([scenario.controller.C_DES for scenario in self.scenarios], dtype=np.float64)
+        S = np.hypot(x_max - x_min, y_max - y_min)
+        C = np.maximum(np.abs((WIDTH - x_min - x_max)/2), np.abs(HEIGHT - y_min - y_max)/2)
+
+        # cars in camera field of view (camera centered at origin)
+        altitudes = self.quad_states[:, 2]
+        half_fov = np.stack((WIDTH, HEIGHT)) / 2 * (altitudes * PIXEL_SIZE / FOCAL_LENGTH)[:, None]
+        rel_positions = self.car_positions - self.cam_origins[:, None, :]
+        cars_in_view = (np.abs(rel_positions) <= half_fov[:, None, :]).all(axis=2).sum(axis=1)
+
+        self.history['TIME'].append(self.time)
+        self.history['S'].append(S)
+        self.history['C'].append(C)
+        self.history['C_DES'].append(C_des)
+        self.history['ALTITUDE'].append(altitudes.copy())
+        self.history['DRONE_SPEED'].append(np.hypot(self.drone_velocities[:, 0], self.drone_velocities[:, 1]))
+        self.history['CARS_IN_VIEW'].append(cars_in_view)
+        self.history['CENTER_OFFSET'].append(np.hypot(*rel_positions.mean(axis=1).T))
+
+    def run(self, final_time=FINAL_TIME):
+        """Runs all scenarios up to final time
+
+        Args:
+            final_time (float, optional): Simulated time (s). Defaults to FINAL_TIME.
+
+        Returns:
+            dict: History, 'TIME' (T,) and (T, M) arrays for HISTORY_FIELDS
+        """
+        while self.time + self.dt <= final_time + 1e-9:
+            self.step_physics()
+            # first frame initializes tracking in the full experiment, control begins from the next one
+            if self.num_steps > 0:
+                self.step_control()
+                self.record()
+            self.num_steps += 1
+
+        return self.get_history()
+
+    def get_history(self):
+        """Returns recorded history as arrays
+
+        Returns:
+            dict: 'TIME' (T,) and (T, M) arrays for HISTORY_FIELDS
+        """
+        return {name: np.array(values) for name, values in self.history.items()}
+
+    def get_summary(self):
+        """Computes objective metrics per scenario
+
+        Returns:
+            np.recarray: (M,) records with gains and metrics
+        """
+        history = self.get_history()
+        num_samples = max(len(history['TIME']), 1)
+        dtype = [('K_1', '<f8'), ('K_2', '<f8'), ('K_W', '<f8'),
+                 ('TIME_IN_C_DES', '<f8'),      # fraction of time control area is within C_DES
+                 ('TIME_ALL_IN_VIEW', '<f8'),   # fraction of time all cars are in camera field of view
+                 ('MEAN_S_ERROR', '<f8'),       # mean |S_DES - S| (px)
+                 ('MEAN_CENTER_OFFSET', '<f8'), # mean distance of car centroid from camera center (m)
+                 ('FINAL_ALTITUDE', '<f8')]
+        summary = np.zeros(self.num_scenarios, dtype=dtype).view(np.recarray)
+        summary.K_1, summary.K_2, summary.K_W = self.gains.T
+        if len(history['TIME']) == 0:
+            return summary
+
+        summary.TIME_IN_C_DES = (history['C'] <= history['C_DES']).sum(axis=0) / num_samples
+        summary.TIME_ALL_IN_VIEW = (history['CARS_IN_VIEW'] == self.num_cars).sum(axis=0) / num_samples
+        summary.MEAN_S_ERROR = np.abs(S_DES - history['S']).mean(axis=0)
+        summary.MEAN_CENTER_OFFSET = history['CENTER_OFFSET'].mean(axis=0)
+        summary.FINAL_ALTITUDE = history['ALTITUDE'][-1]
+
+        return summary
+
+
+def format_summary(summary):
+    """Formats batch summary as a table
+
+    Args:
+        summary (np.recarray): Summary from BatchSimulator.get_summary
+
+    Returns:
+        str: Table, one row per scenario
+    """
+    names = summary.dtype.names
+    lines = [' '.join(f'{name:>18}' for name in names)]
+    for row in summary:
+        lines.append(' '.join(f'{value:18.4f}' for value in row))
+    return '\n'.join(lines)
+
+
+def main():
+    # small gain grid around settings, short horizon
+    k1_values = K_1 * np.array([0.5, 1.0, 2.0])
+    k2_values = K_2 * np.array([0.5, 1.0, 2.0])
+    gains = [(k1, k2, K_W) for k1 in k1_values for k2 in k2_values]
+    final_time = 5.0
+
+    batch = BatchSimulator(gains)
+    t_start = time.perf_counter()
+    batch.run(final_time)
+    elapsed = time.perf_counter() - t_start
+
+    print(format_summary(batch.get_summary()))
+    print(f'\n{len(gains)} scenarios x {final_time:0.1f} s simulated in {elapsed:0.2f} s wall time ' +
+          f'[{len(gains) * final_time / elapsed:0.1f} scenario seconds per wall second]')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,21 @@
+"""Performance benchmarks of the vision, filter and dynamics hot paths.
+
+Cases drive optical flow (Lucas-Kanade, Horn-Schunck, Farneback), keypoint patch template matching and
+images_assemble on synthetic (utils.data_synth_utils) or datasets/ frames at several resolutions,
+Ellipse2D.enclose_points (reference and fast path), TargetEKF and EllipseEKF with several target counts,
+DroneCamera.update_kinematics, quadrotor RK4 integration (reference and kernel), and MultiTracker inside
+a headless seeded experiment.
+Feature backends (SIFT, ORB, FAST/BRIEF) are compared on the same run with occlusion bars, for cost
+and re-acquisition. Latency percentiles, throughput and peak allocations are reported and stored as
+JSON, to be compared across commits. Run from vbot/experiments:
+    python -m exp_mot_sf_fin.benchmarks --out bench.json
+    python -m exp_mot_sf_fin.benchmarks --quick --compare bench.json
+"""
+from .harness import (BenchmarkConfig,              #pylint: disable=unused-import
+                      run_step_benchmark,
+                      make_result,
+                      save_results,
+                      load_results,
+                      format_results,
+                      compare_results)
+from .cases import BENCHMARKS
@@ -0,0 +1,100 @@
+import sys
+import time
+import argparse
+
+from .cases import BENCHMARKS, FEATURE_BACKENDS_MIN_TF
+from .frames import FRAME_SOURCES
+from .harness import BenchmarkConfig, save_results, load_results, format_results, compare_results
+
+
+def parse_resolution(text):
+    """'640x480' -> (480, 640), i.e. (height, width)"""
+    width, height = text.lower().split('x')
+    return int(height), int(width)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='exp_mot_sf_fin.benchmarks',
+                                     description='Benchmarks of vision, filter and dynamics hot paths')
+    parser.add_argument('--only',
+                        nargs='+',
+                        choices=list(BENCHMARKS),
+                        help='benchmark groups to run (default: all)')
+    parser.add_argument('--resolutions',
+                        nargs='+',
+                        type=parse_resolution,
+                        default=[(240, 320), (480, 640), (720, 1280)],
+                        metavar='WxH',
+                        help='frame sizes of image benchmarks')
+    parser.add_argument('--targets',
+                        nargs='+',
+                        type=int,
+                        default=[1, 3, 10, 30],
+                        help='target counts of filter and ellipse benchmarks')
+    parser.add_argument('--source',
+                        choices=FRAME_SOURCES,
+                        default='RubberWhale',
+                        help='frames of image benchmarks')
+    parser.add_argument('--calls',
+                        type=int,
+                        default=200,
+                        help='timed calls per case')
+    parser.add_argument('--warmup',
+                        type=int,
+                        default=10,
+                        help='untimed calls before timing')
+    parser.add_argument('--tf',
+                        type=float,
+                        default=5.0,
+                        help='simulated seconds of the experiment driving MultiTracker ' +
+                             f'(feature_backends runs at least {FEATURE_BACKENDS_MIN_TF:g} s, to reach occlusion)')
+    parser.add_argument('--no_memory',
+                        default=False,
+                        action='store_true',
+                        help='skip peak allocation measurement')
+    parser.add_argument('--quick',
+                        default=False,
+                        action='store_true',
+                        help='few calls, smallest resolutions and target counts')
+    parser.add_argument('--out',
+                        help='write results into this JSON file')
+    parser.add_argument('--compare',
+                        metavar='BASELINE_JSON',
+                        help='compare results with a previous results file')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.quick:
+        args.calls = min(args.calls, 30)
+        args.warmup = min(args.warmup, 3)
+        args.resolutions = sorted(args.resolutions)[:2]
+        args.targets = sorted(args.targets)[:2]
+        args.tf = min(args.tf, 2.0)
+
+    config = BenchmarkConfig(num_calls=args.calls,
+                             num_warmup=args.warmup,
+                             resolutions=args.resolutions,
+                             target_counts=args.targets,
+                             frame_source=args.source,
+                             memory=not args.no_memory,
+                             final_time=args.tf)
+
+    results = []
+    for name in args.only or BENCHMARKS:
+        t_start = time.perf_counter()
+        results.extend(BENCHMARKS[name](config))
+        print(f'{name} done in {time.perf_counter() - t_start:0.1f} s', file=sys.stderr)
+
+    print(format_results(results))
+    if args.out:
+        save_results(args.out, results, config)
+        print(f'\nResults written to {args.out}')
+    if args.compare:
+        print()
+        print(compare_results(load_results(args.compare), results))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
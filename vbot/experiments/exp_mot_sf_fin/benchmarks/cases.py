@@ -0,0 +1,499 @@
+import os
+import sys
+import argparse
+import tempfile
+from contextlib import redirect_stdout
+from itertools import cycle
+from types import SimpleNamespace
+
+import cv2 as cv
+import numpy as np
+import pygame
+
+from ..drone_camera import DroneCamera
+from .. import ellipse as ellipse_module
+from ..ellipse import Ellipse2D
+from ..ellipse_ekf import EllipseEKF
+from ..target_ekf import TargetEKF, TargetEKFBank
+from ..quadrotor_dynamics import integrate_quadrotor_rk4, is_jit_enabled
+from ..my_imports import (FARNEBACK_PARAMS, LK_PARAMS, MAX_NUM_CORNERS, CorrelationCoeffNormed, MultiTemplateMatcher,
+                          TemplateMatcher, compute_optical_flow_LK, compute_optical_flow_HS,
+                          compute_optical_flow_farneback, convert_to_grayscale, images_assemble)
+from ..settings import (DELTA_TIME, ELLIPSE_TOLERANCE, PIXEL_TO_METERS_FACTOR, WIDTH, HEIGHT, FEATURE_BACKENDS,
+                        TELEMETRY_FILE, NO_OCC, TOTAL_OCC, ACC_GRAVITY, DRONE_MASS, DRONE_I_XX, DRONE_I_YY,
+                        DRONE_I_ZZ, DRONE_RK4_INNER_STEPS)
+from ..sweep import compute_metrics
+from ..telemetry import load_telemetry
+from .frames import load_frame_pair, make_target_corners, make_target_tracks
+from .harness import make_result, run_step_benchmark
+from utils.img_utils import preprocess_image
+
+
+PATCH_SIZE = round(1.5 / PIXEL_TO_METERS_FACTOR)    # keypoint patch size used by the tracker
+SEARCH_SIZE = 8 * PATCH_SIZE                        # side of the bounding box patches are searched in
+HS_NUM_ITER = 32            # Horn-Schunck iterations per call
+LK_MAX_CORNERS = 500        # points tracked per Lucas-Kanade call
+NUM_TRACK_FRAMES = 1000     # frames of synthetic target tracks cycled through by filter and ellipse cases
+FEATURE_BACKENDS_MIN_TF = 20.0  # simulated seconds, seeded run first meets occlusion bars at about 6 s
+
+
+def get_resolution_name(resolution):
+    return f'{resolution[1]}x{resolution[0]}'
+
+
+def bench_optical_flow(config):
+    """Lucas-Kanade (tracker parameters, precomputed corners), Horn-Schunck and Farneback on frame pairs"""
+    results = []
+    for resolution in config.resolutions:
+        frame_1, frame_2 = load_frame_pair(config.frame_source, resolution)
+        gray_1, gray_2 = convert_to_grayscale(frame_1), convert_to_grayscale(frame_2)
+        params = {'resolution': get_resolution_name(resolution), 'source': config.frame_source}
+
+        pts_1 = cv.goodFeaturesToTrack(gray_1, maxCorners=LK_MAX_CORNERS, qualityLevel=0.01, minDistance=5)
+        if pts_1 is not None:
+            results.append(run_step_benchmark(
+                'optical_flow_lk', params,
+                lambda: lambda: compute_optical_flow_LK(gray_1, gray_2, pts_1=pts_1, lk_params=LK_PARAMS),
+                config, items=len(pts_1)))
+
+        float_1, float_2 = preprocess_image(frame_1), preprocess_image(frame_2)
+        results.append(run_step_benchmark(
+            'optical_flow_hs', {**params, 'iterations': HS_NUM_ITER},
+            lambda: lambda: compute_optical_flow_HS(float_1, float_2, num_iter=HS_NUM_ITER),
+            config, num_calls=max(3, config.num_calls // 20)))
+
+        results.append(run_step_benchmark(
+            'optical_flow_farneback', params,
+            lambda: lambda: compute_optical_flow_farneback(gray_1, gray_2, FARNEBACK_PARAMS),
+            config, num_calls=max(3, config.num_calls // 5)))
+    return results
+
+
+def bench_images_assemble(config):
+    """Side by side assembly of simulator and tracker frames, as written by the frame writer"""
+    results = []
+    for resolution in config.resolutions:
+        frame_1, frame_2 = load_frame_pair(config.frame_source, resolution)
+        results.append(run_step_benchmark(
+            'images_assemble', {'resolution': get_resolution_name(resolution), 'grid': '1x2'},
+            lambda: lambda: images_assemble([frame_1, frame_2], (1, 2)),
+            config))
+    return results
+
+
+def bench_template_match(config):
+    """Keypoint patches located in a bounding box of the next frame: a TemplateMatcher per patch against
+    one MultiTemplateMatcher (color, gray, gray on pyramid level 1)
+    """
+    results = []
+    for resolution in config.resolutions:
+        frame_1, frame_2 = load_frame_pair(config.frame_source, resolution)
+        height, width = resolution
+        size = min(SEARCH_SIZE, height, width)
+        bb = ((width - size) // 2, (height - size) // 2, size, size)
+
+        # patches around corners of the search region of the first frame
+        gray_1 = convert_to_grayscale(frame_1)
+        x, y, w, h = bb
+        margin = PATCH_SIZE // 2 + 1
+        corners = cv.goodFeaturesToTrack(gray_1[y+margin:y+h-margin, x+margin:x+w-margin],
+                                         maxCorners=MAX_NUM_CORNERS, qualityLevel=0.01, minDistance=5)
+        if corners is None:
+            continue
+        centers = corners.reshape(-1, 2).astype(int) + (x + margin, y + margin)
+        patches = [frame_1[cy-PATCH_SIZE//2:cy-PATCH_SIZE//2+PATCH_SIZE, cx-PATCH_SIZE//2:cx-PATCH_SIZE//2+PATCH_SIZE].copy()
+                   for cx, cy in centers]
+        params = {'resolution': get_resolution_name(resolution), 'patches': len(patches), 'search': size}
+
+        def setup_single():
+            matchers = [TemplateMatcher(patch, CorrelationCoeffNormed()) for patch in patches]
+            return lambda: [(matcher.find_template_center_in_image_bb(frame_2, bb), matcher.get_best_match_score())
+                            for matcher in matchers]
+
+        results.append(run_step_benchmark('template_match_single', params, setup_single, config, items=len(patches)))
+        for variant, use_gray, pyramid_levels in (('color', False, 0), ('gray', True, 0), ('gray_pyr1', True, 1)):
+            matcher = MultiTemplateMatcher(patches, use_gray=use_gray, pyramid_levels=pyramid_levels)
+            results.append(run_step_benchmark(
+                'template_match_multi', {**params, 'variant': variant},
+                lambda: lambda: matcher.find_template_centers_in_image_bb(frame_2, bb),
+                config, items=len(patches)))
+    return results
+
+
+def enclose_frames(frames, fast):
+    """Encloses corners of every frame with one (warm-started) ellipse, using the fast or reference enclosure.
+
+    Returns:
+        tuple(np.ndarray, np.ndarray): semi axes (len(frames), 2), enclosure iterations (len(frames),)
+    """
+    fast_flag = ellipse_module.ELLIPSE_FAST_ENCLOSURE
+    ellipse_module.ELLIPSE_FAST_ENCLOSURE = fast
+    try:
+        ellipse = Ellipse2D()
+        axes = []
+        iterations = []
+        for points in frames:
+            axes.append(ellipse.enclose_points(points, ELLIPSE_TOLERANCE)[:2])
+            iterations.append(ellipse.enclosure_iterations)
+    finally:
+        ellipse_module.ELLIPSE_FAST_ENCLOSURE = fast_flag
+    return np.array(axes), np.array(iterations)
+
+
+def bench_enclose_points(config):
+    """Ellipse2D.enclose_points on corners of targets moving smoothly, warm-started frame after frame.
+    Reference iteration and fast path (ELLIPSE_FAST_ENCLOSURE) are both timed, metrics give mean iterations
+    per call and the semi axes difference of each path relative to the reference solution.
+    """
+    results = []
+    for num_targets in config.target_counts:
+        # corners of a single target form a square, enclosing circle has no defined rotation
+        if num_targets < 2:
+            continue
+        frames = make_target_corners(NUM_TRACK_FRAMES, num_targets)
+        reference_axes, _ = enclose_frames(frames, 0)
+
+        for enclosure, fast in (('reference', 0), ('fast', 1)):
+            def setup():
+                ellipse = Ellipse2D()
+                frames_iter = cycle(frames)
+                return lambda: ellipse.enclose_points(next(frames_iter), ELLIPSE_TOLERANCE)
+
+            fast_flag = ellipse_module.ELLIPSE_FAST_ENCLOSURE
+            ellipse_module.ELLIPSE_FAST_ENCLOSURE = fast
+            try:
+                result = run_step_benchmark('enclose_points', {'targets': num_targets, 'enclosure': enclosure},
+                                            setup, config)
+            finally:
+                ellipse_module.ELLIPSE_FAST_ENCLOSURE = fast_flag
+
+            axes, iterations = enclose_frames(frames, fast)
+            rel_diff = np.abs(axes - reference_axes) / np.abs(reference_axes)
+            result['metrics'] = {'MEAN_ITERATIONS': float(iterations.mean()),
+                                 'AXES_REL_DIFF_MEAN': float(rel_diff.mean()),
+                                 'AXES_REL_DIFF_MAX': float(rel_diff.max())}
+            results.append(result)
+    return results
+
+
+def bench_target_ekf(config):
+    """Target EKFs sharing a bank: add measurements of all targets, one batched bank step, collect estimations"""
+    manager = SimpleNamespace(get_sim_dt=lambda: DELTA_TIME)
+    results = []
+    for num_targets in config.target_counts:
+        positions, velocities = make_target_tracks(NUM_TRACK_FRAMES, num_targets, DELTA_TIME)
+        measurements = (positions + np.random.default_rng(1).normal(0, 0.1, positions.shape)).tolist()
+
+        def setup():
+            bank = TargetEKFBank(manager)
+            filters = [TargetEKF(manager, bank=bank) for _ in range(num_targets)]
+            for ekf, (x, y), (vx, vy) in zip(filters, positions[0].tolist(), velocities[0].tolist()):
+                ekf.initialize_filter(x, y, vx, vy)
+            frames_iter = cycle(measurements)
+
+            def step():
+                for ekf, (x, y) in zip(filters, next(frames_iter)):
+                    ekf.add_measurement(x, y)
+                bank.step()
+                for ekf in filters:
+                    ekf.collect_estimations()
+            return step
+
+        results.append(run_step_benchmark('target_ekf', {'targets': num_targets}, setup, config, items=num_targets))
+    return results
+
+
+def bench_ellipse_ekf(config):
+    """EllipseEKF predict and correct of all channels, measurements from enclosing ellipses of 3 targets"""
+    manager = SimpleNamespace(get_sim_dt=lambda: DELTA_TIME)
+    ellipse = Ellipse2D()
+    measurements = []
+    for points in make_target_corners(NUM_TRACK_FRAMES // 4, 3):
+        params = ellipse.enclose_points(points, ELLIPSE_TOLERANCE)
+        fp_1, fp_2 = params[5], params[6]
+        measurements.append((fp_1[0], fp_1[1], fp_2[0], fp_2[1], params[0],
+                             (fp_1[0] + fp_2[0]) / 2, (fp_1[1] + fp_2[1]) / 2))
+
+    def setup():
+        ekf = EllipseEKF(manager, None)
+        frames_iter = cycle(measurements)
+        return lambda: ekf.add(*next(frames_iter))
+
+    return [run_step_benchmark('ellipse_ekf', {'channels': 7}, setup, config)]
+
+
+def bench_drone_kinematics(config):
+    """DroneCamera.update_kinematics (attitude control, RK4 integration) under varying acceleration commands"""
+    accelerations = (np.random.default_rng(0).uniform(-2, 2, size=(NUM_TRACK_FRAMES, 3))).tolist()
+
+    def setup():
+        # minimal simulator, drone sprite needs groups and an image
+        image = pygame.Surface((8, 8), pygame.SRCALPHA)
+        simulator = SimpleNamespace(all_sprites=pygame.sprite.Group(),
+                                    drone_sprites=pygame.sprite.Group(),
+                                    drone_img_rect=(image, image.get_rect()),
+                                    pxm_fac=PIXEL_TO_METERS_FACTOR,
+                                    dt=DELTA_TIME)
+        drone = DroneCamera(simulator)
+        commands = cycle(accelerations)
+
+        def step():
+            drone.apply_accleration_command(*next(commands))
+            drone.update_kinematics()
+        return step
+
+    return [run_step_benchmark('drone_update_kinematics', {'numba': is_jit_enabled()}, setup, config)]
+
+
+def make_wrenches(num_frames, seed=0):
+    """Returns slowly varying wrenches (F, τφ, τθ, τψ) near hover, shape (num_frames, 4)"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(num_frames)[:, None] * DELTA_TIME
+    amplitude = np.array([[0.5, 0.05, 0.05, 0.01]])
+    phase = rng.uniform(0, np.pi, size=(1, 4))
+    wrenches = amplitude * np.sin(0.7 * t + phase)
+    wrenches[:, 0] += DRONE_MASS * ACC_GRAVITY
+    return wrenches
+
+
+def make_rk4_reference_step():
+    """Returns one frame of the former DroneCamera.update_kinematics inner loop (DroneCamera.eval_state_dot,
+    new arrays every evaluation), state -> state
+    """
+    # mimic DroneCamera attributes eval_state_dot depends on
+    inertia = SimpleNamespace(m=DRONE_MASS, Ixx=DRONE_I_XX, Iyy=DRONE_I_YY, Izz=DRONE_I_ZZ)
+    drone = SimpleNamespace(g=ACC_GRAVITY, INERTIA=inertia)
+    inner_loop_rate = DRONE_RK4_INNER_STEPS / DELTA_TIME
+
+    def step(state, wrench):
+        state = np.array(state)
+        for _ in range(DRONE_RK4_INNER_STEPS):
+            k1 = DroneCamera.eval_state_dot(drone, state, wrench)
+            k2 = DroneCamera.eval_state_dot(drone, state + k1*(1/(2*inner_loop_rate)), wrench)
+            k3 = DroneCamera.eval_state_dot(drone, state + k2*(1/(2*inner_loop_rate)), wrench)
+            k4 = DroneCamera.eval_state_dot(drone, state + k3*(1/(inner_loop_rate)), wrench)
+            state = state + (k1 + 2*k2 + 2*k3 + k4) * (1/(6*inner_loop_rate))
+        return state
+    return step
+
+
+def make_rk4_kernel_step(kernel):
+    """Returns one frame of quadrotor_dynamics.integrate_quadrotor_rk4 (python or compiled kernel), state -> state"""
+    inertia = (DRONE_MASS, DRONE_I_XX, DRONE_I_YY, DRONE_I_ZZ)
+    inner_dt = DELTA_TIME / DRONE_RK4_INNER_STEPS
+    return lambda state, wrench: kernel(tuple(state), *wrench, ACC_GRAVITY, *inertia, inner_dt, DRONE_RK4_INNER_STEPS)
+
+
+def bench_quadrotor_rk4(config):
+    """Quadrotor RK4 integration of one frame: array based reference (former DroneCamera.update_kinematics
+    loop) vs scalar kernel, in python and compiled with numba when available. Metric is the max state
+    difference to the reference over the same wrench sequence.
+    """
+    wrenches = [tuple(wrench) for wrench in make_wrenches(NUM_TRACK_FRAMES).tolist()]
+    initial_state = (0.0, 0.0, 200.0, 5.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+    integrators = [('reference', make_rk4_reference_step()),
+                   ('python', make_rk4_kernel_step(getattr(integrate_quadrotor_rk4, 'py_func',
+                                                           integrate_quadrotor_rk4)))]
+    if is_jit_enabled():
+        integrators.append(('numba', make_rk4_kernel_step(integrate_quadrotor_rk4)))
+
+    def integrate(integrator_step):
+        state = initial_state
+        states = []
+        for wrench in wrenches:
+            state = integrator_step(state, wrench)
+            states.append(state)
+        return np.array(states)
+
+    reference_states = integrate(integrators[0][1])
+    results = []
+    for name, integrator_step in integrators:
+        def setup():
+            state = [initial_state]
+            wrenches_iter = cycle(wrenches)
+
+            def step():
+                state[0] = integrator_step(state[0], next(wrenches_iter))
+            return step
+
+        # first call compiles when numba is used
+        integrator_step(initial_state, wrenches[0])
+        result = run_step_benchmark('quadrotor_rk4', {'integrator': name, 'inner_steps': DRONE_RK4_INNER_STEPS},
+                                    setup, config)
+        result['metrics'] = {'MAX_STATE_DIFF': float(np.abs(integrate(integrator_step) - reference_states).max())}
+        results.append(result)
+    return results
+
+
+def bench_multi_tracker(config):
+    """MultiTracker.process_image_complete per frame in a headless, seeded fast-forward experiment.
+    Stage timings come from the frame profiler, the first (initialization) frame is left out.
+    """
+    from ..exp_manager import ExperimentManager
+
+    args = argparse.Namespace(norun=False, plot=False, batch=True, headless=True, k1=None, k2=None, kw=None,
+                              tf=config.final_time, seed=0, track_every=None, profile=True, trace=None)
+    manager = ExperimentManager(save_on=False,
+                                write_plot=False,
+                                control_on=True,
+                                tracker_on=True,
+                                tracker_display_on=True,
+                                use_true_kin=False,
+                                use_real_clock=False,
+                                draw_occlusion_bars=False,
+                                headless=True,
+                                args=args)
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        manager.run()
+
+    profiler = manager.profiler
+    _, frame_times = profiler.get_frame_times()
+    init_id = profiler.stage_ids.get('tracker.init')
+    if init_id is not None:
+        frame_times = frame_times[frame_times[:, init_id] == 0]
+
+    num_targets = len(manager.targets)
+    params = {'targets': num_targets, 'resolution': f'{WIDTH}x{HEIGHT}'}
+    results = []
+    for stage_name, result_name in (('tracker', 'multi_tracker'),
+                                    ('tracker.flow', 'multi_tracker.flow'),
+                                    ('tracker.kinematics', 'multi_tracker.kinematics'),
+                                    ('tracker.ekf_bank', 'multi_tracker.ekf_bank'),
+                                    ('tracker.filter', 'multi_tracker.filter'),
+                                    ('tracker.posterity', 'multi_tracker.posterity'),
+                                    ('frame', 'experiment_frame')):
+        stage_id = profiler.stage_ids.get(stage_name)
+        if stage_id is None:
+            continue
+        times = frame_times[:, stage_id]
+        times = times[times > 0]
+        if len(times):
+            results.append(make_result(result_name, params, times, items=num_targets))
+    return results
+
+
+def run_feature_backend(config, backend, commands=None):
+    """Runs headless seeded experiment with occlusion bars, tracker using given feature backend.
+    Drone acceleration commands are recorded, or replayed from commands so every backend sees the same run.
+
+    Args:
+        config (BenchmarkConfig): Benchmark configuration
+        backend (str): One of FEATURE_BACKENDS
+        commands (list, optional): Acceleration commands to replay. Defaults to None (record).
+
+    Returns:
+        tuple: manager, acceleration commands applied, telemetry records
+    """
+    from ..exp_manager import ExperimentManager
+
+    args = argparse.Namespace(norun=False, plot=False, batch=True, headless=True, k1=None, k2=None, kw=None,
+                              tf=config.final_time, seed=0, track_every=None, features=backend, profile=True,
+                              trace=None)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as folder, open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        os.chdir(folder)
+        try:
+            manager = ExperimentManager(save_on=False,
+                                        write_plot=True,
+                                        control_on=True,
+                                        tracker_on=True,
+                                        tracker_display_on=True,
+                                        use_true_kin=False,
+                                        use_real_clock=False,
+                                        draw_occlusion_bars=True,
+                                        headless=True,
+                                        args=args)
+
+            # record controller commands, or apply recorded commands when replaying
+            # (controller still runs, its state is logged)
+            applied = []
+            generate_acceleration = manager.controller.generate_acceleration
+            replay = iter(commands) if commands is not None else None
+
+            def record_acceleration(*controller_args):
+                command = generate_acceleration(*controller_args)
+                if replay is not None:
+                    command = next(replay, None)
+                    if command is None:
+                        raise RuntimeError(f'{backend} replay needs more than the {len(commands)} recorded '
+                                           'acceleration commands, runs are not comparable')
+                applied.append(command)
+                return command
+            manager.controller.generate_acceleration = record_acceleration
+
+            manager.run()
+            data = load_telemetry(TELEMETRY_FILE)
+        finally:
+            os.chdir(cwd)
+    return manager, applied, data
+
+
+def get_reacquisition_metrics(data):
+    """Returns re-acquisition metrics of a run from its telemetry (logged every few frames)
+
+    Args:
+        data (np.recarray): Telemetry records
+
+    Returns:
+        dict: occluded share (tracker not in NO_OCC), total occlusion share, re-acquisitions (returns to NO_OCC
+            after occlusion), measured frames share, mean tracking error (m, EKF estimate vs truth)
+    """
+    cases = np.stack([data[f'T_{target_num}_OCCLUSION_CASE'] for target_num in (1, 2, 3)])
+    measured = np.stack([np.isfinite(data[f'T_{target_num}_R_MEAS']) for target_num in (1, 2, 3)])
+    return {'OCCLUDED_SHARE': float(np.mean(cases != NO_OCC)),
+            'TOTAL_OCC_SHARE': float(np.mean(cases == TOTAL_OCC)),
+            'REACQUISITIONS': int(((cases[:, :-1] != NO_OCC) & (cases[:, 1:] == NO_OCC)).sum()),
+            'MEASURED_SHARE': float(measured.mean()),
+            'MEAN_TRACKING_ERROR': compute_metrics(data)['MEAN_TRACKING_ERROR']}
+
+
+def bench_feature_backends(config):
+    """Tracker per frame cost and re-acquisition under occlusion bars for every feature backend.
+    The first backend records drone acceleration commands, the others replay them, so all backends
+    process the same frames. Stage timings come from the frame profiler, initialization frame left out.
+    Runs last at least FEATURE_BACKENDS_MIN_TF, shorter runs do not reach the occlusion bars.
+    """
+    config = config._replace(final_time=max(config.final_time, FEATURE_BACKENDS_MIN_TF))
+    results = []
+    commands = None
+    for backend in FEATURE_BACKENDS:
+        manager, applied, data = run_feature_backend(config, backend, commands)
+        commands = applied if commands is None else commands
+
+        profiler = manager.profiler
+        _, frame_times = profiler.get_frame_times()
+        init_id = profiler.stage_ids.get('tracker.init')
+        if init_id is not None:
+            frame_times = frame_times[frame_times[:, init_id] == 0]
+
+        params = {'backend': backend, 'targets': len(manager.targets), 'tf': config.final_time}
+        metrics = get_reacquisition_metrics(data)
+        if metrics['OCCLUDED_SHARE'] == 0:
+            print(f'feature_backends [{backend}]: no occlusion occurred in {config.final_time} s, '
+                  're-acquisition metrics are not meaningful', file=sys.stderr)
+        for stage_name, result_name in (('tracker', 'feature_backend'),
+                                        ('tracker.kinematics', 'feature_backend.kinematics')):
+            stage_id = profiler.stage_ids.get(stage_name)
+            if stage_id is None:
+                continue
+            times = frame_times[:, stage_id]
+            times = times[times > 0]
+            if len(times):
+                result = make_result(result_name, params, times, items=len(manager.targets))
+                result['metrics'] = metrics
+                results.append(result)
+    return results
+
+
+# benchmark groups, in the order they run
+BENCHMARKS = {'optical_flow': bench_optical_flow,
+              'images_assemble': bench_images_assemble,
+              'template_match': bench_template_match,
+              'enclose_points': bench_enclose_points,
+              'target_ekf': bench_target_ekf,
+              'ellipse_ekf': bench_ellipse_ekf,
+              'drone_kinematics': bench_drone_kinematics,
+              'quadrotor_rk4': bench_quadrotor_rk4,
+              'multi_tracker': bench_multi_tracker,
+              'feature_backends': bench_feature_backends}
@@ -0,0 +1,116 @@
+import os
+import tempfile
+
+import cv2 as cv
+import numpy as np
+
+from utils.data_synth_utils import generate_synth_data
+
+
+DATASETS_FOLDER = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../datasets'))
+FRAME_SOURCES = ('synth', 'Dimetrodon', 'RubberWhale', 'Venus')
+
+
+def generate_synth_frame_pair(resolution):
+    """Returns two synthetic frames (utils.data_synth_utils), rings of dots growing between frames.
+    Frames are written into a temporary folder and read back.
+
+    Args:
+        resolution (tuple(int, int)): (height, width)
+
+    Returns:
+        tuple(np.ndarray, np.ndarray): BGR frames
+    """
+    height, width = resolution
+    with tempfile.TemporaryDirectory() as folder:
+        data_path = generate_synth_data(img_size=(height, width),
+                                        path=folder,
+                                        num_images=2,
+                                        radius=min(height, width) // 4,
+                                        num_dots=256,
+                                        increment=2)
+        frames = [cv.imread(os.path.join(data_path, name), cv.IMREAD_COLOR) for name in sorted(os.listdir(data_path))]
+    return frames[0], frames[1]
+
+
+def load_dataset_frame_pair(name, resolution):
+    """Returns first two frames of a datasets/ sequence, resized to resolution
+
+    Args:
+        name (str): Dataset folder name, e.g. 'RubberWhale'
+        resolution (tuple(int, int)): (height, width)
+
+    Returns:
+        tuple(np.ndarray, np.ndarray): BGR frames
+    """
+    folder = os.path.join(DATASETS_FOLDER, name)
+    names = sorted(item for item in os.listdir(folder) if item.lower().endswith(('.png', '.jpg')))
+    height, width = resolution
+    frames = []
+    for frame_name in names[:2]:
+        frame = cv.imread(os.path.join(folder, frame_name), cv.IMREAD_COLOR)
+        frames.append(cv.resize(frame, (width, height), interpolation=cv.INTER_LINEAR))
+    return frames[0], frames[1]
+
+
+def load_frame_pair(source, resolution):
+    """Returns two consecutive frames of given source at given resolution.
+    Falls back to synthetic frames if the dataset is not available.
+
+    Args:
+        source (str): 'synth' or a datasets/ folder name (FRAME_SOURCES)
+        resolution (tuple(int, int)): (height, width)
+
+    Returns:
+        tuple(np.ndarray, np.ndarray): BGR frames
+    """
+    if source != 'synth':
+        if os.path.isdir(os.path.join(DATASETS_FOLDER, source)):
+            return load_dataset_frame_pair(source, resolution)
+        print(f'dataset {source} not found in {DATASETS_FOLDER}, using synthetic frames')
+    return generate_synth_frame_pair(resolution)
+
+
+def make_target_tracks(num_frames, num_targets, dt=0.01, seed=0):
+    """Returns smooth random target positions and velocities (m, m/s), like cars seen from the drone
+
+    Args:
+        num_frames (int): Number of frames
+        num_targets (int): Number of targets
+        dt (float, optional): Time step (s). Defaults to 0.01.
+        seed (int, optional): Random generator seed. Defaults to 0.
+
+    Returns:
+        tuple(np.ndarray, np.ndarray): positions and velocities, shape (num_frames, num_targets, 2)
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(num_frames)[:, None, None] * dt
+    starts = rng.uniform(-60, 60, size=(1, num_targets, 2))
+    speeds = rng.uniform(-8, 8, size=(1, num_targets, 2))
+    phases = rng.uniform(0, np.pi, size=(1, num_targets, 2))
+    positions = starts + speeds * t + 5 * np.sin(t + phases)
+    velocities = speeds + 5 * np.cos(t + phases)
+    return positions, velocities
+
+
+def make_target_corners(num_frames, num_targets, half_size=4.0, seed=0):
+    """Returns corner points of targets (m) moving on smooth random paths, as the tracker feeds the ellipse
+
+    Args:
+        num_frames (int): Number of frames
+        num_targets (int): Number of targets
+        half_size (float, optional): Half side of target squares (m). Defaults to 4.0.
+        seed (int, optional): Random generator seed. Defaults to 0.
+
+    Returns:
+        np.ndarray: 4 corners per target, shape (num_frames, num_targets*4, 1, 2)
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(num_frames)[:, None] * 0.033
+    starts = rng.uniform(-60, 60, size=(num_targets, 2))
+    vels = rng.uniform(-8, 8, size=(num_targets, 2))
+    centers = starts[None, :, :] + vels[None, :, :] * t[:, :, None] + 5 * np.sin(t[:, :, None] + starts[None, :, :])
+
+    deltas = np.array([[-1, -1], [1, -1], [1, 1], [-1, 1]]) * half_size
+    corners = centers[:, :, None, :] + deltas[None, None, :, :]
+    return corners.reshape(num_frames, -1, 1, 2)
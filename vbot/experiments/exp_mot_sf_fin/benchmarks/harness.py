@@ -0,0 +1,229 @@
+import os
+import sys
+import json
+import time
+import platform
+import subprocess
+import tracemalloc
+from collections import namedtuple
+
+import cv2 as cv
+import numpy as np
+
+try:
+    import resource
+except ImportError:     # not available on Windows
+    resource = None
+
+
+# benchmark run configuration
+#   num_calls     - timed calls per case (heavy cases scale it down)
+#   num_warmup    - untimed calls before timing (caches, allocations, JIT)
+#   resolutions   - frame sizes (height, width) for image based cases
+#   target_counts - number of targets for filter/ellipse cases
+#   frame_source  - 'synth' or a datasets/ folder name
+#   memory        - measure peak allocations (tracemalloc) in a separate pass
+#   final_time    - simulated seconds of the headless experiment driving MultiTracker
+BenchmarkConfig = namedtuple('BenchmarkConfig', ['num_calls', 'num_warmup', 'resolutions', 'target_counts',
+                                                 'frame_source', 'memory', 'final_time'])
+
+PERCENTILES = (50, 90, 99)
+MEMORY_CALLS = 5
+
+
+def time_calls(step, num_calls, num_warmup=0):
+    """Times repeated calls of step
+
+    Args:
+        step (callable): Function without arguments, one unit of work per call
+        num_calls (int): Number of timed calls
+        num_warmup (int, optional): Number of untimed calls first. Defaults to 0.
+
+    Returns:
+        np.ndarray: Latency of each call (s)
+    """
+    for _ in range(num_warmup):
+        step()
+
+    latencies = np.empty(num_calls)
+    for i in range(num_calls):
+        t_start = time.perf_counter()
+        step()
+        latencies[i] = time.perf_counter() - t_start
+    return latencies
+
+
+def measure_peak_memory(step, num_calls=MEMORY_CALLS):
+    """Returns peak memory allocated (Python and NumPy allocations) while calling step.
+    Runs separately from timing, tracing slows down allocations.
+
+    Args:
+        step (callable): Function without arguments
+        num_calls (int, optional): Number of calls. Defaults to MEMORY_CALLS.
+
+    Returns:
+        int: Peak traced bytes above the memory in use before the calls
+    """
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    for _ in range(num_calls):
+        step()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak - baseline
+
+
+def make_result(name, params, latencies, items=1, peak_memory=None):
+    """Summarizes latencies of one benchmark case
+
+    Args:
+        name (str): Case name, e.g. 'optical_flow_lk'
+        params (dict): Case parameters, e.g. {'resolution': '480x640'}
+        latencies (np.ndarray): Latency of each call (s)
+        items (int, optional): Work items per call (frames, targets, points), for throughput. Defaults to 1.
+        peak_memory (int, optional): Peak allocated bytes. Defaults to None.
+
+    Returns:
+        dict: Result with calls, mean/percentile/max latency (ms), throughput (items/s) and memory
+    """
+    latencies = np.asarray(latencies, dtype=np.float64)
+    ms = 1000 * latencies
+    result = {'name': name,
+              'params': params,
+              'calls': len(latencies),
+              'items': items,
+              'mean_ms': float(ms.mean()),
+              'max_ms': float(ms.max())}
+    for percentile, value in zip(PERCENTILES, np.percentile(ms, PERCENTILES)):
+        result[f'p{percentile}_ms'] = float(value)
+    result['throughput'] = float(items * len(latencies) / latencies.sum()) if latencies.sum() > 0 else float('inf')
+    result['peak_kib'] = None if peak_memory is None else peak_memory / 1024
+    return result
+
+
+def run_step_benchmark(name, params, setup, config, items=1, num_calls=None):
+    """Runs one step based benchmark case, timing pass then memory pass
+
+    Args:
+        name (str): Case name
+        params (dict): Case parameters
+        setup (callable): Returns step, a function without arguments doing one unit of work per call
+        config (BenchmarkConfig): Benchmark configuration
+        items (int, optional): Work items per call. Defaults to 1.
+        num_calls (int, optional): Timed calls, overrides config.num_calls. Defaults to None.
+
+    Returns:
+        dict: Result (make_result)
+    """
+    num_calls = config.num_calls if num_calls is None else num_calls
+    latencies = time_calls(setup(), num_calls, config.num_warmup)
+    peak_memory = measure_peak_memory(setup()) if config.memory else None
+    return make_result(name, params, latencies, items, peak_memory)
+
+
+def get_result_key(result):
+    """Returns key identifying a case across runs, e.g. 'optical_flow_lk[resolution=480x640]'"""
+    params = ','.join(f'{key}={value}' for key, value in sorted(result['params'].items()))
+    return f'{result["name"]}[{params}]'
+
+
+def get_git_commit():
+    """Returns current git commit hash (with -dirty suffix if tree has changes), None outside a repo"""
+    folder = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=folder, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=folder,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ('-dirty' if dirty else '')
+
+
+def get_environment():
+    """Returns description of the machine and software the benchmarks ran on"""
+    return {'commit': get_git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'cpu_count': os.cpu_count(),
+            'python': sys.version.split()[0],
+            'numpy': np.__version__,
+            'opencv': cv.__version__,
+            'opencv_threads': cv.getNumThreads()}
+
+
+def get_max_rss_kib():
+    """Returns peak resident set size of this process (KiB), None if not available"""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss / 1024 if sys.platform == 'darwin' else max_rss    # bytes on macOS, KiB on Linux
+
+
+def save_results(path, results, config):
+    """Writes results, configuration and environment into a JSON file
+
+    Args:
+        path (str): JSON file path
+        results (list): Results (make_result)
+        config (BenchmarkConfig): Benchmark configuration
+    """
+    report = {'environment': get_environment(),
+              'config': config._asdict(),
+              'max_rss_kib': get_max_rss_kib(),
+              'results': results}
+    with open(path, 'w') as results_file:
+        json.dump(report, results_file, indent=2)
+
+
+def load_results(path):
+    with open(path, 'r') as results_file:
+        return json.load(results_file)
+
+
+def format_results(results):
+    """Formats results as a table
+
+    Args:
+        results (list): Results (make_result)
+
+    Returns:
+        str: Table, one row per case
+    """
+    columns = ['mean_ms'] + [f'p{percentile}_ms' for percentile in PERCENTILES] + ['max_ms', 'throughput', 'peak_kib']
+    lines = [f'{"case":<56} ' + ' '.join(f'{column:>11}' for column in columns)]
+    for result in results:
+        values = ' '.join(f'{"-":>11}' if result[column] is None else f'{result[column]:11.3f}' for column in columns)
+        lines.append(f'{get_result_key(result):<56} {values}')
+        if result.get('metrics'):
+            lines.append(' ' * 4 + ', '.join(f'{name}={value:.4g}' for name, value in result['metrics'].items()))
+    return '\n'.join(lines)
+
+
+def compare_results(baseline, results, threshold=0.1, metric='p50_ms'):
+    """Compares results against a baseline report, case by case
+
+    Args:
+        baseline (dict): Report loaded with load_results
+        results (list): Current results (make_result)
+        threshold (float, optional): Relative change flagged as regression or improvement. Defaults to 0.1.
+        metric (str, optional): Latency metric compared. Defaults to 'p50_ms'.
+
+    Returns:
+        str: Comparison table, ratio is current / baseline
+    """
+    baseline_results = {get_result_key(result): result for result in baseline['results']}
+    lines = [f'Comparison with {baseline["environment"].get("commit")} ({metric}, ratio current/baseline):',
+             f'{"case":<56} {"baseline":>11} {"current":>11} {"ratio":>8}']
+    for result in results:
+        key = get_result_key(result)
+        if key not in baseline_results:
+            lines.append(f'{key:<56} {"-":>11} {result[metric]:11.3f} {"new":>8}')
+            continue
+        before = baseline_results[key][metric]
+        ratio = result[metric] / before if before > 0 else float('inf')
+        flag = 'slower' if ratio > 1 + threshold else 'faster' if ratio < 1 - threshold else ''
+        lines.append(f'{key:<56} {before:11.3f} {result[metric]:11.3f} {ratio:8.2f} {flag}')
+    return '\n'.join(lines)
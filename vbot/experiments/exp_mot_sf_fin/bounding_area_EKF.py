@@ -1,6 +1,7 @@
 import numpy as np
 import numpy.linalg as LA
-from math import e, pow
+
+from .singer_model import get_singer_matrices
 
 class BoundingAreaEKF:
     """Implement continuous-continuous EKF for bounding area in stateful fashion
@@ -104,34 +105,8 @@ class BoundingAreaEKF:
 
 
     def preprocess(self):
-        """pre compute transition matrix and process noise"""
-        # set variables for better numerical efficiency
-        dt = self.manager.get_sim_dt()
-        adt = self.alpha_acc * dt   # αΔt
-        adt2 = pow(adt, 2)
-        adt3 = pow(adt, 3)
-        a2 = pow(self.alpha_acc, 2)
-        a3 = pow(self.alpha_acc, 3)
-        a4 = pow(self.alpha_acc, 4)
-        eadt = pow(e, (-adt))
-        e2adt = pow(e, (-2*adt))
-
-        # transition matrix
-        self.A = np.array([[1.0, dt, (eadt + adt -1) / a2],
-                           [0.0, 1.0, (1 - eadt)/(self.alpha_acc)],
-                           [0.0, 0.0, eadt]])
-
-        self.q11 = (1 - e2adt + 2*adt + (2/3)*adt3 - 2*adt2 - 4*adt*eadt) / (a4)
-        self.q12 = (e2adt + 1 - 2*eadt + 2*adt*eadt - 2*adt + adt**2) / (a3)
-        self.q13 = (1 - e2adt - 2*adt*eadt) / (a2)
-        self.q22 = (4*eadt - 3 - e2adt + 2*adt) / (a2)
-        self.q23 = (e2adt + 1 -2*eadt) / (self.alpha_acc)
-        self.q33 = (1 - e2adt)
-
-        # process noise
-        self.Q = np.array([[self.q11, self.q12, self.q13],
-                           [self.q12, self.q22, self.q23],
-                           [self.q13, self.q23, self.q33]])
+        """fetch transition matrix and process noise (cached per dt)"""
+        self.A, self.Q = get_singer_matrices(self.manager.get_sim_dt(), self.alpha_acc)
 
 
     def estimate_width(self):
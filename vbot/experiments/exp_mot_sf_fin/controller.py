@@ -1,7 +1,7 @@
 import os
 import numpy as np
 from datetime import timedelta
-from math import atan2, degrees, cos, sin, pi, pow, tau
+from math import atan2, degrees, cos, sin, pi, tau
 from .settings import *
 from .my_imports import bf, rb, mb, gb, yb, bb, cb,  r, m, g, y, b, c, colored, cprint
 import matplotlib.pyplot as plt
@@ -29,11 +29,35 @@ class Controller:
         self.C_BUFF = 10
 
         self.scz_ind_prev = 0
+        self.verbose = True     # print altitude hold notices
 
         self.p_controller_end_time = DELTA_TIME
         self.P_CONTROLLER_FLAG = False
+
+        # gains, command line arguments (--k1, --k2, --kw) override settings
+        self.set_gains()
         plt.ion()
 
+    def set_gains(self, k1=None, k2=None, kw=None):
+        """Sets controller gains. Gains not given are taken from manager args if present, else from settings.
+
+        Args:
+            k1 (float, optional): K_1 gain, affects a_lat more. Defaults to None.
+            k2 (float, optional): K_2 gain, affects a_long more. Defaults to None.
+            kw (float, optional): K_W gain. Defaults to None.
+        """
+        args = getattr(self.manager, 'args', None)
+        if k1 is None:
+            k1 = args.k1 if getattr(args, 'k1', None) is not None else K_1
+        if k2 is None:
+            k2 = args.k2 if getattr(args, 'k2', None) is not None else K_2
+        if kw is None:
+            kw = args.kw if getattr(args, 'kw', None) is not None else K_W
+
+        self.K_1 = k1
+        self.K_2 = k2
+        self.K_W = kw
+
 
 
     @staticmethod
@@ -146,20 +170,10 @@ class Controller:
         # compute objective function derivatives
         dy1dVr1, dy1dVtheta1, dy1dVr2, dy1dVtheta2, dy2dVr1, dy2dVtheta1 = self.compute_y1_y2_derivative(r1, r2, Vr1, Vr2, Vtheta1, Vtheta2, ellipse_major_axis_len)
 
-        # check args
-        # if self.manager.args.k1 is not None:
-        #     K_1 = self.manager.args.k1
-        # else:
-        #     K_1 = K_1
-        # if self.manager.args.k2 is not None:
-        #     K_2 = self.manager.args.k2
-        # if self.manager.args.kw is not None:
-        #     K_W = self.manager.args.kw
-
         # set gains
-        K1 = K_1 if y1 >=0 else 0 #* np.sign(-Vr1)
-        K2 = K_2
-        w = K_W
+        K1 = self.K_1 if y1 >=0 else 0 #* np.sign(-Vr1)
+        K2 = self.K_2
+        w = self.K_W
 
 
         # compute acceleration commands
@@ -337,7 +351,8 @@ class Controller:
                 if abs(S_d - S) < 0.25*S_DELTA and S_d > S:
                     self.S_GOOD_FLAG = True
                     self.current_alt = Z_W
-                    print(f'\n\nStaying at {Z_W}\n')
+                    if self.verbose:
+                        print(f'\n\nStaying at {Z_W}\n')
                     e_s = 0.0
                 else:
                     e_s = S_d - S
@@ -472,16 +487,18 @@ class Controller:
 
 
 
-    def compute_objective_functions(self, r1, r2, Vr1, Vr2, Vtheta1, Vtheta2, a, rm, Vrm, Vthetam):
-        V1 = pow((Vtheta1**2 + Vr1**2),0.5)
-        V2 = pow((Vtheta2**2 + Vr2**2),0.5)
+    @staticmethod
+    def compute_objective_functions(r1, r2, Vr1, Vr2, Vtheta1, Vtheta2, a, rm, Vrm, Vthetam):
+        # elementwise, works on floats and on arrays (batch simulator)
+        V1 = (Vtheta1**2 + Vr1**2)**0.5
+        V2 = (Vtheta2**2 + Vr2**2)**0.5
         A1 = r1*abs(Vtheta1)*V2
         A2 = r2*abs(Vtheta2)*V1
         tau_num = r1*Vr1/V1**2 - r2*Vr2/V2**2
         tau_den = r1*abs(Vtheta1)/V1 + r2*abs(Vtheta2)/V2     # saturate this guy
         tau = (tau_num/tau_den)**2
 
-        y1 = A1**2*(1+tau*V1**2) + A2**2*(1+tau*V2**2) + 2*A1*A2*pow((1+tau*(V1**2+V2**2)+tau**2*V1**2*V2**2),0.5) - 4*(a)**2*V1**2*V2**2   # sat this also
+        y1 = A1**2*(1+tau*V1**2) + A2**2*(1+tau*V2**2) + 2*A1*A2*(1+tau*(V1**2+V2**2)+tau**2*V1**2*V2**2)**0.5 - 4*(a)**2*V1**2*V2**2   # sat this also
 
         y2 = Vtheta1**2 + Vr1**2
         # y2 = Vthetam**2 + Vrm**2
@@ -493,7 +510,7 @@ class Controller:
     @staticmethod
     def compute_y1_y2_derivative(r1, r2, Vr1, Vr2, Vtheta1, Vtheta2, a):
         def sqrt(x):
-            return pow(x, 0.5)
+            return x**0.5
 
         # # Compute the variables needed for derivatives
         # V1 = sqrt(Vtheta1**2+Vr1**2); V2 = sqrt(Vtheta2**2+Vr2**2)
@@ -5,6 +5,7 @@ import pygame
 import numpy as np
 
 from .settings import *
+from .quadrotor_dynamics import integrate_quadrotor_rk4, body_to_inertial_velocity
 from .my_imports import bf, rb, mb, gb, yb, bb, cb, r, m, g, y, b, c, colored, cprint
 
 class DroneCamera(pygame.sprite.Sprite):
@@ -142,8 +143,8 @@ class DroneCamera(pygame.sprite.Sprite):
             self.origin += self.delta_pos
         else:
             # new stuffs
-            self.prev_delta_pos = deepcopy(self.delta_pos)
-            self.prev_origin = deepcopy(self.origin)
+            self.prev_delta_pos = pygame.Vector2(self.delta_pos)
+            self.prev_origin = pygame.Vector2(self.origin)
 
             # compute required force
             F = (self.g - self.az) * (self.INERTIA.m / (cos(self.phi)*cos(self.theta)))
@@ -161,55 +162,33 @@ class DroneCamera(pygame.sprite.Sprite):
             # form wrench 
             wrench = F, tau_phi, tau_theta, tau_psi
 
-            # update state
-            num_inner_loop = 10
+            # update state, runge-kutta with scalar state (see quadrotor_dynamics for the kernels)
+            num_inner_loop = DRONE_RK4_INNER_STEPS
             outer_loop_rate = 1/DELTA_TIME
             inner_loop_rate = outer_loop_rate * num_inner_loop
 
-            for i in range(num_inner_loop):
-                # collect state
-                state = self.get_quadrotor_state()
-
-                # # evaluate dynamics and compute state dot
-                # state_dot = self.get_quadrotor_state_dot(state, F_app, tau_phi, tau_theta, tau_psi)
-                # state_dot = self.eval_state_dot(state, wrench)
-
-                # # euler integration
-                # state += state_dot/inner_loop_rate
+            state = integrate_quadrotor_rk4((self.position[0], self.position[1], float(self.altitude),
+                                             self.u, self.v, self.w,
+                                             self.phi, self.theta, self.psi,
+                                             self.p, self.q, self.r),
+                                            *wrench,
+                                            self.g, self.INERTIA.m, self.INERTIA.Ixx, self.INERTIA.Iyy, self.INERTIA.Izz,
+                                            1/inner_loop_rate,
+                                            num_inner_loop)
 
-                # runge-kutta
-                # k1 = self.get_quadrotor_state_dot(state, F, tau_phi, tau_theta, tau_psi)
-                # k2 = self.get_quadrotor_state_dot(state + k1*(1/(2*inner_loop_rate)), F, tau_phi, tau_theta, tau_psi)
-                # k3 = self.get_quadrotor_state_dot(state + k2*(1/(2*inner_loop_rate)), F, tau_phi, tau_theta, tau_psi)
-                # k4 = self.get_quadrotor_state_dot(state + k3*(1/(inner_loop_rate)), F, tau_phi, tau_theta, tau_psi)
-                k1 = self.eval_state_dot(state, wrench)
-                k2 = self.eval_state_dot(state + k1*(1/(2*inner_loop_rate)), wrench)
-                k3 = self.eval_state_dot(state + k2*(1/(2*inner_loop_rate)), wrench)
-                k4 = self.eval_state_dot(state + k3*(1/(inner_loop_rate)), wrench)
-
-                state += (k1 + 2*k2 + 2*k3 + k4) * (1/(6*inner_loop_rate))
-
-                # update state
-                self.update_quadrotor_state(state)
-
-
-                # update position and velocity (inertial)
-                self.position = pygame.Vector2(state[0], state[1])
-                self.altitude = state[2]
+            # update state
+            self.update_quadrotor_state(state)
 
-            # construct Rotation matrix from Drone local NED to Drone body attached frame
-            N_R_A = np.array([[cos(self.theta)*cos(self.psi),                                           cos(self.theta)*sin(self.psi),                                           -sin(self.theta)],
-                              [sin(self.phi)*sin(self.theta)*cos(self.psi)-cos(self.phi)*sin(self.psi), sin(self.phi)*sin(self.theta)*sin(self.psi)+cos(self.phi)*cos(self.psi), sin(self.phi)*cos(self.theta)],
-                              [cos(self.phi)*sin(self.theta)*cos(self.psi)+sin(self.phi)*sin(self.psi), cos(self.phi)*sin(self.theta)*sin(self.psi)-sin(self.phi)*cos(self.psi), cos(self.phi)*cos(self.theta)]])
+            # update position and velocity (inertial)
+            self.position = pygame.Vector2(state[0], state[1])
+            self.altitude = state[2]
 
-            # compute transformed velocity in inertial world frame
-            vel_inertial = N_R_A.T @ np.array([[self.u], 
-                                               [self.v],
-                                               [self.w]])
+            # compute transformed velocity in inertial world frame (Drone body attached frame to local NED)
+            vel_x, vel_y, vel_z = body_to_inertial_velocity(self.u, self.v, self.w, self.phi, self.theta, self.psi)
 
             # update velocity
-            self.velocity = pygame.Vector2(vel_inertial.flatten()[0], vel_inertial.flatten()[1])
-            self.vz = vel_inertial.flatten()[2]
+            self.velocity = pygame.Vector2(vel_x, vel_y)
+            self.vz = vel_z
 
             # print states and wrench
             # self.print_states()
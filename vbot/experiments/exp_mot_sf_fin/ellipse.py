@@ -1,8 +1,9 @@
-from math import cos, sin
+from math import cos, sin, atan2
 import numpy as np
 from numpy import linalg as LA
 from scipy.spatial.transform import Rotation as R
 from .ellipse_ekf import EllipseEKF
+from .settings import *
 
 class Ellipse2D:
 	def __init__(self, exp_manager=None, tracking_manager=None, semi_major_axis=1, semi_minor_axis=1, center_coords=(0,0), rotation_angle=0):
@@ -22,6 +23,10 @@ class Ellipse2D:
 
 		self._POINT_ENCLOSURE_TOLERANCE = 0.1
 
+		# enclosure solution of previous frame (warm start) and iterations used by last enclosure
+		self._prev_u = None
+		self.enclosure_iterations = 0
+
 	def get_params(self):
 		""" returns ellipse parameters
 
@@ -72,9 +77,127 @@ class Ellipse2D:
 		Q = np.concatenate((points, np.ones((1, NUM_POINTS))), axis=0)
 
 
+		d = 2
+		if ELLIPSE_FAST_ENCLOSURE:
+			u, self.enclosure_iterations = self.solve_enclosure_weights(Q, tolerance)
+		else:
+			u, self.enclosure_iterations = self.solve_enclosure_weights_reference(Q, tolerance)
+
+		# A = (1/d) * ( (points . U . points') - (points . u . u.T . points.T) ), with U = diag(u)
+		center = points @ u
+		A = (1/d) * LA.pinv((points * u) @ points.T - np.outer(center, center))
+
+		# compute SVD(A)
+		_, Q, V = LA.svd(A)
+
+		# rotate V matrix by 270
+		rot_V = np.rot90(V,3)
+		if LA.det(rot_V) > 0:
+			# proper rotation in the plane, its angle is the Z euler angle of the augmented matrix
+			rotation_angle = atan2(rot_V[1,0], rot_V[0,0])
+		else:
+			# augment zeros to the right, then aug 0,0,1 to the bottom
+			rot_aug2_V = np.concatenate((rot_V, np.zeros((2,1))), axis=1)
+			rot_aug3_V = np.concatenate((rot_aug2_V, np.array([[0,0,1]])), axis=0)
+
+			# extract rotation from rotated augmented V
+			rotation_angle = R.from_matrix(rot_aug3_V).as_euler('ZYX')[0]
+
+		# update ellipse params
+		self.semi_minor_axis = 1 / (Q[0])**0.5
+		self.semi_major_axis = 1 / (Q[1])**0.5
+		self.center_coords = tuple(center)
+		self.rotation_angle = rotation_angle
+
+		# update focal length and focal points. note: in that order
+		self.update_focal_length()
+		self.update_focal_points()
+
+		return self.get_params()
+
+	def solve_enclosure_weights(self, Q, tolerance):
+		"""Khachiyan's iteration for the minimum volume enclosing ellipse weights, fast path.
+		Warm-starts from previous frame's weights (points keep their order, 4 corners per target),
+		keeps X^-1 and M = diag(Q' . X^-1 . Q) up to date with rank-one (Sherman-Morrison) updates
+		and never forms N x N matrices. A single target (4 rectangle corners) is solved in closed form,
+		uniform weights are optimal for a rectangle.
+
+		Args:
+			Q (np.ndarray): Augmented points, shape (3, NUM_POINTS)
+			tolerance (float): Tolerance for optimization error
+
+		Returns:
+			tuple: weights u of shape (NUM_POINTS,), number of iterations
+		"""
+		d = 2
+		NUM_POINTS = Q.shape[1]
+		if NUM_POINTS == 4:
+			return np.full(4, 0.25), 0
+
+		if self._prev_u is not None and len(self._prev_u) == NUM_POINTS:
+			u = self._prev_u.copy()
+		else:
+			u = np.full(NUM_POINTS, 1 / NUM_POINTS)
+
+		X = (Q * u) @ Q.T
+		if abs(LA.det(X)) < 1e-12:
+			# warm start lost support of the points, restart from uniform weights
+			u = np.full(NUM_POINTS, 1 / NUM_POINTS)
+			X = (Q * u) @ Q.T
+		X_inv = LA.inv(X)
+		M = np.sum(Q * (X_inv @ Q), axis=0)
+
+		iterations = 0
+		err = 1
+		while err > tolerance:
+			_ARG_MAX_M = np.argmax(M)
+			_MAX_M = M[_ARG_MAX_M]
+
+			step_size = (_MAX_M - d - 1) / ((d + 1) * (_MAX_M - 1))
+			if step_size <= 0:
+				break
+			new_u = (1 - step_size) * u
+			new_u[_ARG_MAX_M] += step_size
+
+			err = LA.norm(new_u - u)
+			u = new_u
+			iterations += 1
+
+			# X <- (1 - s) X + s q q', update inverse and M accordingly
+			q = Q[:, _ARG_MAX_M]
+			X_inv /= (1 - step_size)
+			M /= (1 - step_size)
+			v = X_inv @ q
+			denom = 1 / step_size + q @ v
+			w = v @ Q
+			M -= w * w / denom
+			X_inv -= np.outer(v, v) / denom
+
+			# refresh from scratch once in a while to keep round-off errors in check
+			if iterations % 64 == 0:
+				X_inv = LA.inv((Q * u) @ Q.T)
+				M = np.sum(Q * (X_inv @ Q), axis=0)
+
+		self._prev_u = u
+		return u, iterations
+
+	@staticmethod
+	def solve_enclosure_weights_reference(Q, tolerance):
+		"""Khachiyan's iteration for the minimum volume enclosing ellipse weights, reference implementation.
+		Starts from uniform weights, recomputes X, its pseudo inverse and M every iteration.
+
+		Args:
+			Q (np.ndarray): Augmented points, shape (3, NUM_POINTS)
+			tolerance (float): Tolerance for optimization error
+
+		Returns:
+			tuple: weights u of shape (NUM_POINTS,), number of iterations
+		"""
+		NUM_POINTS = Q.shape[1]
 		err = 1
 		u  = np.ones((NUM_POINTS, 1)) / NUM_POINTS
 		d = 2
+		iterations = 0
 
 		while err > tolerance:
 			# X = Q . diag(u) . Q'
@@ -92,35 +215,9 @@ class Ellipse2D:
 
 			err = LA.norm(new_u - u)
 			u = new_u
+			iterations += 1
 
-		# U = diag(u)
-		U = np.diag(u.flatten())
-
-		# A = (1/d) * ( (points . U . points') - (points . u . u.T . points.T) )
-		A = (1/d) * LA.pinv(LA.multi_dot([points, U, points.T]) - LA.multi_dot([points, u, u.T, points.T]))
-
-		# compute SVD(A)
-		_, Q, V = LA.svd(A)
-
-		# rotate V matrix by 270. augment zeros to the right, then aug 0,0,1 to the bottom
-		rot_V = np.rot90(V,3)
-		rot_aug2_V = np.concatenate((rot_V, np.zeros((2,1))), axis=1)
-		rot_aug3_V = np.concatenate((rot_aug2_V, np.array([[0,0,1]])), axis=0)
-
-		# extract rotation from rotated augmented V
-		rotation = R.from_matrix(rot_aug3_V)
-
-		# update ellipse params
-		self.semi_minor_axis = 1 / (Q[0])**0.5
-		self.semi_major_axis = 1 / (Q[1])**0.5
-		self.center_coords = tuple(np.matmul(points, u).flatten())
-		self.rotation_angle = rotation.as_euler('ZYX')[0]
-
-		# update focal length and focal points. note: in that order
-		self.update_focal_length()
-		self.update_focal_points()
-
-		return self.get_params()
+		return u.flatten(), iterations
 
 	def update_estimations(self):
 		"""
@@ -1,5 +1,7 @@
 import os
+import random
 import shutil
+import time
 from datetime import timedelta
 
 import cv2 as cv
@@ -17,6 +19,9 @@ from .ellipse import Ellipse2D
 from .target import Target
 
 from .settings import *
+from .telemetry import TelemetryLog, COLUMN_INDEX
+from .singer_model import get_singer_cache_report
+from .profiler import FrameProfiler
 from .my_imports import create_video_from_images
 from .plot_manager import PlotManager
 import matplotlib.pyplot as plt
@@ -50,6 +55,7 @@ class ExperimentManager:
             use_true_kin=True,
             use_real_clock=True,
             draw_occlusion_bars=False,
+            headless=False,
             args=None):
 
         # save experiment options
@@ -61,12 +67,25 @@ class ExperimentManager:
         self.use_true_kin = use_true_kin
         self.use_real_clock = use_real_clock
         self.draw_occlusion_bars = draw_occlusion_bars
+        self.headless = headless
         self.args = args
         self.final_time = FINAL_TIME
 
+        # seed for random sources, vision tracker runs every tracker_interval-th step (command line overrides settings)
+        seed = getattr(args, 'seed', None)
+        self.random_seed = seed if seed is not None else RANDOM_SEED
+        tracker_interval = getattr(args, 'track_every', None)
+        self.tracker_interval = max(1, tracker_interval if tracker_interval is not None else TRACKER_STEP_INTERVAL)
+        self.feature_backend = getattr(args, 'features', None) or FEATURE_BACKEND
+
         # initialize target ID
         self.current_id = 0
 
+        # per stage frame profiler (--profile, --trace also exports Chrome trace JSON)
+        self.trace_file = getattr(args, 'trace', None)
+        self.profiler = FrameProfiler(enabled=getattr(args, 'profile', False) or self.trace_file is not None,
+                                      capacity=PROFILE_RING_SIZE)
+
         # instantiate simulator, tracker, controller and EKF
         self.simulator = Simulator(self)
         self.multi_tracker = MultiTracker(self)
@@ -74,13 +93,22 @@ class ExperimentManager:
         self.controller = Controller(self)
         # self.plot_manager = PlotManager(self)
 
-        # move tracker display next to simulator 
-        cv.namedWindow(self.multi_tracker.win_name)
-        cv.moveWindow(self.multi_tracker.win_name, WIDTH, 0)
+        # move tracker display next to simulator (no windows in headless mode)
+        if not self.headless:
+            cv.namedWindow(self.multi_tracker.win_name)
+            cv.moveWindow(self.multi_tracker.win_name, WIDTH, 0)
 
         # initialize simulation delta time
         self.sim_dt = 0
 
+        # initialize time and steps elapsed since last frame processed by tracker (multi-rate stepping)
+        self.tracker_dt = 0.0
+        self.steps_since_tracking = 0
+
+        # initialize wall clock time and simulation speed (simulated seconds per wall second)
+        self.wall_time = 0.0
+        self.sim_speed = 0.0
+
         # initialize offset of centroid from car rect center
         self.car_rect_center_centroid_offset = [0, 0]
 
@@ -91,6 +119,7 @@ class ExperimentManager:
 
         if self.write_plot:
             self.plot_file = 'plot_info.csv'
+            self.telemetry = None
 
 
     def get_drone_cam_field_of_view(self):
@@ -223,6 +252,25 @@ class ExperimentManager:
                 new_centroid_x,
                 new_centroid_y)
 
+    def get_tracker_dt(self):
+        """return simulated time elapsed between the last two frames processed by tracker.
+        Equals simulation delta time unless tracker runs every k-th step.
+
+        Returns:
+            float: tracker delta time
+        """
+        return self.tracker_dt
+
+    def seed_random_sources(self):
+        """Seeds random generators used in simulation (block and bar placement and colors, salt pepper noise),
+        so runs with fixed delta time are reproducible. Nothing is seeded if seed is None.
+        """
+        if self.random_seed is None:
+            return
+        random.seed(self.random_seed)
+        np.random.seed(self.random_seed)
+        cv.setRNGSeed(self.random_seed)
+
     def generate_target_id(self):
         self.current_id += 1
         return self.current_id 
@@ -230,7 +278,8 @@ class ExperimentManager:
     def run(self):
         """Main run function. Running experiment equates to calling this function.
         """
-        # initialize simulator
+        # seed random sources, then initialize simulator
+        self.seed_random_sources()
         self.simulator.start_new()
 
         # set targets and tell multi_tracker and tracking_manager
@@ -240,145 +289,21 @@ class ExperimentManager:
 
         # open plot file if write_plot is indicated
         if self.write_plot:
-            self.data_file = open(self.plot_file, '+w')
-            self.data_file.write(
-                f'TIME,' +
-                f'FP_1_X,' +
-                f'FP_1_Y,' +
-                f'FP_1_VX,' +
-                f'FP_1_VY,' +
-                f'FP_1_AX,' +
-                f'FP_1_AY,' +
-                f'FP_1_R,' +
-                f'FP_1_THETA,' +
-                f'FP_1_V_R,' +
-                f'FP_1_V_THETA,' +
-                f'FP_1_SPEED,' +
-                f'FP_1_HEADING,' +
-                f'FP_1_ACC,' +
-                f'FP_1_DELTA,' +
-                f'FP_2_X,' +
-                f'FP_2_Y,' +
-                f'FP_2_VX,' +
-                f'FP_2_VY,' +
-                f'FP_2_AX,' +
-                f'FP_2_AY,' +
-                f'FP_2_R,' +
-                f'FP_2_THETA,' +
-                f'FP_2_V_R,' +
-                f'FP_2_V_THETA,' +
-                f'FP_2_SPEED,' +
-                f'FP_2_HEADING,' +
-                f'FP_2_ACC,' +
-                f'FP_2_DELTA,' +
-                f'Y_1,' +
-                f'Y_2,' +
-                f'A_LAT,' +
-                f'A_LNG,' +
-                f'S,' +
-                f'C,' +
-                f'Z_W,' +
-                f'S_DOT,' +
-                f'C_DOT,' +
-                f'Z_W_DOT,' +
-                f'AZ_S,' +
-                f'AZ_C,' +
-                f'AZ_Z,' +
-                f'AZ,' +
-                f'T_1_OCCLUSION_CASE,' +
-                f'T_1_X_MEAS,' +
-                f'T_1_Y_MEAS,' +
-                f'T_1_R_MEAS,' +
-                f'T_1_THETA_MEAS,' +
-                f'T_1_X_EST,' +
-                f'T_1_Y_EST,' +
-                f'T_1_VX_EST,' +
-                f'T_1_VY_EST,' +
-                f'T_1_AX_EST,' +
-                f'T_1_AY_EST,' +
-                f'T_1_R_EST,' +
-                f'T_1_THETA_EST,' +
-                f'T_1_V_R_EST,' +
-                f'T_1_V_THETA_EST,' +
-                f'T_1_SPEED_EST,' +
-                f'T_1_BETA_EST,' +
-                f'T_1_ACC_EST,' +
-                f'T_1_DELTA_EST,' +
-                f'T_1_TRUE_R,' +
-                f'T_1_TRUE_THETA,' +
-                f'T_1_TRUE_V_R,' +
-                f'T_1_TRUE_V_THETA,' +
-                f'T_2_OCCLUSION_CASE,' +
-                f'T_2_X_MEAS,' +
-                f'T_2_Y_MEAS,' +
-                f'T_2_R_MEAS,' +
-                f'T_2_THETA_MEAS,' +
-                f'T_2_X_EST,' +
-                f'T_2_Y_EST,' +
-                f'T_2_VX_EST,' +
-                f'T_2_VY_EST,' +
-                f'T_2_AX_EST,' +
-                f'T_2_AY_EST,' +
-                f'T_2_R_EST,' +
-                f'T_2_THETA_EST,' +
-                f'T_2_V_R_EST,' +
-                f'T_2_V_THETA_EST,' +
-                f'T_2_SPEED_EST,' +
-                f'T_2_BETA_EST,' +
-                f'T_2_ACC_EST,' +
-                f'T_2_DELTA_EST,' +
-                f'T_2_TRUE_R,' +
-                f'T_2_TRUE_THETA,' +
-                f'T_2_TRUE_V_R,' +
-                f'T_2_TRUE_V_THETA,' +
-                f'T_3_OCCLUSION_CASE,' +
-                f'T_3_X_MEAS,' +
-                f'T_3_Y_MEAS,' +
-                f'T_3_R_MEAS,' +
-                f'T_3_THETA_MEAS,' +
-                f'T_3_X_EST,' +
-                f'T_3_Y_EST,' +
-                f'T_3_VX_EST,' +
-                f'T_3_VY_EST,' +
-                f'T_3_AX_EST,' +
-                f'T_3_AY_EST,' +
-                f'T_3_R_EST,' +
-                f'T_3_THETA_EST,' +
-                f'T_3_V_R_EST,' +
-                f'T_3_V_THETA_EST,' +
-                f'T_3_SPEED_EST,' +
-                f'T_3_BETA_EST,' +
-                f'T_3_ACC_EST,' +
-                f'T_3_DELTA_EST,' +
-                f'T_3_TRUE_R,' +
-                f'T_3_TRUE_THETA,' +
-                f'T_3_TRUE_V_R,' +
-                f'T_3_TRUE_V_THETA,' +
-                f'DRONE_POS_X,' +
-                f'DRONE_POS_Y,' +
-                f'DRONE_VEL_X,' +
-                f'DRONE_VEL_Y,' +
-                f'CAM_ORIGIN_X,' +
-                f'CAM_ORIGIN_Y,' +
-                f'DRONE_POS_X_W,' + 
-                f'DRONE_POS_Y_W,' +
-                f'DRONE_SPEED,' +
-                f'DRONE_ALPHA,' +
-                f'C_DES,' + 
-                f'SCZ_IND,' +
-                f'ELLIPSE_MAJOR,' +
-                f'ELLIPSE_MINOR,' +
-                f'ELLIPSE_ROT_ANG,' +
-                f'A_LAT_LONG_DENOM\n'
-            )
+            self.telemetry = TelemetryLog(TELEMETRY_FILE, block_size=TELEMETRY_BLOCK_SIZE)
             self.write_count = 0
-            self.write_skip = 5
+            self.write_skip = TELEMETRY_WRITE_SKIP
 
         # run experiment
+        wall_start = time.perf_counter()
+        profiler = self.profiler
         while self.simulator.running:
+            profiler.begin_frame()
+
             # get delta time between ticks (0 when paused), update elapsed simulated time
-            self.simulator.dt = self.simulator.clock.tick(FPS) / 1000000.0
-            if not self.use_real_clock:
+            if self.use_real_clock:
+                self.simulator.dt = self.simulator.clock.tick(FPS) / 1000000.0
+            else:
+                # fast-forward, advance exactly DELTA_TIME per step, no wall clock pacing
                 self.simulator.dt = DELTA_TIME
             if self.simulator.pause:
                 self.simulator.dt = 0.0
@@ -391,71 +316,115 @@ class ExperimentManager:
                 self.simulator.running = False
 
             # handle events on simulator
-            self.simulator.handle_events()
+            with profiler.span('events'):
+                self.simulator.handle_events()
 
 
-            # if quit event occurs, running will be updated; respond to it
+            # if quit event occurs, running will be updated; respond to it (close the frame so no span is left open)
             if not self.simulator.running:
+                profiler.end_frame()
                 break
             
             # update rects and images for all sprites (not when paused)
             if not self.simulator.pause:
-                self.simulator.update()
+                with profiler.span('update'):
+                    self.simulator.update()
                 # print stuffs to console
                 # if not CLEAN_CONSOLE:
                 #     print(f'SSSS >> {str(timedelta(seconds=self.simulator.time))} >> DRONE - x:{vec_str(self.simulator.camera.position)} | v:{vec_str(self.simulator.camera.velocity)} | CAR - x:{vec_str(self.simulator.car.position)}, v: {vec_str(self.simulator.car.velocity)} | COMMANDED a:{vec_str(self.simulator.camera.acceleration)} | a_comm:{vec_str(self.simulator.cam_accel_command)} | rel_car_pos: {vec_str(self.simulator.car.position - self.simulator.camera.position)}', end='\n')
 
             # draw updated car, blocks and bars (drone will be drawn later)
-            self.simulator.draw()
+            with profiler.span('draw'):
+                self.simulator.draw()
 
             # process screen capture *PARTY IS HERE*
             if not self.simulator.pause:
 
                 # let tracker process image, when simulator indicates ok
                 if self.simulator.can_begin_tracking():
-                    # get screen capture from simulator
-                    screen_capture = self.simulator.get_screen_capture()
-                    
-                    # process image through multi_tracker; it knows to record information in targets
-                    self.multi_tracker.process_image_complete(screen_capture)
+                    self.tracker_dt += self.simulator.dt
+                    self.steps_since_tracking += 1
+
+                    # multi-rate: tracker processes every tracker_interval-th frame, target EKFs predict in between
+                    if self.multi_tracker.is_first_time() or self.steps_since_tracking >= self.tracker_interval:
+                        # get screen capture (color and grayscale) from simulator
+                        with profiler.span('capture'):
+                            screen_capture, screen_capture_gray = self.simulator.get_screen_capture(with_gray=True)
+
+                        # process image through multi_tracker; it knows to record information in targets
+                        with profiler.span('tracker'):
+                            self.multi_tracker.process_image_complete(screen_capture, screen_capture_gray)
+                        self.tracker_dt = 0.0
+                        self.steps_since_tracking = 0
+                    else:
+                        with profiler.span('tracker_predict'):
+                            self.multi_tracker.process_prediction()
 
                     # let controller generate acceleration, when tracker indicates ok (which is when first frame is processed)
                     if self.multi_tracker.can_begin_control():
                         # collect kinematics, compute ellipse parameters, filter
-                        self.tracking_manager.compute_enclosing_ellipse(tolerance=ELLIPSE_TOLERANCE)
-                        self.tracking_manager.compute_focal_point_estimations()
+                        with profiler.span('ellipse'):
+                            self.tracking_manager.compute_enclosing_ellipse(tolerance=ELLIPSE_TOLERANCE)
+                        with profiler.span('focal_points'):
+                            self.tracking_manager.compute_focal_point_estimations()
 
                         # display tracked information 
-                        self.tracking_manager.display()
+                        with profiler.span('display'):
+                            self.tracking_manager.display()
 
                         # generate acceleration command for dronecamera, apply
-                        ax, ay, az = self.controller.generate_acceleration(self.tracking_manager.ellipse_params_est,
-                                                                           self.tracking_manager.ellipse_params_meas[0],
-                                                                           self.tracking_manager.ellipse_params_meas[1],
-                                                                           degrees(self.tracking_manager.ellipse_params_meas[3]))
+                        with profiler.span('controller'):
+                            ax, ay, az = self.controller.generate_acceleration(self.tracking_manager.ellipse_params_est,
+                                                                               self.tracking_manager.ellipse_params_meas[0],
+                                                                               self.tracking_manager.ellipse_params_meas[1],
+                                                                               degrees(self.tracking_manager.ellipse_params_meas[3]))
 
                         self.simulator.camera.apply_accleration_command(ax, ay, az)
 
                         # self.plot_manager.uas_focal_points_plotter.collect_data()
                         if self.write_plot:
                             if self.write_count==0:
-                                self.write_info()
+                                with profiler.span('write_info'):
+                                    self.write_info()
                             self.write_count += 1
                             if self.write_count == self.write_skip:
                                 self.write_count = 0
                         # self.plot_manager.plot()
                         
 
-            self.simulator.draw_extra()
-            self.simulator.show_drawing()
+            with profiler.span('draw_extra'):
+                self.simulator.draw_extra()
+                self.simulator.show_drawing()
 
 
             if self.simulator.save_screen:
-                next(self.simulator.screen_shot)
+                with profiler.span('save_screen'):
+                    next(self.simulator.screen_shot)
+
+            profiler.end_frame()
 
-        cv.destroyAllWindows()
+        if not self.headless:
+            cv.destroyAllWindows()
         if self.write_plot:
-            self.data_file.close()
+            self.telemetry.close()
+            if TELEMETRY_EXPORT_CSV:
+                self.telemetry.export_csv(self.plot_file)
+        self.multi_tracker.shutdown()
+        self.simulator.close_screen_saver()
+
+        # report simulation speed
+        self.wall_time = time.perf_counter() - wall_start
+        self.sim_speed = self.simulator.time / self.wall_time if self.wall_time > 0 else float('inf')
+        print(f'\nSimulated {self.simulator.time:0.2f} s in {self.wall_time:0.2f} s wall time ' +
+              f'[{self.sim_speed:0.2f} simulated seconds per wall second]')
+        # diagnostics reports only when profiling (--profile or --trace)
+        if self.profiler.enabled:
+            print(self.multi_tracker.get_timing_report())
+            print(get_singer_cache_report())
+            print(self.profiler.get_report())
+            if self.trace_file is not None:
+                self.profiler.export_chrome_trace(self.trace_file)
+                print(f'Chrome trace written to {self.trace_file}')
 
 
     def write_info(self):
@@ -502,275 +471,32 @@ class ExperimentManager:
         controller_data = self.controller.stored_data
         tracker_data = self.tracking_manager.stored_data
 
-        TIME = self.simulator.time
-
-        FP_1_X = controller_data[0]
-        FP_1_Y = controller_data[1]
-        FP_1_VX = controller_data[2]
-        FP_1_VY = controller_data[3]
-        FP_1_AX = controller_data[4]
-        FP_1_AY = controller_data[5]
-        FP_1_R = controller_data[6]
-        FP_1_THETA = degrees(controller_data[7])
-        FP_1_V_R = controller_data[8]
-        FP_1_V_THETA = controller_data[9]
-        FP_1_SPEED = controller_data[10]
-        FP_1_HEADING = degrees(controller_data[11])
-        FP_1_ACC = controller_data[12]
-        FP_1_DELTA = controller_data[13]
-        FP_2_X = controller_data[14]
-        FP_2_Y = controller_data[15]
-        FP_2_VX = controller_data[16]
-        FP_2_VY = controller_data[17]
-        FP_2_AX = controller_data[18]
-        FP_2_AY = controller_data[19]
-        FP_2_R = controller_data[20]
-        FP_2_THETA = degrees(controller_data[21])
-        FP_2_V_R = controller_data[22]
-        FP_2_V_THETA = controller_data[23]
-        FP_2_SPEED = controller_data[24]
-        FP_2_HEADING = degrees(controller_data[25])
-        FP_2_ACC = controller_data[26]
-        FP_2_DELTA = controller_data[27]
-        Y_1 = controller_data[28]
-        Y_2 = controller_data[29]
-        A_LAT = controller_data[30]
-        A_LNG = controller_data[31]
-        S = controller_data[32]
-        C = controller_data[33]
-        Z_W = controller_data[34]
-        S_DOT = controller_data[35]
-        C_DOT = controller_data[36]
-        Z_W_DOT = controller_data[37]
-        AZ_S = controller_data[38]
-        AZ_C = controller_data[39]
-        AZ_Z = controller_data[40]
-        AZ = controller_data[41]
-        C_DES = controller_data[42]
-        SCZ_IND = controller_data[43]
-        ELLIPSE_MAJOR = controller_data[44]
-        ELLIPSE_MINOR = controller_data[45]
-        ELLIPSE_ROT_ANG = controller_data[46]
-        A_LAT_LONG_DENOM = controller_data[47]
-
-        T_1_OCCLUSION_CASE = tracker_data[0]
-        T_1_X_MEAS = tracker_data[1] if tracker_data[1] is not None else NAN
-        T_1_Y_MEAS = tracker_data[2] if tracker_data[2] is not None else NAN
-        T_1_R_MEAS = tracker_data[3] if tracker_data[3] is not None else NAN
-        T_1_THETA_MEAS = degrees(tracker_data[4]) if tracker_data[4] is not None else NAN
-        T_1_X_EST = tracker_data[5]
-        T_1_Y_EST = tracker_data[6]
-        T_1_VX_EST = tracker_data[7]
-        T_1_VY_EST = tracker_data[8]
-        T_1_AX_EST = tracker_data[9]
-        T_1_AY_EST = tracker_data[10]
-        T_1_R_EST = tracker_data[11]
-        T_1_THETA_EST = degrees(tracker_data[12])
-        T_1_V_R_EST = tracker_data[13]
-        T_1_V_THETA_EST = tracker_data[14]
-        T_1_SPEED_EST = tracker_data[15]
-        T_1_BETA_EST = degrees(tracker_data[16])
-        T_1_ACC_EST = tracker_data[17]
-        T_1_DELTA_EST = tracker_data[18]
-        T_1_TRUE_R = tracker_data[19]
-        T_1_TRUE_THETA = degrees(tracker_data[20])
-        T_1_TRUE_V_R = tracker_data[21]
-        T_1_TRUE_V_THETA = tracker_data[22]
-
-        T_2_OCCLUSION_CASE = tracker_data[23]
-        T_2_X_MEAS = tracker_data[24] if tracker_data[24] is not None else NAN
-        T_2_Y_MEAS = tracker_data[25] if tracker_data[25] is not None else NAN
-        T_2_R_MEAS = tracker_data[26] if tracker_data[26] is not None else NAN
-        T_2_THETA_MEAS = degrees(tracker_data[27]) if tracker_data[27] is not None else NAN
-        T_2_X_EST = tracker_data[28]
-        T_2_Y_EST = tracker_data[29]
-        T_2_VX_EST = tracker_data[30]
-        T_2_VY_EST = tracker_data[31]
-        T_2_AX_EST = tracker_data[32]
-        T_2_AY_EST = tracker_data[33]
-        T_2_R_EST = tracker_data[34]
-        T_2_THETA_EST = degrees(tracker_data[35])
-        T_2_V_R_EST = tracker_data[36]
-        T_2_V_THETA_EST = tracker_data[37]
-        T_2_SPEED_EST = tracker_data[38]
-        T_2_BETA_EST = degrees(tracker_data[39])
-        T_2_ACC_EST = tracker_data[40]
-        T_2_DELTA_EST = tracker_data[41]
-        T_2_TRUE_R = tracker_data[42]
-        T_2_TRUE_THETA = degrees(tracker_data[43])
-        T_2_TRUE_V_R = tracker_data[44]
-        T_2_TRUE_V_THETA = tracker_data[45]
-
-        T_3_OCCLUSION_CASE = tracker_data[46]
-        T_3_X_MEAS = tracker_data[47] if tracker_data[47] is not None else NAN
-        T_3_Y_MEAS = tracker_data[48] if tracker_data[48] is not None else NAN
-        T_3_R_MEAS = tracker_data[49] if tracker_data[49] is not None else NAN
-        T_3_THETA_MEAS = degrees(tracker_data[50]) if tracker_data[50] is not None else NAN
-        T_3_X_EST = tracker_data[51]
-        T_3_Y_EST = tracker_data[52]
-        T_3_VX_EST = tracker_data[53]
-        T_3_VY_EST = tracker_data[54]
-        T_3_AX_EST = tracker_data[55]
-        T_3_AY_EST = tracker_data[56]
-        T_3_R_EST = tracker_data[57]
-        T_3_THETA_EST = degrees(tracker_data[58])
-        T_3_V_R_EST = tracker_data[59]
-        T_3_V_THETA_EST = tracker_data[60]
-        T_3_SPEED_EST = tracker_data[61]
-        T_3_BETA_EST = degrees(tracker_data[62])
-        T_3_ACC_EST = tracker_data[63]
-        T_3_DELTA_EST = tracker_data[64]
-        T_3_TRUE_R = tracker_data[65]
-        T_3_TRUE_THETA = degrees(tracker_data[66])
-        T_3_TRUE_V_R = tracker_data[67]
-        T_3_TRUE_V_THETA = tracker_data[68]
+        # fill next telemetry row in place, angles stay in radians (converted to degrees on flush)
+        # and None measurements (occluded targets) are stored as NaN
+        row = self.telemetry.new_row()
+        row[0] = self.simulator.time
+        row[COLUMN_INDEX['FP_1_X']:COLUMN_INDEX['AZ'] + 1] = controller_data[:42]
+        row[COLUMN_INDEX['T_1_OCCLUSION_CASE']:COLUMN_INDEX['T_3_TRUE_V_THETA'] + 1] = tracker_data
+        row[COLUMN_INDEX['C_DES']:COLUMN_INDEX['A_LAT_LONG_DENOM'] + 1] = controller_data[42:48]
 
         DRONE_POS_X, DRONE_POS_Y = self.get_true_drone_position()
         DRONE_VEL_X, DRONE_VEL_Y = self.get_true_drone_velocity()
         CAM_ORIGIN_X, CAM_ORIGIN_Y = self.get_cam_origin()
 
-        DRONE_POS_X_W = DRONE_POS_X + CAM_ORIGIN_X
-        DRONE_POS_Y_W = DRONE_POS_Y + CAM_ORIGIN_Y
-
-        DRONE_SPEED = (DRONE_VEL_X**2 + DRONE_VEL_Y**2)**0.5
-        DRONE_ALPHA = degrees(atan2(DRONE_VEL_Y, DRONE_VEL_X))
-
-
-        self.data_file.write(
-            f'{TIME},' +
-            f'{FP_1_X},' +
-            f'{FP_1_Y},' +
-            f'{FP_1_VX},' +
-            f'{FP_1_VY},' +
-            f'{FP_1_AX},' +
-            f'{FP_1_AY},' +
-            f'{FP_1_R},' +
-            f'{FP_1_THETA},' +
-            f'{FP_1_V_R},' +
-            f'{FP_1_V_THETA},' +
-            f'{FP_1_SPEED},' +
-            f'{FP_1_HEADING},' +
-            f'{FP_1_ACC},' +
-            f'{FP_1_DELTA},' +
-            f'{FP_2_X},' +
-            f'{FP_2_Y},' +
-            f'{FP_2_VX},' +
-            f'{FP_2_VY},' +
-            f'{FP_2_AX},' +
-            f'{FP_2_AY},' +
-            f'{FP_2_R},' +
-            f'{FP_2_THETA},' +
-            f'{FP_2_V_R},' +
-            f'{FP_2_V_THETA},' +
-            f'{FP_2_SPEED},' +
-            f'{FP_2_HEADING},' +
-            f'{FP_2_ACC},' +
-            f'{FP_2_DELTA},' +
-            f'{Y_1},' +
-            f'{Y_2},' +
-            f'{A_LAT},' +
-            f'{A_LNG},' +
-            f'{S},' +
-            f'{C},' +
-            f'{Z_W},' +
-            f'{S_DOT},' +
-            f'{C_DOT},' +
-            f'{Z_W_DOT},' +
-            f'{AZ_S},' +
-            f'{AZ_C},' +
-            f'{AZ_Z},' +
-            f'{AZ},' +
-            f'{T_1_OCCLUSION_CASE},' +
-            f'{T_1_X_MEAS},' +
-            f'{T_1_Y_MEAS},' +
-            f'{T_1_R_MEAS},' +
-            f'{T_1_THETA_MEAS},' +
-            f'{T_1_X_EST},' +
-            f'{T_1_Y_EST},' +
-            f'{T_1_VX_EST},' +
-            f'{T_1_VY_EST},' +
-            f'{T_1_AX_EST},' +
-            f'{T_1_AY_EST},' +
-            f'{T_1_R_EST},' +
-            f'{T_1_THETA_EST},' +
-            f'{T_1_V_R_EST},' +
-            f'{T_1_V_THETA_EST},' +
-            f'{T_1_SPEED_EST},' +
-            f'{T_1_BETA_EST},' +
-            f'{T_1_ACC_EST},' +
-            f'{T_1_DELTA_EST},' +
-            f'{T_1_TRUE_R},' +
-            f'{T_1_TRUE_THETA},' +
-            f'{T_1_TRUE_V_R},' +
-            f'{T_1_TRUE_V_THETA},' +
-            f'{T_2_OCCLUSION_CASE},' +
-            f'{T_2_X_MEAS},' +
-            f'{T_2_Y_MEAS},' +
-            f'{T_2_R_MEAS},' +
-            f'{T_2_THETA_MEAS},' +
-            f'{T_2_X_EST},' +
-            f'{T_2_Y_EST},' +
-            f'{T_2_VX_EST},' +
-            f'{T_2_VY_EST},' +
-            f'{T_2_AX_EST},' +
-            f'{T_2_AY_EST},' +
-            f'{T_2_R_EST},' +
-            f'{T_2_THETA_EST},' +
-            f'{T_2_V_R_EST},' +
-            f'{T_2_V_THETA_EST},' +
-            f'{T_2_SPEED_EST},' +
-            f'{T_2_BETA_EST},' +
-            f'{T_2_ACC_EST},' +
-            f'{T_2_DELTA_EST},' +
-            f'{T_2_TRUE_R},' +
-            f'{T_2_TRUE_THETA},' +
-            f'{T_2_TRUE_V_R},' +
-            f'{T_2_TRUE_V_THETA},' +
-            f'{T_3_OCCLUSION_CASE},' +
-            f'{T_3_X_MEAS},' +
-            f'{T_3_Y_MEAS},' +
-            f'{T_3_R_MEAS},' +
-            f'{T_3_THETA_MEAS},' +
-            f'{T_3_X_EST},' +
-            f'{T_3_Y_EST},' +
-            f'{T_3_VX_EST},' +
-            f'{T_3_VY_EST},' +
-            f'{T_3_AX_EST},' +
-            f'{T_3_AY_EST},' +
-            f'{T_3_R_EST},' +
-            f'{T_3_THETA_EST},' +
-            f'{T_3_V_R_EST},' +
-            f'{T_3_V_THETA_EST},' +
-            f'{T_3_SPEED_EST},' +
-            f'{T_3_BETA_EST},' +
-            f'{T_3_ACC_EST},' +
-            f'{T_3_DELTA_EST},' +
-            f'{T_3_TRUE_R},' +
-            f'{T_3_TRUE_THETA},' +
-            f'{T_3_TRUE_V_R},' +
-            f'{T_3_TRUE_V_THETA},' +
-            f'{DRONE_POS_X},' +
-            f'{DRONE_POS_Y},' +
-            f'{DRONE_VEL_X},' +
-            f'{DRONE_VEL_Y},' +
-            f'{CAM_ORIGIN_X},' +
-            f'{CAM_ORIGIN_Y},' +
-            f'{DRONE_POS_X_W},' + 
-            f'{DRONE_POS_Y_W},' +
-            f'{DRONE_SPEED},' +
-            f'{DRONE_ALPHA},' +
-            f'{C_DES},' + 
-            f'{SCZ_IND},' +
-            f'{ELLIPSE_MAJOR},' +
-            f'{ELLIPSE_MINOR},' +
-            f'{ELLIPSE_ROT_ANG},' +
-            f'{A_LAT_LONG_DENOM}\n'
+        row[COLUMN_INDEX['DRONE_POS_X']:COLUMN_INDEX['DRONE_ALPHA'] + 1] = (
+            DRONE_POS_X,
+            DRONE_POS_Y,
+            DRONE_VEL_X,
+            DRONE_VEL_Y,
+            CAM_ORIGIN_X,
+            CAM_ORIGIN_Y,
+            DRONE_POS_X + CAM_ORIGIN_X,                     # DRONE_POS_X_W
+            DRONE_POS_Y + CAM_ORIGIN_Y,                     # DRONE_POS_Y_W
+            (DRONE_VEL_X**2 + DRONE_VEL_Y**2)**0.5,         # DRONE_SPEED
+            atan2(DRONE_VEL_Y, DRONE_VEL_X)                 # DRONE_ALPHA
         )
 
 
-
-
-
     @staticmethod
     def make_video(video_name, folder_path):
         """Helper function, looks for frames in given folder,
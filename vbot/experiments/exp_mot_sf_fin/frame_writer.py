@@ -0,0 +1,226 @@
+import os
+import queue
+import threading
+
+import cv2 as cv
+
+from .my_imports import images_assemble
+
+
+class AsyncFrameWriter:
+    """Writes frames to image files in background threads, off the simulation loop.
+    Subclasses may override write_frame to write frames elsewhere (see AsyncVideoWriter).
+
+    Frames are handed over through a bounded queue. Writer takes ownership of submitted images,
+    caller must not modify them afterwards. When queue is full, drop_policy decides what happens:
+        'block'       - wait for room in the queue (backpressure on the simulation loop)
+        'drop_newest' - discard the frame being submitted
+        'drop_oldest' - discard the oldest frame waiting in the queue to make room
+    """
+
+    DROP_POLICIES = ('block', 'drop_newest', 'drop_oldest')
+
+    def __init__(self,
+                 path,
+                 image_format='png',
+                 png_compression=3,
+                 jpeg_quality=95,
+                 queue_size=64,
+                 drop_policy='block',
+                 num_workers=2):
+        """
+        Args:
+            path (str): Folder where frames are to be written (expected to exist)
+            image_format (str, optional): 'png' or 'jpg'. Defaults to 'png'.
+            png_compression (int, optional): PNG compression level 0-9. Defaults to 3.
+            jpeg_quality (int, optional): JPEG quality 0-100. Defaults to 95.
+            queue_size (int, optional): Max number of frames waiting to be written. Defaults to 64.
+            drop_policy (str, optional): 'block', 'drop_newest' or 'drop_oldest'. Defaults to 'block'.
+            num_workers (int, optional): Number of writer threads. Defaults to 2.
+        """
+        if image_format not in ('png', 'jpg'):
+            raise ValueError(f'Unsupported image format {image_format!r}, use \'png\' or \'jpg\'')
+        if drop_policy not in self.DROP_POLICIES:
+            raise ValueError(f'Unknown drop policy {drop_policy!r}, use one of {self.DROP_POLICIES}')
+
+        self.path = path
+        self.image_format = image_format
+        self.drop_policy = drop_policy
+        if image_format == 'png':
+            self.encode_params = [cv.IMWRITE_PNG_COMPRESSION, png_compression]
+        else:
+            self.encode_params = [cv.IMWRITE_JPEG_QUALITY, jpeg_quality]
+
+        self.frames_submitted = 0
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self._count_lock = threading.Lock()
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._workers = [threading.Thread(target=self._work, name=f'frame_writer_{i}', daemon=True)
+                         for i in range(num_workers)]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, images, grid_shape=(1, 1)):
+        """Hands over images of one frame to the writer. Images are assembled into a grid and written in background.
+
+        Args:
+            images (list): List of images making up the frame
+            grid_shape (tuple, optional): Grid shape used to assemble images. Defaults to (1, 1).
+
+        Returns:
+            bool: False if the frame was dropped
+        """
+        self.frames_submitted += 1
+        job = (self.frames_submitted, images, grid_shape)
+
+        if self.drop_policy == 'block':
+            self._queue.put(job)
+            return True
+
+        try:
+            self._queue.put_nowait(job)
+            return True
+        except queue.Full:
+            if self.drop_policy == 'drop_newest':
+                self._count_dropped()
+                return False
+
+        # drop_oldest: make room by discarding the oldest waiting frame
+        while True:
+            try:
+                self._queue.get_nowait()
+                self._queue.task_done()
+                self._count_dropped()
+            except queue.Empty:
+                pass
+            try:
+                self._queue.put_nowait(job)
+                return True
+            except queue.Full:
+                continue
+
+    def _count_dropped(self):
+        with self._count_lock:
+            self.frames_dropped += 1
+
+    def _work(self):
+        """Worker loop, assembles and writes frames until sentinel (None) is received.
+        """
+        while True:
+            job = self._queue.get()
+            if job is None:
+                self._queue.task_done()
+                break
+
+            # a failed frame counts as dropped, worker keeps running so submit and close never hang
+            written = False
+            try:
+                frame_num, images, grid_shape = job
+                img = images[0] if len(images) == 1 else images_assemble(images, grid_shape)
+                written = self.write_frame(frame_num, img)
+            except Exception as e:
+                print(f'Frame writer failed on frame {job[0]}, frame dropped: {e!r}')
+            finally:
+                with self._count_lock:
+                    if written:
+                        self.frames_written += 1
+                    else:
+                        self.frames_dropped += 1
+                self._queue.task_done()
+
+    def write_frame(self, frame_num, img):
+        """Writes one assembled frame into its own image file (called from worker threads).
+
+        Args:
+            frame_num (int): Frame number, used in file name
+            img (np.ndarray): Assembled frame
+
+        Returns:
+            bool: Write success
+        """
+        file_path = os.path.join(self.path, f'frame_{str(frame_num).zfill(5)}.{self.image_format}')
+        return cv.imwrite(file_path, img, self.encode_params)
+
+    def close(self):
+        """Waits for all queued frames to be written and stops the worker threads.
+        """
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join()
+
+    def get_report(self):
+        """Returns frame writing report
+
+        Returns:
+            str: Submitted, written and dropped frame counts
+        """
+        return (f'Frame writer [{self.image_format}, {self.drop_policy}]: submitted={self.frames_submitted}, ' +
+                f'written={self.frames_written}, dropped={self.frames_dropped}')
+
+
+class AsyncVideoWriter(AsyncFrameWriter):
+    """Streams frames into a video file (cv.VideoWriter) in a background thread, during the run.
+    Uses a single worker so frames stay in order. Queue and drop policy work same as AsyncFrameWriter.
+    """
+
+    def __init__(self,
+                 video_path,
+                 fps,
+                 fourcc_codec='DIVX',
+                 queue_size=64,
+                 drop_policy='block'):
+        """
+        Args:
+            video_path (str): Path of the video file to be written, for example './tmp/sim_track_control.avi'
+            fps (float): Framerate of the video stream
+            fourcc_codec (str, optional): 4-character code of codec used to compress the frames. Defaults to 'DIVX'.
+            queue_size (int, optional): Max number of frames waiting to be written. Defaults to 64.
+            drop_policy (str, optional): 'block', 'drop_newest' or 'drop_oldest'. Defaults to 'block'.
+        """
+        self.video_path = video_path
+        self.fps = fps
+        self.fourcc_codec = fourcc_codec
+        self._video_writer = None       # opened with the first frame, once frame size is known
+
+        super().__init__(os.path.dirname(video_path),
+                         queue_size=queue_size,
+                         drop_policy=drop_policy,
+                         num_workers=1)
+        self.image_format = fourcc_codec
+
+    def write_frame(self, frame_num, img):
+        """Writes one assembled frame into the video stream (called from the worker thread).
+
+        Args:
+            frame_num (int): Frame number (not used, frames are written in order)
+            img (np.ndarray): Assembled frame
+
+        Returns:
+            bool: Write success
+        """
+        if self._video_writer is None:
+            frame_size = (img.shape[1], img.shape[0])
+            self._video_writer = cv.VideoWriter(self.video_path,
+                                                cv.VideoWriter_fourcc(*self.fourcc_codec),
+                                                self.fps,
+                                                frame_size)
+            self._frame_size = frame_size
+            if not self._video_writer.isOpened():
+                print(f'Cannot open video writer for {self.video_path} (codec {self.fourcc_codec}), frames will be dropped.')
+
+        if not self._video_writer.isOpened() or (img.shape[1], img.shape[0]) != self._frame_size:
+            return False
+
+        self._video_writer.write(img)
+        return True
+
+    def close(self):
+        """Waits for all queued frames to be written, stops the worker thread and releases the video file.
+        """
+        super().close()
+        if self._video_writer is not None:
+            self._video_writer.release()
+            self._video_writer = None
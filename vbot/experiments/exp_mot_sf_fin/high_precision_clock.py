@@ -1,11 +1,22 @@
-import ctypes
+import time
 
 class HighPrecisionClock:
-    """High precision clock for time resolution in microseconds
+    """High precision clock for time resolution in microseconds.
+    Portable, uses time.perf_counter_ns (monotonic, highest resolution available on the platform).
     """
 
-    def __init__(self):
+    def __init__(self, unthrottled=False, spin_threshold=500):
+        """
+        Args:
+            unthrottled (bool, optional): If True, tick does not wait at all, it only measures elapsed time.
+                Useful when simulation delta time is fixed. Defaults to False.
+            spin_threshold (float, optional): Remaining delay (microseconds) below which the clock busy-waits instead of sleeping.
+                Defaults to 500.
+        """
+        self.unthrottled = unthrottled
+        self.spin_threshold = spin_threshold
         self.micro_timestamp = self.micros()
+        self.time_diff = 0.0
 
     def tick(self, framerate):
         """Implements appropriate delay given a framerate.
@@ -16,7 +27,8 @@ class HighPrecisionClock:
         Returns:
             float: time elapsed
         """
-        self.delay_microseconds(1000000 // framerate )
+        if not self.unthrottled:
+            self.delay_microseconds(1000000 // framerate )
 
         _new_micro_ts = self.micros()
         self.time_diff = _new_micro_ts - self.micro_timestamp
@@ -27,20 +39,21 @@ class HighPrecisionClock:
     @staticmethod
     def micros():
         """return timestamp in microseconds"""
-        tics = ctypes.c_int64()
-        freq = ctypes.c_int64()
+        return time.perf_counter_ns() / 1000.0
 
-        # get ticks on the internal ~3.2GHz QPC clock
-        ctypes.windll.Kernel32.QueryPerformanceCounter(ctypes.byref(tics))
-        # get the actual freq. of the internal ~3.2GHz QPC clock
-        ctypes.windll.Kernel32.QueryPerformanceFrequency(ctypes.byref(freq))
+    def delay_microseconds(self, delay_us):
+        """delay for delay_us microseconds (us).
+        Sleeps for most of the delay and busy-waits only the last spin_threshold microseconds.
+        """
+        t_end = self.micros() + delay_us
 
-        t_us = tics.value * 1e6 / freq.value
-        return t_us
+        # sleep while remaining time is comfortably larger than the OS sleep granularity
+        remaining = t_end - self.micros()
+        while remaining > self.spin_threshold:
+            time.sleep((remaining - self.spin_threshold) / 1000000.0)
+            remaining = t_end - self.micros()
 
-    def delay_microseconds(self, delay_us):
-        """delay for delay_us microseconds (us)"""
-        t_start = self.micros()
-        while (self.micros() - t_start < delay_us):
+        # spin for the rest
+        while self.micros() < t_end:
             pass    # do nothing
         return
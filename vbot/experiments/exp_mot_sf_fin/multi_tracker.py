@@ -1,30 +1,44 @@
+import time
 from datetime import timedelta
 from math import isnan, ceil
-from threading import Thread as worker
-# from multiprocessing import Process as worker
+from concurrent.futures import ThreadPoolExecutor
 
 import cv2 as cv
 import numpy as np
 from .settings import *
+from .target_ekf import TargetEKFBank
 
 import matplotlib.pyplot as plt
 
 from .my_imports import (Sift,
+                        Orb,
+                        FastBrief,
                         BruteL2,
-                        CorrelationCoeffNormed,
+                        BruteL2Index,
+                        BruteHamming,
+                        BruteHammingIndex,
+                        FlannIndex,
                         ImageDumper,
                         convert_to_grayscale,
                         FEATURE_PARAMS,
                         LK_PARAMS,
                         MAX_NUM_CORNERS,
-                        TemplateMatcher,
+                        MultiTemplateMatcher,
                         compute_optical_flow_LK,
+                        compute_optical_flow_LK_batch,
                         draw_tracks,
                         draw_point,
                         draw_sparse_optical_flow_arrows,
                         put_text,
                         images_assemble,)
 
+# feature backends: detector, binary descriptors (Hamming matching), good descriptor match distance, ratio test
+# binary thresholds calibrated on the seeded feature_backends benchmark (--tf 40), looser Hamming distances
+# (and no ratio test) let static background patches inside the search window pass as target matches
+FEATURE_DETECTORS = {'sift': (Sift, False, 250, None),
+                     'orb': (Orb, True, 20, 0.7),
+                     'fast_brief': (FastBrief, True, 20, 0.7)}
+
 class MultiTracker:
     """MultiTracker object is designed to work with and ExperimentManager object.
     It can be used to process screen captures and produce tracking information for feature points.
@@ -41,14 +55,19 @@ class MultiTracker:
         self.frame_new_color = None
 
         self.targets = None
+        self.target_ekf_bank = TargetEKFBank(manager)    # filters of all targets, stepped once per frame
         # self.frame_new_color_edited = None
         # self.img_tracker_display = None
 
         self.patch_size = round(1.5/PIXEL_TO_METERS_FACTOR)   # meters
 
-        self.detector = Sift()
-        self.descriptor_matcher = BruteL2()
-        self.template_matcher = CorrelationCoeffNormed()
+        # feature detector and descriptor matcher of selected backend
+        (detector_class,
+         self.binary_descriptors,
+         self.DES_MATCH_DISTANCE_THRESH,
+         self.DES_MATCH_RATIO) = FEATURE_DETECTORS[manager.feature_backend]
+        self.detector = detector_class()
+        self.descriptor_matcher = BruteHamming() if self.binary_descriptors else BruteL2()
 
         self.cur_img = None
 
@@ -63,7 +82,6 @@ class MultiTracker:
         self.tracker_info_mask = None   # mask over which tracker information is drawn persistently
         self.win_name = 'Multi-tracker'
         # self.img_dumper = ImageDumper(TRACKER_TEMP_FOLDER)
-        self.DES_MATCH_DISTANCE_THRESH = 250 #450
         self.DES_MATCH_DEV_THRESH = 0.50 # float('inf') to get every match
         self.TEMP_MATCH_THRESH = 0.9849
 
@@ -72,9 +90,71 @@ class MultiTracker:
         
         self.MAX_ERR = 15
 
+        # long-lived worker pool for per target stages, created once and reused every frame
+        self.worker_backend = TRACKER_WORKER_BACKEND
+        self.workers = None
+        if self.worker_backend == 'thread':
+            self.workers = ThreadPoolExecutor(max_workers=TRACKER_NUM_WORKERS, thread_name_prefix='tracker')
+        elif self.worker_backend != 'serial':
+            raise ValueError(f'Unknown tracker worker backend {self.worker_backend!r}, use \'thread\' or \'serial\'')
+
+        # per stage timing {stage_name: [num_calls, total_seconds, max_seconds]}
+        self.stage_times = {}
+
     def set_targets(self, targets):
         self.targets = targets
 
+    def run_stage(self, stage_name, stage_func):
+        """Runs given stage function on every target, waits for all of them to finish and records stage timing.
+
+        Args:
+            stage_name (str): Name of the stage used in timing report
+            stage_func (callable): Stage function that takes a target
+        """
+        t_start = time.perf_counter()
+        if self.workers is None:
+            for target in self.targets:
+                stage_func(target)
+        else:
+            # consuming results waits for all targets and re-raises worker exceptions
+            for _ in self.workers.map(stage_func, self.targets):
+                pass
+        self.record_stage_time(stage_name, time.perf_counter() - t_start)
+
+    def record_stage_time(self, stage_name, elapsed):
+        """Accumulates timing of given stage
+
+        Args:
+            stage_name (str): Name of the stage used in timing report
+            elapsed (float): Stage time (seconds)
+        """
+        stage_time = self.stage_times.setdefault(stage_name, [0, 0.0, 0.0])
+        stage_time[0] += 1
+        stage_time[1] += elapsed
+        stage_time[2] = max(stage_time[2], elapsed)
+
+        # stage just ended, also record it as a span nested in the tracker span of the frame profiler
+        t_end = time.perf_counter()
+        self.manager.profiler.record(f'tracker.{stage_name}', t_end - elapsed, t_end)
+
+    def get_timing_report(self):
+        """Returns per stage timing report
+
+        Returns:
+            str: Report with calls, mean and max time (milliseconds) per stage
+        """
+        lines = [f'Tracker stage timing [{self.worker_backend}]:']
+        for stage_name, (num_calls, total, max_time) in self.stage_times.items():
+            lines.append(f'    {stage_name:<12} calls={num_calls:<7} mean={1000*total/num_calls:8.3f} ms    max={1000*max_time:8.3f} ms')
+        return '\n'.join(lines)
+
+    def shutdown(self):
+        """Shuts down the worker pool. To be called once tracking is done.
+        """
+        if self.workers is not None:
+            self.workers.shutdown(wait=True)
+            self.workers = None
+
     def is_first_time(self):
         """Indicates if tracker never received a frame for the first time
 
@@ -101,40 +181,84 @@ class MultiTracker:
         """
         # use keypoints from new frame, 
         # save descriptors of new keypoints(good)
-        keyPoints = [cv.KeyPoint(*kp.ravel(), 15) for kp in target.initial_keypoints]
-        target.initial_kps, target.initial_target_descriptors = self.detector.get_descriptors_at_keypoints(
+        target.initial_kps, target.initial_target_descriptors = self.get_descriptors_at_keypoints(
                                                                 self.frame_new_gray, 
-                                                                keyPoints,
+                                                                target.initial_keypoints,
                                                                 target.bounding_box)
 
+        # cache descriptors as contiguous float32, matching index is built once here
+        target.descriptor_index = self.make_descriptor_index(target.initial_target_descriptors)
+        target.initial_target_descriptors = target.descriptor_index.reference
+
+    def make_descriptor_index(self, descriptors):
+        if self.binary_descriptors:
+            return BruteHammingIndex(descriptors)
+        if DESCRIPTOR_MATCH_INDEX == 'flann':
+            return FlannIndex(descriptors)
+        return BruteL2Index(descriptors)
+
+    def match_initial_target_descriptors(self, target, keypoints, descriptors):
+        """Matches cached initial target descriptors with given descriptors.
+        Sets target match indices (into given descriptors, -1 if unmatched), distances [shape: (-1,1)]
+        and described keypoints, the keypoints matched descriptors belong to.
+
+        Args:
+            target (Target): Target whose initial descriptors are matched
+            keypoints (list): Keypoints the extractor kept, one per descriptor
+            descriptors (numpy.ndarray): Descriptors computed in the new frame
+        """
+        target.described_keypoints = cv.KeyPoint_convert(keypoints).reshape(-1, 1, 2) if len(keypoints) > 0 else np.zeros((0, 1, 2), dtype=np.float32)
+        target.match_indices, distances = target.descriptor_index.match(descriptors, ratio=DESCRIPTOR_MATCH_RATIO or self.DES_MATCH_RATIO)
+        target.distances = distances.reshape(-1, 1)
+
+    def get_good_matched_keypoints(self, target):
+        """Returns new keypoints matched to initial target descriptors with good distances
+
+        Args:
+            target (Target): Target, after match_initial_target_descriptors
+
+        Returns:
+            numpy.ndarray: Matched keypoints [shape: (-1,1,2)]
+        """
+        good_indices = target.match_indices[target.distances.ravel() < self.DES_MATCH_DISTANCE_THRESH]
+        return target.described_keypoints[good_indices].reshape(-1, 1, 2)
+
     def save_initial_target_template(self, target):
         """Helper function used after feature keypoints and centroid computation. Saves initial target template.
         """
         # use the bounding box location to save the target template
         # x, y, w, h = bb = self.manager.get_target_bounding_box()
         # center = tuple(map(int, (x+w/2, y+h/2)))
-        target.initial_target_template_color = self.get_bb_patch_from_image(self.frame_new_color, target.bounding_box)
-        target.initial_target_template_gray = self.get_bb_patch_from_image(self.frame_new_gray, target.bounding_box)
+        # copy, frames may live in reused capture buffers
+        target.initial_target_template_color = self.get_bb_patch_from_image(self.frame_new_color, target.bounding_box).copy()
+        target.initial_target_template_gray = self.get_bb_patch_from_image(self.frame_new_gray, target.bounding_box).copy()
 
     def save_initial_patches(self, target):
         """Helper function used after feature keypoints and centroid computation. Saves initial patches around keypoints.
-        Also, initializes dedicated template matchers
+        Also, initializes template matcher of the patches
         """
-        target.initial_patches_color = [self.get_neighborhood_patch(self.frame_new_color, tuple(map(int,kp.flatten())), self.patch_size) for kp in target.initial_keypoints]
-        target.initial_patches_gray = [self.get_neighborhood_patch(self.frame_new_gray, tuple(map(int,kp.flatten())), self.patch_size) for kp in target.initial_keypoints]
+        # copy patches, frames may live in reused capture buffers
+        target.initial_patches_color = [self.get_neighborhood_patch(self.frame_new_color, tuple(map(int,kp.flatten())), self.patch_size).copy() for kp in target.initial_keypoints]
+        target.initial_patches_gray = [self.get_neighborhood_patch(self.frame_new_gray, tuple(map(int,kp.flatten())), self.patch_size).copy() for kp in target.initial_keypoints]
         
-        # initialize template matcher object for each patch
-        target.template_matchers = [TemplateMatcher(patch, self.template_matcher) for patch in target.initial_patches_color]
+        # initialize template matcher for all patches, template statistics are computed once here
+        target.template_matcher = self.make_template_matcher(target.initial_patches_color)
 
     def update_patches(self, target):
         # pass
         self.patch_size = round(1.5 / self.manager.simulator.pxm_fac)
-        target.patches_color = [self.get_neighborhood_patch(self.frame_new_color, tuple(map(int,kp.flatten())), self.patch_size) for kp in target.keypoints_new_good]
-        target.template_matchers = [TemplateMatcher(patch, self.template_matcher) for patch in target.patches_color]
+        target.patches_color = [self.get_neighborhood_patch(self.frame_new_color, tuple(map(int,kp.flatten())), self.patch_size).copy() for kp in target.keypoints_new_good]
+        target.template_matcher = self.make_template_matcher(target.patches_color)
+
+    @staticmethod
+    def make_template_matcher(patches):
+        return MultiTemplateMatcher(patches,
+                                    use_gray=TEMPLATE_MATCH_GRAY,
+                                    pyramid_levels=TEMPLATE_MATCH_PYRAMID_LEVELS)
 
     def update_template(self):
         for target in self.targets:
-            target.template_gray = self.get_bb_patch_from_image(self.frame_new_gray, target.bounding_box)
+            target.template_gray = self.get_bb_patch_from_image(self.frame_new_gray, target.bounding_box).copy()
 
     def augment_old_frame(self):
         # keypoints that were not found in new frame would get discounted by the next iteration
@@ -154,15 +278,9 @@ class MultiTracker:
             tuple: Best matched template locations, best match values
         """
         bb = target.get_updated_estimated_bounding_box()
-        target.template_points = np.array([
-            temp_matcher.find_template_center_in_image_bb(img, bb)
-            for temp_matcher in target.template_matchers
-            ]).reshape(-1, 1, 2)
-
-        target.template_scores = np.array([
-            temp_matcher.get_best_match_score()
-            for temp_matcher in target.template_matchers
-            ]).reshape(-1, 1)
+        centers, scores = target.template_matcher.find_template_centers_in_image_bb(img, bb)
+        target.template_points = centers.reshape(-1, 1, 2)
+        target.template_scores = scores.reshape(-1, 1)
 
         return target.template_points, target.template_scores
 
@@ -277,6 +395,25 @@ class MultiTracker:
         mask[y:y+height, x:x+width] = 255
         return mask
 
+    @staticmethod
+    def clamp_bounding_box(img, x, y, width, height):
+        """Returns bounding box clipped to image bounds, so it can be used to crop the image
+
+        Args:
+            img (numpy.ndarray): Image the bounding box lies in
+            x (int): x coord of top left of bounding box
+            y (int): y coord of top left of bounding box
+            width (int): width of bounding box
+            height (int): height of bounding box
+
+        Returns:
+            tuple: (x, y, width, height) clipped bounding box, width or height may be 0
+        """
+        img_height, img_width = img.shape[:2]
+        x_1, y_1 = min(max(int(x), 0), img_width), min(max(int(y), 0), img_height)
+        x_2, y_2 = min(max(int(x + width), x_1), img_width), min(max(int(y + height), y_1), img_height)
+        return x_1, y_1, x_2 - x_1, y_2 - y_1
+
     @staticmethod
     def get_centroid(points):
         """Returns centroid of given list of points
@@ -312,6 +449,50 @@ class MultiTracker:
         comb_kpts = np.concatenate((shi_tomasi_kpts, detector_kpts), axis=0)
         return comb_kpts
 
+    def get_good_features_in_bounding_box(self, img, bb):
+        """Returns shi-tomasi good features computed only in the bounding box region of given image.
+        Image is cropped to the (clamped) bounding box instead of masked, so cost scales with box size.
+
+        Args:
+            img (numpy.ndarray): Grayscale image
+            bb (tuple): Bounding box (x, y, width, height)
+
+        Returns:
+            numpy.ndarray: Good feature points in image coordinates [shape: (-1,1,2)], None if none found
+        """
+        x, y, w, h = self.clamp_bounding_box(img, *bb)
+        if w == 0 or h == 0:
+            return None
+        keypoints = cv.goodFeaturesToTrack(img[y:y+h, x:x+w], **FEATURE_PARAMS)
+        if keypoints is not None:
+            keypoints += np.array([x, y], dtype=np.float32)
+        return keypoints
+
+    def get_feature_keypoints_in_bounding_box(self, img, bb):
+        """Returns feature keypoints (shi-tomasi + detector) computed in bounding box region of given image.
+        Same as get_feature_keypoints_from_mask, without allocating and scanning a full frame mask.
+
+        Args:
+            img (numpy.ndarray): Image in which feature keypoints are to be computed
+            bb (tuple): Bounding box (x, y, width, height)
+
+        Returns:
+            numpy.ndarray: Feature keypoints
+        """
+        bb = self.clamp_bounding_box(img, *bb)
+        if bb[2] == 0 or bb[3] == 0:
+            return None
+
+        shi_tomasi_kpts = self.get_good_features_in_bounding_box(img, bb)
+        detector_kpts = self.detector.get_keypoints(img, bb=bb)
+        detector_kpts = np.array([pt.pt for pt in detector_kpts]).astype(np.float32).reshape(-1, 1, 2)
+        if len(detector_kpts) == 0:
+            return shi_tomasi_kpts
+        if shi_tomasi_kpts is None:
+            return detector_kpts
+
+        return np.concatenate((shi_tomasi_kpts, detector_kpts), axis=0)
+
     def get_descriptors_at_keypoints(self, img, keypoints, bb=None):
         """Returns computed descriptors at keypoints
 
@@ -322,8 +503,8 @@ class MultiTracker:
         Returns:
             list: List of descriptors corresponding to given keypoints.
         """
-        kps = [cv.KeyPoint(*kp.ravel(), 15) for kp in keypoints]
-        kps, descriptors = self.detector.get_descriptors_at_keypoints(self.frame_new_gray, kps, bb)
+        kps = cv.KeyPoint_convert(np.asarray(keypoints, dtype=np.float32).reshape(-1, 2), 15)
+        kps, descriptors = self.detector.get_descriptors_at_keypoints(img, kps, bb)
         return kps, descriptors
 
     def get_true_bb_from_oracle(self, target):
@@ -358,11 +539,8 @@ class MultiTracker:
 
     
     def process_init(self, target):
-        # compute bb
-        target.bounding_box_mask = self.get_bounding_box_mask(self.frame_new_gray, *target.bounding_box)
-
-        # compute initial feature keypoints and centroid
-        target.initial_keypoints = cv.goodFeaturesToTrack(self.frame_new_gray, mask=target.bounding_box_mask, **FEATURE_PARAMS)
+        # compute initial feature keypoints (in bounding box) and centroid
+        target.initial_keypoints = self.get_good_features_in_bounding_box(self.frame_new_gray, target.bounding_box)
         target.initial_centroid = self.get_centroid(target.initial_keypoints)
         target.rel_keypoints = target.initial_keypoints - target.initial_centroid
 
@@ -512,13 +690,12 @@ class MultiTracker:
             # we should still have old centroid
             # target.bounding_box = self.get_true_bb_from_oracle(target)
             target.update_estimated_bounding_box()
-            target.bounding_box_mask = self.get_bounding_box_mask(self.frame_new_gray, *target.bounding_box)
 
             # perform part template matching and update template points and scores
             self.find_saved_patches_in_img_bb(self.frame_new_color, target)
 
             # compute good feature keypoints in the new frame (shi-tomasi + SIFT)
-            target.good_keypoints_new = self.get_feature_keypoints_from_mask(self.frame_new_gray, mask=target.bounding_box_mask, bb=target.bounding_box)
+            target.good_keypoints_new = self.get_feature_keypoints_in_bounding_box(self.frame_new_gray, target.bounding_box)
 
             if target.good_keypoints_new is None or target.good_keypoints_new.shape[0] == 0:
                 target.good_distances = []
@@ -527,11 +704,7 @@ class MultiTracker:
                 kps, descriptors = self.get_descriptors_at_keypoints(self.frame_new_gray, target.good_keypoints_new, bb=target.bounding_box)
 
                 # match descriptors 
-                target.matches = self.descriptor_matcher.compute_matches(target.initial_target_descriptors, 
-                                                                descriptors, 
-                                                                threshold=-1)
-
-                target.distances = np.array([m.distance for m in target.matches]).reshape(-1, 1)
+                self.match_initial_target_descriptors(target, kps, descriptors)
                 target.good_distances = target.distances[target.distances < self.DES_MATCH_DISTANCE_THRESH]
 
             # ---------------------------------------------------------------------
@@ -557,8 +730,7 @@ class MultiTracker:
 
                 # update keypoints
                 if len(target.good_distances) == MAX_NUM_CORNERS:
-                    good_matches = np.array(target.matches).reshape(-1, 1)[target.distances < self.DES_MATCH_DISTANCE_THRESH]
-                    target.keypoints_new_good = np.array([list(target.good_keypoints_new[gm.trainIdx]) for gm in good_matches.flatten()]).reshape(-1,1,2)
+                    target.keypoints_new_good = self.get_good_matched_keypoints(target)
                     target.keypoints_new = target.keypoints_new_good
                     target.centroid_new = self.get_centroid(target.keypoints_new_good)
                     target.rel_keypoints = target.keypoints_new - target.centroid_new
@@ -573,8 +745,9 @@ class MultiTracker:
                 # compute kinematics
                 target.kinematics = self.compute_kinematics_by_centroid(target.centroid_old, target.centroid_new)
 
-                # adjust centroid
-                if len(target.good_distances) == MAX_NUM_CORNERS:
+                # adjust centroid (not possible when no feature keypoints were found in search window)
+                if (len(target.good_distances) == MAX_NUM_CORNERS or
+                        target.good_keypoints_new is None or target.good_keypoints_new.shape[0] == 0):
                     target.centroid_adjustment = None
                 else: 
                     centroid_new_good = self.get_centroid(target.good_keypoints_new)
@@ -596,8 +769,7 @@ class MultiTracker:
                     # flow failed, matching succeeded (feature or template)
                     # compute new good keypoints using matching
                     if len(target.good_distances) > 0: 
-                        good_matches = np.array(target.matches).reshape(-1, 1)[target.distances < self.DES_MATCH_DISTANCE_THRESH]
-                        target.keypoints_new_good = np.array([list(target.good_keypoints_new[gm.trainIdx]) for gm in good_matches.flatten()]).reshape(-1,1,2)
+                        target.keypoints_new_good = self.get_good_matched_keypoints(target)
                         target.keypoints_new = target.keypoints_new_good
                         target.centroid_old = target.centroid_old_true
                         target.centroid_new = self.manager.get_target_centroid(target)
@@ -649,14 +821,13 @@ class MultiTracker:
             # no flow computations, so ask help from oracle or estimator (KF or EKF)
             # target.target_bounding_box = self.get_true_bb_from_oracle(target)
             target.update_estimated_bounding_box()
-            target.bounding_box_mask = self.get_bounding_box_mask(self.frame_new_gray, *target.bounding_box)
 
             # perform template matching for patches to update template points and scores
             self.find_saved_patches_in_img_bb(self.frame_new_color, target)
 
             # compute good feature keypoints in the new frame
             # good_keypoints_new = cv.goodFeaturesToTrack(self.frame_new_gray, mask=self.target_bounding_box_mask, **FEATURE_PARAMS)
-            target.good_keypoints_new = self.get_feature_keypoints_from_mask(self.frame_new_gray, mask=target.bounding_box_mask, bb=target.bounding_box)
+            target.good_keypoints_new = self.get_feature_keypoints_in_bounding_box(self.frame_new_gray, target.bounding_box)
 
             if target.good_keypoints_new is None or target.good_keypoints_new.shape[0] == 0:
                 target.good_distances = []
@@ -667,11 +838,7 @@ class MultiTracker:
                 # match descriptors 
                 # note, matching only finds best matching/pairing, 
                 # no guarantees of quality of match
-                target.matches = self.descriptor_matcher.compute_matches(target.initial_target_descriptors, 
-                                                                descriptors, 
-                                                                threshold=-1)
-
-                target.distances = np.array([m.distance for m in target.matches]).reshape(-1, 1)  # redundant TODO clean it
+                self.match_initial_target_descriptors(target, kps, descriptors)
 
                 # good distances indicate good matches
                 target.good_distances = target.distances[target.distances < self.DES_MATCH_DISTANCE_THRESH]
@@ -683,8 +850,7 @@ class MultiTracker:
                     (target.template_scores > self.TEMP_MATCH_THRESH).sum()==MAX_NUM_CORNERS):
                 target.occlusion_case_new = NO_OCC
 
-                good_matches = np.array(target.matches).reshape(-1, 1)[target.distances < self.DES_MATCH_DISTANCE_THRESH]
-                target.keypoints_new = np.array([list(target.good_keypoints_new[gm.trainIdx]) for gm in good_matches.flatten()]).reshape(-1,1,2)
+                target.keypoints_new = self.get_good_matched_keypoints(target)
                 target.keypoints_new_good = target.keypoints_new
                 target.centroid_new = self.get_centroid(target.keypoints_new)
                 target.rel_keypoints = target.keypoints_new - target.centroid_new
@@ -716,10 +882,7 @@ class MultiTracker:
 
                 if len(target.good_distances) > 0:
                     # compute good matches
-                    good_matches = np.array(target.matches).reshape(-1, 1)[target.distances < self.DES_MATCH_DISTANCE_THRESH]
-                    
-                    # compute good points, centroid adjustments
-                    target.keypoints_new_good = np.array([list(target.good_keypoints_new[gm.trainIdx]) for gm in good_matches.flatten()]).reshape(-1,1,2)    #NOTE changed queryIdx to trainIdx .. double check later
+                    target.keypoints_new_good = self.get_good_matched_keypoints(target)
                 
                 if (target.template_scores > self.TEMP_MATCH_THRESH).sum() > 0:
                     target.keypoints_new_good = target.template_points[target.template_scores > self.TEMP_MATCH_THRESH].reshape(-1, 1, 2)
@@ -731,9 +894,13 @@ class MultiTracker:
 
 
 
+    def process_measurements(self, target):
+        # convert target.kinematics to inertial frame measurements, queue them in the EKF bank
+        target.update_measurements()
+
     def process_filter(self, target):
-        # filter target.kinematics (filtering in inertial frame)
-        target.update_measurements_and_estimations()
+        # collect filtered target.kinematics (filtering in inertial frame, EKF bank already stepped)
+        target.update_estimations()
         # update centroid estimations back to image frame
         centroids_est = self.manager.get_estimated_centroids(target)
         target.centroid_old_est = np.array([[centroids_est[0], centroids_est[1]]])
@@ -860,7 +1027,7 @@ class MultiTracker:
                 target.track_status = self._FAILURE
 
 
-    def process_image_complete(self, new_frame):
+    def process_image_complete(self, new_frame, new_frame_gray=None):
         """Processes new frame and performs and delegated various tracking based tasks.
             1. Extracts target attributes and stores them
             2. Processes each next frame and tracks target
@@ -869,25 +1036,19 @@ class MultiTracker:
 
         Args:
             new_frame (numpy.ndarray): Next frame to be processed
+            new_frame_gray (numpy.ndarray, optional): Grayscale of next frame, if already computed. Defaults to None.
 
         Returns:
             tuple: Sentinel tuple consisting indicator of process success/failure and kinematics if computed successfully.
         """
         # save new frame, compute grayscale
         self.frame_new_color = new_frame
-        self.frame_new_gray = convert_to_grayscale(self.frame_new_color)
+        self.frame_new_gray = convert_to_grayscale(self.frame_new_color) if new_frame_gray is None else new_frame_gray
 
         # cv.imshow('nxt_frame', self.frame_new_gray); cv.waitKey(1)
         if self.is_first_time():
-            thread_list = []
-            for target in self.targets:
-                t = worker(target=self.process_init, args=(target,), daemon=True)
-                t.start()
-                thread_list.append(t)
-            for thread in thread_list: thread.join()
+            self.run_stage('init', self.process_init)
 
-            
-            
             # posterity - save frames
             self.frame_old_gray = self.frame_new_gray
             self.frame_old_color = self.frame_new_color
@@ -896,22 +1057,21 @@ class MultiTracker:
 
         # cv.imshow('cur_frame', self.frame_old_gray); cv.waitKey(1)
         self._can_begin_control_flag = True
-        thread_list = []
-        for target in self.targets:
-            t = worker(target=self.process_kinematics, args=(target,), daemon=True)
-            t.start()
-            thread_list.append(t)
-        for thread in thread_list: thread.join()
 
+        # predict target motion, then compute flow for all targets at once, kinematics stage picks it up
+        t_start = time.perf_counter()
+        self.predict_target_motion()
+        self.compute_flow_all_targets()
+        self.record_stage_time('flow', time.perf_counter() - t_start)
 
-        # use filter 
-        thread_list = []
-        for target in self.targets:
-            t = worker(target=self.process_filter, args=(target,), daemon=True)
-            t.start()
-            thread_list.append(t)
-        for thread in thread_list: thread.join()
-            
+        self.run_stage('kinematics', self.process_kinematics)
+
+        # use filter, all targets are predicted and corrected in one batched EKF bank step
+        self.run_stage('measurements', self.process_measurements)
+        t_start = time.perf_counter()
+        self.target_ekf_bank.step()
+        self.record_stage_time('ekf_bank', time.perf_counter() - t_start)
+        self.run_stage('filter', self.process_filter)
 
 
         # display information 
@@ -922,22 +1082,83 @@ class MultiTracker:
         self.frame_old_color = self.frame_new_color
 
         # handle posterity - target attributes
-        thread_list = []
+        self.run_stage('posterity', self.process_posterity)
+
+    def process_prediction(self):
+        """Advances target estimations one step without a frame (multi-rate stepping, tracker skips this step).
+        All target EKFs are predicted in one batched EKF bank pass, estimations are collected as usual.
+        """
+        if not self.can_begin_control():
+            return
+
+        t_start = time.perf_counter()
+        self.target_ekf_bank.predict()
+        self.record_stage_time('ekf_predict', time.perf_counter() - t_start)
+        self.run_stage('filter', self.process_filter)
+
+    def predict_target_motion(self):
+        """Predicts image motion of all targets since old frame in one batched EKF bank pass.
+        Image motion is target motion relative to the drone (camera moves with it), converted to pixels.
+        Results are saved in target.predicted_displacement and target.predicted_std, they seed flow and
+        center and size search windows. Targets whose EKF is not initialized yet get None.
+        """
         for target in self.targets:
-            t = worker(target=self.process_posterity, args=(target,), daemon=True)
-            t.start()
-            thread_list.append(t)
-        for thread in thread_list: thread.join()
-            
+            target.predicted_displacement = None
+            target.predicted_std = None
+        if not USE_PREDICTED_SEARCH:
+            return
+
+        dt = self.manager.get_tracker_dt()
+        displacements, stds = self.target_ekf_bank.predict_motion(dt)
+
+        # inertial frame (m) to image frame (px), image y axis points down
+        pxm_fac = self.manager.simulator.pxm_fac
+        displacements = (displacements - np.array(tuple(self.manager.get_true_drone_velocity())) * dt) * (1, -1) / pxm_fac
+        stds = stds / pxm_fac
+
+        for target in self.targets:
+            if self.target_ekf_bank.initialized[target.EKF.index]:
+                target.predicted_displacement = displacements[target.EKF.index].astype(np.float32)
+                target.predicted_std = stds[target.EKF.index]
+
+    def compute_flow_all_targets(self):
+        """Computes flow for keypoints of all targets that need it (no or partial occlusion in old frame) 
+        with a single batched LK call, so image pyramids are built once per frame instead of once per target.
+        Search of each target's keypoints starts at their predicted new positions, when motion is predicted.
+        Results are saved in target.flow_output and consumed by compute_flow.
+        """
+        flow_targets = [target for target in self.targets if target.occlusion_case_old in (NO_OCC, PARTIAL_OCC)]
+        if not flow_targets:
+            return
+
+        # same keypoints compute_flow would use, good ones for from_partial_occ case
+        pts_list = [(target.keypoints_old_good if target.occlusion_case_old == PARTIAL_OCC 
+                     else target.keypoints_old).astype('float32') 
+                    for target in flow_targets]
+
+        init_pts_list = [None if target.predicted_displacement is None else pts + target.predicted_displacement
+                         for target, pts in zip(flow_targets, pts_list)]
+
+        flow_outputs = compute_optical_flow_LK_batch(self.frame_old_gray,
+                                                     self.frame_new_gray,
+                                                     pts_list,
+                                                     LK_PARAMS,
+                                                     init_pts_list)
+
+        for target, flow_output in zip(flow_targets, flow_outputs):
+            target.flow_output = flow_output
 
-        
     def compute_flow(self, target, use_good=False):
         # it's main purpose is to compute new points
         # looks at 2 frames, uses flow, tells where old points went
         # make clever use of this function, we want to use good 
         # for from_partial_occ case
 
-        if use_good:
+        if target.flow_output is not None:
+            # already computed in batch
+            flow_output = target.flow_output
+            target.flow_output = None
+        elif use_good:
             flow_output = compute_optical_flow_LK(self.frame_old_gray,
                                                 self.frame_new_gray,
                                                 target.keypoints_old_good.astype('float32'), # good from previous frame
@@ -986,8 +1207,8 @@ class MultiTracker:
         # - centroids are computed using get_centroid, therefore, centroid shape (1,2)
         # - centroids represent the target location in old and new frames
 
-        # get delta t
-        dt = self.manager.get_sim_dt()
+        # get delta t between the two frames (spans several steps when tracker skips steps)
+        dt = self.manager.get_tracker_dt()
 
         # form pygame.Vector2 objects representing measured car_position and car_velocity 
         # in corner image coord frame in spatial units of *pixels* 
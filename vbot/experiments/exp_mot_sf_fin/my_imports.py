@@ -52,14 +52,22 @@ from utils.img_utils import scale_image as cv_scale_img
 from algorithms.optical_flow \
                 import (compute_optical_flow_farneback,     #pylint: disable=unused-import
                         compute_optical_flow_HS,
-                        compute_optical_flow_LK)
+                        compute_optical_flow_LK,
+                        compute_optical_flow_LK_batch)
 
 from algorithms.feature_detection \
-                import (Sift,)
+                import (Sift,
+                        Orb,
+                        FastBrief)
 
 from algorithms.feature_match \
-                import (BruteL2,)
+                import (BruteL2,
+                        BruteL2Index,
+                        BruteHamming,
+                        BruteHammingIndex,
+                        FlannIndex)
 
 from algorithms.template_match \
                 import (CorrelationCoeffNormed,
-                        TemplateMatcher)
\ No newline at end of file
+                        TemplateMatcher,
+                        MultiTemplateMatcher)
\ No newline at end of file
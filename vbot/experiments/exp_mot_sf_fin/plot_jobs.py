@@ -0,0 +1,383 @@
+import os
+import time
+import shutil
+import hashlib
+import warnings
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+
+import numpy as np
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+
+from . import settings, plotter
+from .plotter import *
+
+
+# one figure of the post-run plot suite
+#   name    - figure name used in reports
+#   render  - picklable callable render(save_path, data), data maps column names to arrays
+#   columns - plot data columns the figure depends on
+#   files   - file names the figure is saved into (empty if figure is only shown)
+PlotJob = namedtuple('PlotJob', ['name', 'render', 'columns', 'files'])
+
+
+def render_plotter(plotter_class, save_path, data):
+    plotter_class.from_data(save_path, data).plot()
+
+
+def _angle_diff(ang_1, ang_2):
+    """Returns ang_1 - ang_2 wrapped into [-180, 180] (degrees)"""
+    diff = np.radians(ang_1 - ang_2)
+    return np.degrees(np.arctan2(np.sin(diff), np.cos(diff)))
+
+
+def _decorate(fig, ax, title, equal_axis=False):
+    ax.grid(True, which='minor', alpha=0.1)
+    ax.grid(True, which='major', alpha=0.3)
+    if equal_axis:
+        ax.axis('equal')
+    fig.suptitle(title)
+
+
+def plot_cdot(save_path, data):
+    fig, ax = plt.subplots()
+    ax.plot(data['TIME'], data['C_DOT'])
+    _decorate(fig, ax, r'$\dot{C}$')
+    fig.savefig(f'{save_path}/8_cdot.pdf')
+
+
+def plot_scz_ind(save_path, data):
+    fig, ax = plt.subplots()
+    ax.plot(data['TIME'], data['SCZ_IND'])
+    _decorate(fig, ax, f'SCZ - 012')
+    fig.savefig(f'{save_path}/9_scz_ind.pdf')
+
+
+def plot_zs(save_path, data):
+    fig, ax = plt.subplots()
+    ax.plot(data['Z_W'], data['S'])
+    _decorate(fig, ax, f'z vs S', equal_axis=True)
+    fig.savefig(f'{save_path}/10_zs.pdf')
+
+
+def plot_zc(save_path, data):
+    fig, ax = plt.subplots()
+    ax.plot(data['Z_W'], data['C'])
+    _decorate(fig, ax, f'z vs C', equal_axis=True)
+    fig.savefig(f'{save_path}/11_zc.pdf')
+
+
+def plot_dist_sc(save_path, data):
+    dist_SC = S_DES - data['S'] - np.minimum(0, data['C_DES'] - data['C'])
+    fig, ax = plt.subplots()
+    ax.plot(data['TIME'], dist_SC)
+    _decorate(fig, ax, f'dist_SC_err')
+
+
+def plot_prod_sc(save_path, data):
+    prod_SC = (S_DES - data['S']) * np.minimum(0, data['C_DES'] - data['C'])
+    fig, ax = plt.subplots()
+    ax.plot(data['TIME'], prod_SC)
+    _decorate(fig, ax, f'prod_SC_err')
+
+
+def plot_denom(save_path, data):
+    fig, ax = plt.subplots()
+    ax.plot(data['TIME'], data['A_LAT_LONG_DENOM'], alpha=0.7, lw=3)
+    _decorate(fig, ax, f'A_LAT_LONG_DENOM')
+    fig.savefig(f'{save_path}/12_denom.pdf')
+
+
+def plot_cs(save_path, data):
+    fig, ax = plt.subplots()
+    ax.plot(data['C'], data['S'])
+    _decorate(fig, ax, f'C vs S', equal_axis=True)
+    fig.savefig(f'{save_path}/13_cs.pdf')
+
+
+def plot_denom_10(save_path, data):
+    DN = np.where(np.abs(data['A_LAT_LONG_DENOM']) >= 1000, 0, 1)
+    fig, ax = plt.subplots()
+    ax.plot(data['TIME'], DN, alpha=0.7, lw=3)
+    _decorate(fig, ax, f'A_LAT_LONG_DENOM < 10')
+    fig.savefig(f'{save_path}/14_denom_10.pdf')
+
+
+def plot_t1_t2_pos_meas(save_path, data):
+    fig, ax = plt.subplots()
+    ax.plot(data['TIME'], data['T_1_X_MEAS'] - data['T_2_X_MEAS'], alpha=0.7, lw=3)
+    ax.plot(data['TIME'], data['T_1_Y_MEAS'] - data['T_2_Y_MEAS'], alpha=0.7, lw=3)
+    _decorate(fig, ax, f'T1 - T2 xy pos')
+    fig.savefig(f'{save_path}/15_t1_pos_meas.pdf')
+
+
+def plot_fp_1(save_path, data):
+    fig, ax = plt.subplots()
+    ax.plot(data['TIME'], data['FP_1_Y'], alpha=0.7, lw=3)
+    ax.plot(data['TIME'], data['FP_2_Y'], alpha=0.7, lw=3)
+    _decorate(fig, ax, f'FP_1')
+    fig.savefig(f'{save_path}/16_fp_1.pdf')
+
+
+def plot_fp_mid(save_path, data):
+    MID_Y = (data['FP_1_Y'] + data['FP_2_Y']) / 2
+    fig, ax = plt.subplots()
+    ax.plot(data['TIME'], MID_Y, alpha=0.7, lw=3)
+    _decorate(fig, ax, f'FP_MID')
+    fig.savefig(f'{save_path}/17_fp_mid.pdf')
+
+
+def plot_alpha_theta(save_path, data):
+    DIFF_ = _angle_diff(data['DRONE_ALPHA'], data['FP_1_THETA'])
+    fig, ax = plt.subplots()
+    ax.plot(data['TIME'], data['DRONE_ALPHA'], alpha=0.7, lw=2, label=r'$\alpha$')
+    ax.plot(data['TIME'], data['FP_1_THETA'], alpha=0.7, lw=2, label=r'$\theta_1$')
+    ax.plot(data['TIME'], DIFF_, alpha=0.7, lw=3, label=r'$\alpha - \theta_1$', ls='--')
+    ax.plot(data['TIME'], np.abs(DIFF_), alpha=0.7, lw=3, label=r'$\vert \alpha - \theta_1 \vert$')
+    ax.plot(data['TIME'], np.cos(np.radians(DIFF_)), alpha=0.7, lw=3, label=r'$cos(\alpha - \theta_1)$')
+    ax.plot(data['TIME'], np.sin(np.radians(DIFF_)), alpha=0.7, lw=3, label=r'$sin(\alpha - \theta_1)$')
+    ax.legend()
+    _decorate(fig, ax, r'$\alpha - \theta_1$')
+    fig.savefig(f'{save_path}/18_alpha_theta.pdf')
+
+
+def plot_theta_alpha(save_path, data):
+    DIFF_ = _angle_diff(data['FP_1_THETA'], data['DRONE_ALPHA'])
+    fig, ax = plt.subplots()
+    ax.plot(data['TIME'], data['DRONE_ALPHA'], alpha=0.7, lw=2, label=r'$\alpha$')
+    ax.plot(data['TIME'], data['FP_1_THETA'], alpha=0.7, lw=2, label=r'$\theta_1$')
+    ax.plot(data['TIME'], DIFF_, alpha=0.7, lw=3, label=r'$\theta_1 - \alpha$', ls='--')
+    ax.plot(data['TIME'], np.abs(DIFF_), alpha=0.7, lw=3, label=r'$\vert \theta_1 - \alpha \vert$')
+    ax.plot(data['TIME'], np.cos(np.radians(DIFF_)), alpha=0.7, lw=3, label=r'$cos(\theta_1 - \alpha)$')
+    ax.plot(data['TIME'], np.sin(np.radians(DIFF_)), alpha=0.7, lw=3, label=r'$sin(\theta_1 - \alpha)$')
+    ax.legend()
+    _decorate(fig, ax, r'$\theta_1 - \alpha$')
+    fig.savefig(f'{save_path}/19_theta_alpha.pdf')
+
+
+def plot_beta_alpha(save_path, data):
+    DIFF_ = _angle_diff(data['FP_1_HEADING'], data['DRONE_ALPHA'])
+    fig, ax = plt.subplots()
+    ax.plot(data['TIME'], data['DRONE_ALPHA'], alpha=0.7, lw=2, label=r'$\alpha$')
+    ax.plot(data['TIME'], data['FP_1_HEADING'], alpha=0.7, lw=2, label=r'$\beta_{fp_1}$')
+    ax.plot(data['TIME'], DIFF_, alpha=0.7, lw=3, label=r'$\beta_{fp_1} - \alpha$')
+    ax.legend()
+    _decorate(fig, ax, r'$\beta_{fp_1} - \alpha$')
+    fig.savefig(f'{save_path}/20_beta_alpha.pdf')
+
+
+def _plotter_job(name, plotter_class, file_name):
+    return PlotJob(name, partial(render_plotter, plotter_class), plotter_class.COLUMNS, (file_name,))
+
+
+# full post-run plot suite, in the order figures are rendered when shown interactively
+PLOT_JOBS = (
+    _plotter_job('los_1', LOS1DataPlotter, '1_los1.pdf'),
+    _plotter_job('los_2', LOS2DataPlotter, '1_los2.pdf'),
+    _plotter_job('accl_comm', AccelerationCommandDataPlotter, '2_accel.pdf'),
+    _plotter_job('ellipse', EllipseDataPlotter, '_2_elllipse.pdf'),
+    _plotter_job('obj_func', ObjectiveFunctionDataPlotter, '3_objfunc.pdf'),
+    _plotter_job('speeds_headings', SpeedsHeadingsDataPlotter, '4_speeds_headings.pdf'),
+    _plotter_job('trajectory_world', TrajectoryWorldDataPlotter, '5_traj_world.pdf'),
+    _plotter_job('trajectory_camera', TrajectoryCameraDataPlotter, '6_traj_camera.pdf'),
+    _plotter_job('altitude_control', AltitudeControlDataPlotter, '7_altitude_control.pdf'),
+    _plotter_job('traj_3d', Traj3DDataPlotter, '5_traj_3Dworld.pdf'),
+    PlotJob('cdot', plot_cdot, ('TIME', 'C_DOT'), ('8_cdot.pdf',)),
+    PlotJob('scz_ind', plot_scz_ind, ('TIME', 'SCZ_IND'), ('9_scz_ind.pdf',)),
+    PlotJob('zs', plot_zs, ('Z_W', 'S'), ('10_zs.pdf',)),
+    PlotJob('zc', plot_zc, ('Z_W', 'C'), ('11_zc.pdf',)),
+    PlotJob('dist_sc', plot_dist_sc, ('TIME', 'S', 'C', 'C_DES'), ()),
+    PlotJob('prod_sc', plot_prod_sc, ('TIME', 'S', 'C', 'C_DES'), ()),
+    PlotJob('denom', plot_denom, ('TIME', 'A_LAT_LONG_DENOM'), ('12_denom.pdf',)),
+    PlotJob('cs', plot_cs, ('C', 'S'), ('13_cs.pdf',)),
+    PlotJob('denom_10', plot_denom_10, ('TIME', 'A_LAT_LONG_DENOM'), ('14_denom_10.pdf',)),
+    PlotJob('t1_t2_pos_meas', plot_t1_t2_pos_meas, ('TIME', 'T_1_X_MEAS', 'T_2_X_MEAS', 'T_1_Y_MEAS', 'T_2_Y_MEAS'), ('15_t1_pos_meas.pdf',)),
+    PlotJob('fp_1', plot_fp_1, ('TIME', 'FP_1_Y', 'FP_2_Y'), ('16_fp_1.pdf',)),
+    PlotJob('fp_mid', plot_fp_mid, ('TIME', 'FP_1_Y', 'FP_2_Y'), ('17_fp_mid.pdf',)),
+    PlotJob('alpha_theta', plot_alpha_theta, ('TIME', 'DRONE_ALPHA', 'FP_1_THETA'), ('18_alpha_theta.pdf',)),
+    PlotJob('theta_alpha', plot_theta_alpha, ('TIME', 'DRONE_ALPHA', 'FP_1_THETA'), ('19_theta_alpha.pdf',)),
+    PlotJob('beta_alpha', plot_beta_alpha, ('TIME', 'DRONE_ALPHA', 'FP_1_HEADING'), ('20_beta_alpha.pdf',)),
+)
+
+
+# plot data and style of a worker process, set once by the pool initializer
+_WORKER_DATA = None
+_WORKER_STYLE = None
+
+
+def _init_worker(data, style):
+    global _WORKER_DATA, _WORKER_STYLE
+    mpl.use('Agg', force=True)
+    warnings.filterwarnings('ignore', message='.*non-interactive.*')     # fig.show() calls in plotters
+    _WORKER_DATA = data
+    _WORKER_STYLE = style
+
+
+def _render(render, save_path, data, style, close_figures):
+    """Renders one figure with rcParams reset to the given style, returns render time in seconds.
+    rcParams are reset so that figures do not depend on which figures were rendered before them.
+    """
+    t_start = time.perf_counter()
+    mpl.rcdefaults()
+    if style is not None:
+        plt.style.use(style)
+    render(save_path, data)
+    if close_figures:
+        plt.close('all')
+    return time.perf_counter() - t_start
+
+
+def _render_in_worker(render, save_path):
+    return _render(render, save_path, _WORKER_DATA, _WORKER_STYLE, close_figures=True)
+
+
+class PlotJobRunner:
+    """Renders the post-run plot suite.
+    With num_workers > 1 figures are rendered in worker processes with the non-interactive Agg backend,
+    otherwise in this process. When figures are to be shown, they are rendered in this process and kept open.
+    With a cache folder, figures whose input columns, settings and plotting code are unchanged since
+    the last render are copied from the cache instead of being rendered again.
+    """
+
+    def __init__(self, save_path, data, show=False, num_workers=1, cache_folder=None, style=None):
+        """
+        Args:
+            save_path (str): Folder where figures are saved
+            data (np.ndarray): Plot data, record array (see telemetry.load_plot_info)
+            show (bool, optional): Keep figures open to be shown, including figures that are not saved. Defaults to False.
+            num_workers (int, optional): Number of worker processes, 1 renders in this process. Defaults to 1.
+            cache_folder (str, optional): Folder keeping last rendered figures, None disables caching. Defaults to None.
+            style (str or list, optional): Matplotlib style applied before each figure. Defaults to None.
+        """
+        self.save_path = save_path
+        self.data = data
+        self.show = show
+        self.num_workers = 1 if show or num_workers is None else max(1, num_workers)
+        self.cache_folder = cache_folder
+        self.style = style
+
+        # (job name, status, render time) in job order
+        self.results = []
+
+        if self.cache_folder is not None:
+            os.makedirs(self.cache_folder, exist_ok=True)
+            self._common_digest = self.get_common_digest()
+
+    def get_common_digest(self):
+        """Hashes everything figures depend on other than their input columns:
+        plotting code, settings values and matplotlib version.
+
+        Returns:
+            bytes: Digest
+        """
+        hasher = hashlib.sha1()
+        for module_file in (__file__, settings.__file__, plotter.__file__):
+            with open(module_file, 'rb') as source:
+                hasher.update(source.read())
+        for name in sorted(vars(settings)):
+            value = getattr(settings, name)
+            if name.isupper() and isinstance(value, (int, float, str, tuple, list)):
+                hasher.update(f'{name}={value!r};'.encode())
+        hasher.update(mpl.__version__.encode())
+        hasher.update(repr(self.style).encode())
+        return hasher.digest()
+
+    def get_job_hash(self, job):
+        """Returns content hash of a figure: its name, files, input columns and common digest.
+
+        Args:
+            job (PlotJob): Figure job
+
+        Returns:
+            str: Hex digest
+        """
+        hasher = hashlib.sha1(self._common_digest)
+        hasher.update(f'{job.name}:{job.files}'.encode())
+        for column in job.columns:
+            hasher.update(column.encode())
+            hasher.update(np.ascontiguousarray(self.data[column]).tobytes())
+        return hasher.hexdigest()
+
+    def _cache_file(self, job_hash, file_name):
+        return os.path.join(self.cache_folder, f'{job_hash}_{file_name}')
+
+    def restore_from_cache(self, job, job_hash):
+        """Copies cached figure files into save path, if all of them are cached.
+
+        Returns:
+            bool: True if figure was restored
+        """
+        cached_files = [self._cache_file(job_hash, file_name) for file_name in job.files]
+        if not cached_files or not all(os.path.isfile(cached) for cached in cached_files):
+            return False
+        for cached, file_name in zip(cached_files, job.files):
+            shutil.copyfile(cached, os.path.join(self.save_path, file_name))
+        return True
+
+    def store_in_cache(self, job, job_hash):
+        """Copies rendered figure files into the cache, replacing older renders of the same files.
+        """
+        for file_name in job.files:
+            for cached in os.listdir(self.cache_folder):
+                # cached files are named '<40 hex digits hash>_<file name>'
+                if cached.endswith(f'_{file_name}') and len(cached) == len(file_name) + 41:
+                    os.remove(os.path.join(self.cache_folder, cached))
+            shutil.copyfile(os.path.join(self.save_path, file_name), self._cache_file(job_hash, file_name))
+
+    def run(self, jobs):
+        """Renders given figure jobs, figures that are up to date in the cache are copied instead.
+
+        Args:
+            jobs (iterable): PlotJob items
+        """
+        self.results = []
+        status = {}
+        pending = []
+        for job in jobs:
+            self.results.append(job.name)
+            if not self.show and not job.files:
+                # figure is only shown, nothing to render
+                status[job.name] = ('skipped', None)
+                continue
+            job_hash = self.get_job_hash(job) if self.cache_folder is not None else None
+            if job_hash is not None and self.restore_from_cache(job, job_hash):
+                status[job.name] = ('cached', None)
+                continue
+            pending.append((job, job_hash))
+
+        if self.num_workers > 1 and pending:
+            # ship only the columns used by pending figures to workers
+            columns = {column for job, _ in pending for column in job.columns}
+            worker_data = {column: np.ascontiguousarray(self.data[column]) for column in columns}
+            with ProcessPoolExecutor(max_workers=min(self.num_workers, len(pending)),
+                                     initializer=_init_worker,
+                                     initargs=(worker_data, self.style)) as pool:
+                futures = {pool.submit(_render_in_worker, job.render, self.save_path): (job, job_hash)
+                           for job, job_hash in pending}
+                for future in as_completed(futures):
+                    job, job_hash = futures[future]
+                    status[job.name] = ('rendered', future.result())
+                    if job_hash is not None:
+                        self.store_in_cache(job, job_hash)
+        else:
+            for job, job_hash in pending:
+                render_time = _render(job.render, self.save_path, self.data, self.style, close_figures=not self.show)
+                status[job.name] = ('rendered', render_time)
+                if job_hash is not None:
+                    self.store_in_cache(job, job_hash)
+
+        self.results = [(name, *status[name]) for name in self.results]
+
+    def get_report(self):
+        """Returns figure rendering report
+
+        Returns:
+            str: Status and render time of each figure
+        """
+        report = [f'Figure rendering [{self.num_workers} process(es)]:']
+        for name, job_status, render_time in self.results:
+            render_time_str = f'{render_time:8.3f} s' if render_time is not None else ''
+            report.append(f'    {name:<20} {job_status:<9}{render_time_str}')
+        return '\n'.join(report)
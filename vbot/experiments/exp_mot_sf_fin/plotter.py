@@ -6,7 +6,45 @@ from matplotlib.lines import Line2D
 
 from .settings import *
 
-class LOS1DataPlotter:
+class DataPlotter:
+    """Base of plot data plotters. Subclasses list their plot data columns in COLUMNS,
+    in constructor argument order (after save_path).
+    """
+    COLUMNS = ()
+
+    @classmethod
+    def from_data(cls, save_path, data):
+        """Creates plotter taking its columns from plot data (record array, see telemetry.load_plot_info)
+        """
+        return cls(save_path, *[data[name] for name in cls.COLUMNS])
+
+
+class LOS1DataPlotter(DataPlotter):
+    # plot data columns, in constructor argument order
+    COLUMNS = ('TIME',
+               'T_1_TRUE_R',
+               'T_1_R_MEAS',
+               'T_1_R_EST',
+               'T_2_TRUE_R',
+               'T_2_R_MEAS',
+               'T_2_R_EST',
+               'T_3_TRUE_R',
+               'T_3_R_MEAS',
+               'T_3_R_EST',
+               'FP_1_R',
+               'FP_2_R',
+               'T_1_TRUE_THETA',
+               'T_1_THETA_MEAS',
+               'T_1_THETA_EST',
+               'T_2_TRUE_THETA',
+               'T_2_THETA_MEAS',
+               'T_2_THETA_EST',
+               'T_3_TRUE_THETA',
+               'T_3_THETA_MEAS',
+               'T_3_THETA_EST',
+               'FP_1_THETA',
+               'FP_2_THETA')
+
     def __init__(self, 
                  save_path, 
                  t, 
@@ -220,7 +258,26 @@ class LOS1DataPlotter:
     
 
     
-class LOS2DataPlotter:
+class LOS2DataPlotter(DataPlotter):
+    # plot data columns, in constructor argument order
+    COLUMNS = ('TIME',
+               'T_1_TRUE_V_R',
+               'T_1_V_R_EST',
+               'T_2_TRUE_V_R',
+               'T_2_V_R_EST',
+               'T_3_TRUE_V_R',
+               'T_3_V_R_EST',
+               'FP_1_V_R',
+               'FP_2_V_R',
+               'T_1_TRUE_V_THETA',
+               'T_1_V_THETA_EST',
+               'T_2_TRUE_V_THETA',
+               'T_2_V_THETA_EST',
+               'T_3_TRUE_V_THETA',
+               'T_3_V_THETA_EST',
+               'FP_1_V_THETA',
+               'FP_2_V_THETA')
+
     def __init__(self, 
                  save_path, 
                  t, 
@@ -436,7 +493,13 @@ class LOS2DataPlotter:
     
 
     
-class AccelerationCommandDataPlotter:
+class AccelerationCommandDataPlotter(DataPlotter):
+    # plot data columns, in constructor argument order
+    COLUMNS = ('TIME',
+               'A_LAT',
+               'A_LNG',
+               'AZ')
+
     def __init__(self, 
                  save_path, 
                  t, 
@@ -545,7 +608,13 @@ class AccelerationCommandDataPlotter:
     
 
     
-class EllipseDataPlotter:
+class EllipseDataPlotter(DataPlotter):
+    # plot data columns, in constructor argument order
+    COLUMNS = ('TIME',
+               'ELLIPSE_MAJOR',
+               'ELLIPSE_MINOR',
+               'ELLIPSE_ROT_ANG')
+
     def __init__(self, 
                  save_path, 
                  t, 
@@ -655,7 +724,12 @@ class EllipseDataPlotter:
 
 
     
-class ObjectiveFunctionDataPlotter:
+class ObjectiveFunctionDataPlotter(DataPlotter):
+    # plot data columns, in constructor argument order
+    COLUMNS = ('TIME',
+               'Y_1',
+               'Y_2')
+
     def __init__(self, 
                  save_path, 
                  t, 
@@ -754,7 +828,22 @@ class ObjectiveFunctionDataPlotter:
         
 
 
-class SpeedsHeadingsDataPlotter:
+class SpeedsHeadingsDataPlotter(DataPlotter):
+    # plot data columns, in constructor argument order
+    COLUMNS = ('TIME',
+               'T_1_SPEED_EST',
+               'T_2_SPEED_EST',
+               'T_3_SPEED_EST',
+               'FP_1_SPEED',
+               'FP_2_SPEED',
+               'DRONE_SPEED',
+               'T_1_BETA_EST',
+               'T_2_BETA_EST',
+               'T_3_BETA_EST',
+               'FP_1_HEADING',
+               'FP_2_HEADING',
+               'DRONE_ALPHA')
+
     def __init__(self, 
                  save_path, 
                  t, 
@@ -915,7 +1004,22 @@ class SpeedsHeadingsDataPlotter:
         [tl.set_color('black') for tl in self.axs[1].get_yticklabels()]
         
 
-class TrajectoryWorldDataPlotter:
+class TrajectoryWorldDataPlotter(DataPlotter):
+    # plot data columns, in constructor argument order
+    COLUMNS = ('TIME',
+               'T_1_X_EST',
+               'T_1_Y_EST',
+               'T_2_X_EST',
+               'T_2_Y_EST',
+               'T_3_X_EST',
+               'T_3_Y_EST',
+               'FP_1_X',
+               'FP_1_Y',
+               'FP_2_X',
+               'FP_2_Y',
+               'DRONE_POS_X_W',
+               'DRONE_POS_Y_W')
+
     def __init__(self, 
                  save_path, 
                  t, 
@@ -1039,7 +1143,22 @@ class TrajectoryWorldDataPlotter:
         
         
 
-class TrajectoryCameraDataPlotter:
+class TrajectoryCameraDataPlotter(DataPlotter):
+    # plot data columns, in constructor argument order
+    COLUMNS = ('TIME',
+               'T_1_X_EST',
+               'T_1_Y_EST',
+               'T_2_X_EST',
+               'T_2_Y_EST',
+               'T_3_X_EST',
+               'T_3_Y_EST',
+               'FP_1_X',
+               'FP_1_Y',
+               'FP_2_X',
+               'FP_2_Y',
+               'DRONE_POS_X_W',
+               'DRONE_POS_Y_W')
+
     def __init__(self, 
                  save_path, 
                  t, 
@@ -1178,7 +1297,14 @@ class TrajectoryCameraDataPlotter:
         
         
 
-class AltitudeControlDataPlotter:
+class AltitudeControlDataPlotter(DataPlotter):
+    # plot data columns, in constructor argument order
+    COLUMNS = ('TIME',
+               'S',
+               'C',
+               'Z_W',
+               'C_DES')
+
     def __init__(self, 
                  save_path, 
                  t, 
@@ -1332,7 +1458,23 @@ class AltitudeControlDataPlotter:
 
 
     
-class Traj3DDataPlotter:
+class Traj3DDataPlotter(DataPlotter):
+    # plot data columns, in constructor argument order
+    COLUMNS = ('TIME',
+               'T_1_X_EST',
+               'T_1_Y_EST',
+               'T_2_X_EST',
+               'T_2_Y_EST',
+               'T_3_X_EST',
+               'T_3_Y_EST',
+               'FP_1_X',
+               'FP_1_Y',
+               'FP_2_X',
+               'FP_2_Y',
+               'DRONE_POS_X_W',
+               'DRONE_POS_Y_W',
+               'Z_W')
+
     def __init__(self, 
                 save_path, 
                 t, 
@@ -0,0 +1,200 @@
+import json
+import time
+
+import numpy as np
+
+
+class _Span:
+    """Context manager timing one span, records it into the profiler on exit"""
+    __slots__ = ('profiler', 'name', 't_start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.t_start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.record(self.name, self.t_start, time.perf_counter())
+        return False
+
+
+class _NoSpan:
+    """Does nothing, returned by a disabled profiler"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+class FrameProfiler:
+    """Low overhead per stage profiler for the experiment loop.
+    Spans (stage name, frame number, start, duration) are timed with the monotonic perf_counter and kept
+    in a preallocated ring buffer, so memory stays bounded and only the last capacity spans are kept.
+    Spans may nest (for example tracker stages inside the tracker span).
+    When disabled, span() returns a shared no-op context manager and record() returns right away.
+    """
+
+    FRAME = 'frame'
+
+    def __init__(self, enabled=False, capacity=65536):
+        """
+        Args:
+            enabled (bool, optional): Record spans. Defaults to False.
+            capacity (int, optional): Number of spans kept in the ring buffer. Defaults to 65536.
+        """
+        self.enabled = enabled
+        self.capacity = capacity
+
+        self.stage_ids = {}         # stage name -> id
+        self.stage_names = []       # id -> stage name
+
+        self._stage = np.zeros(capacity, dtype=np.int32)
+        self._frame = np.zeros(capacity, dtype=np.int64)
+        self._start = np.zeros(capacity, dtype=np.float64)
+        self._duration = np.zeros(capacity, dtype=np.float64)
+        self._num_recorded = 0      # total spans recorded, ring index is _num_recorded % capacity
+
+        self.frame_num = 0
+        self._frame_start = None
+        self._t_origin = time.perf_counter()
+
+    def span(self, name):
+        """Returns context manager timing a span of given stage name
+
+        Args:
+            name (str): Stage name
+
+        Returns:
+            context manager: Span, no-op when profiler is disabled
+        """
+        if not self.enabled:
+            return _NO_SPAN
+        return _Span(self, name)
+
+    def record(self, name, t_start, t_end):
+        """Records a span measured elsewhere (perf_counter seconds)
+
+        Args:
+            name (str): Stage name
+            t_start (float): Span start
+            t_end (float): Span end
+        """
+        if not self.enabled:
+            return
+        stage_id = self.stage_ids.get(name)
+        if stage_id is None:
+            stage_id = self.stage_ids[name] = len(self.stage_names)
+            self.stage_names.append(name)
+
+        i = self._num_recorded % self.capacity
+        self._stage[i] = stage_id
+        self._frame[i] = self.frame_num
+        self._start[i] = t_start
+        self._duration[i] = t_end - t_start
+        self._num_recorded += 1
+
+    def begin_frame(self):
+        """Marks the start of a loop iteration"""
+        if self.enabled:
+            self._frame_start = time.perf_counter()
+
+    def end_frame(self):
+        """Marks the end of a loop iteration, records the whole frame as a span"""
+        if not self.enabled or self._frame_start is None:
+            return
+        self.record(self.FRAME, self._frame_start, time.perf_counter())
+        self._frame_start = None
+        self.frame_num += 1
+
+    def get_spans(self):
+        """Returns spans held in the ring buffer, oldest first
+
+        Returns:
+            tuple(np.ndarray, np.ndarray, np.ndarray, np.ndarray): stage ids, frame numbers, starts, durations (s)
+        """
+        num_spans = min(self._num_recorded, self.capacity)
+        order = np.arange(self._num_recorded - num_spans, self._num_recorded) % self.capacity
+        return self._stage[order], self._frame[order], self._start[order], self._duration[order]
+
+    def get_frame_times(self):
+        """Returns per frame time of every stage, summed over spans of the stage within the frame.
+        Only frames fully held in the ring buffer are included.
+
+        Returns:
+            tuple(np.ndarray, np.ndarray): frame numbers (F,), stage times (F, num_stages) in seconds
+        """
+        stages, frames, _, durations = self.get_spans()
+        if len(frames) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros((0, len(self.stage_names)))
+
+        # spans of the oldest frame may have been overwritten
+        complete = frames > frames[0] if self._num_recorded > self.capacity else np.ones(len(frames), dtype=bool)
+        stages, frames, durations = stages[complete], frames[complete], durations[complete]
+
+        frame_nums, frame_index = np.unique(frames, return_inverse=True)
+        frame_times = np.zeros((len(frame_nums), len(self.stage_names)))
+        np.add.at(frame_times, (frame_index, stages), durations)
+        return frame_nums, frame_times
+
+    def get_report(self, percentiles=(50, 90, 99)):
+        """Returns frame time breakdown, percentiles of per frame stage time over frames the stage ran in
+
+        Args:
+            percentiles (tuple, optional): Percentiles to report. Defaults to (50, 90, 99).
+
+        Returns:
+            str: Report with frames, mean, percentiles, max (milliseconds) and share of frame time per stage
+        """
+        frame_nums, frame_times = self.get_frame_times()
+        if len(frame_nums) == 0:
+            return 'Frame profile: no frames recorded'
+
+        frame_id = self.stage_ids.get(self.FRAME)
+        total_frame_time = frame_times[:, frame_id].sum() if frame_id is not None else frame_times.sum()
+
+        header = ' '.join(f'{f"p{p}":>9}' for p in percentiles)
+        lines = [f'Frame profile [{len(frame_nums)} frames, ring {min(self._num_recorded, self.capacity)}/{self.capacity} spans]:',
+                 f'    {"stage":<24} {"frames":>7} {"mean":>9} {header} {"max":>9} {"share":>7}  (ms)']
+        # frame first, then stages in order of first appearance
+        stage_ids = [frame_id] if frame_id is not None else []
+        stage_ids += [i for i in range(len(self.stage_names)) if i != frame_id]
+        for stage_id in stage_ids:
+            times = frame_times[:, stage_id]
+            times = 1000 * times[times > 0]
+            if len(times) == 0:
+                continue
+            values = ' '.join(f'{value:9.3f}' for value in np.percentile(times, percentiles))
+            share = 100 * times.sum() / (1000 * total_frame_time) if total_frame_time > 0 else 0.0
+            lines.append(f'    {self.stage_names[stage_id]:<24} {len(times):>7} {times.mean():9.3f} {values} ' +
+                         f'{times.max():9.3f} {share:6.1f}%')
+        return '\n'.join(lines)
+
+    def export_chrome_trace(self, path):
+        """Writes spans held in the ring buffer as Chrome trace JSON (chrome://tracing, Perfetto).
+        Each span is a complete event ('X') with microsecond timestamps relative to profiler creation.
+
+        Args:
+            path (str): JSON file path
+        """
+        stages, frames, starts, durations = self.get_spans()
+        events = [{'name': self.stage_names[stage_id],
+                   'cat': 'frame' if self.stage_names[stage_id] == self.FRAME else 'stage',
+                   'ph': 'X',
+                   'ts': round((start - self._t_origin) * 1e6, 3),
+                   'dur': round(duration * 1e6, 3),
+                   'pid': 0,
+                   'tid': 0,
+                   'args': {'frame': int(frame)}}
+                  for stage_id, frame, start, duration in zip(stages.tolist(), frames.tolist(),
+                                                               starts.tolist(), durations.tolist())]
+        with open(path, 'w') as trace_file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, trace_file)
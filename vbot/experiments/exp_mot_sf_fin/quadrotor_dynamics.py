@@ -0,0 +1,275 @@
+from math import cos, sin, tan
+
+import numpy as np
+
+from .settings import DRONE_DYNAMICS_USE_NUMBA
+
+# numba is optional, kernels below run as plain python (scalar math, no array allocations) without it
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def jit_kernel(func):
+    """Compiles given function with numba (nopython mode) if numba is available and enabled in settings.
+
+    Args:
+        func (callable): Function using only scalar math and tuples
+
+    Returns:
+        callable: Compiled function, or func itself
+    """
+    if njit is None or not DRONE_DYNAMICS_USE_NUMBA:
+        return func
+    return njit(cache=True)(func)
+
+
+def is_jit_enabled():
+    """Indicates if quadrotor kernels are compiled with numba
+
+    Returns:
+        bool: Kernels compiled or not
+    """
+    return njit is not None and bool(DRONE_DYNAMICS_USE_NUMBA)
+
+
+@jit_kernel
+def quadrotor_state_dot(u, v, w, phi, theta, psi, p, q, r, F, tau_phi, tau_theta, tau_psi, g, m, Ixx, Iyy, Izz):
+    """Given the state (position does not affect dynamics) and actuation wrench, computes state_dot.
+    Same dynamics as DroneCamera.eval_state_dot, written out in scalar form.
+
+    Returns:
+        tuple: 12 components of quadrotor state dynamics (pN, pE, pH, u, v, w, φ, θ, ψ, p, q, r rates)
+    """
+    c_phi = cos(phi)
+    s_phi = sin(phi)
+    c_theta = cos(theta)
+    s_theta = sin(theta)
+    t_theta = tan(theta)
+    c_psi = cos(psi)
+    s_psi = sin(psi)
+
+    # pN_dot, pE_dot, pH_dot (body frame A to local NED N)
+    pN_dot = c_theta*c_psi*u + (s_phi*s_theta*c_psi - c_phi*s_psi)*v + (c_phi*s_theta*c_psi + s_phi*s_psi)*w
+    pE_dot = c_theta*s_psi*u + (s_phi*s_theta*s_psi + c_phi*c_psi)*v + (c_phi*s_theta*s_psi - s_phi*c_psi)*w
+    pH_dot = -s_theta*u + s_phi*c_theta*v + c_phi*c_theta*w
+
+    # u_dot, v_dot, w_dot
+    u_dot = (r*v - q*w) - g*s_theta
+    v_dot = (p*w - r*u) + g*c_theta*s_phi
+    w_dot = (q*u - p*v) + g*c_theta*c_phi - F/m
+
+    # phi_dot, theta_dot, psi_dot
+    phi_dot = p + s_phi*t_theta*q + c_phi*t_theta*r
+    theta_dot = c_phi*q - s_phi*r
+    psi_dot = s_phi/(c_theta + 1e-16)*q + c_phi/(c_theta + 1e-16)*r
+
+    # p_dot, q_dot, r_dot (coriolis + τ/I)
+    p_dot = ((Iyy - Izz)/Ixx)*q*r + (1/Ixx)*tau_phi
+    q_dot = ((Izz - Ixx)/Iyy)*p*r + (1/Iyy)*tau_theta
+    r_dot = ((Ixx - Iyy)/Izz)*p*q + (1/Izz)*tau_psi
+
+    return (pN_dot, pE_dot, pH_dot, u_dot, v_dot, w_dot, phi_dot, theta_dot, psi_dot, p_dot, q_dot, r_dot)
+
+
+@jit_kernel
+def integrate_quadrotor_rk4(state, F, tau_phi, tau_theta, tau_psi, g, m, Ixx, Iyy, Izz, dt, num_steps):
+    """Integrates quadrotor dynamics with constant wrench using num_steps Runge-Kutta (RK4) steps of size dt.
+    State is carried in scalars, no intermediate arrays are allocated.
+
+    Args:
+        state (tuple): pN, pE, pH, u, v, w, φ, θ, ψ, p, q, r
+        F (float): Thrust force along k_A in body frame A
+        tau_phi (float): Rolling torque
+        tau_theta (float): Pitching torque
+        tau_psi (float): Yawing torque
+        g (float): Acceleration due to gravity
+        m (float): Mass
+        Ixx (float): Moment of inertia about i_A
+        Iyy (float): Moment of inertia about j_A
+        Izz (float): Moment of inertia about k_A
+        dt (float): Step size (s)
+        num_steps (int): Number of steps
+
+    Returns:
+        tuple: pN, pE, pH, u, v, w, φ, θ, ψ, p, q, r after num_steps steps
+    """
+    pN, pE, pH, u, v, w, phi, theta, psi, p, q, r = state
+    h2 = dt / 2
+    h6 = dt / 6
+
+    for _ in range(num_steps):
+        k1 = quadrotor_state_dot(u, v, w, phi, theta, psi, p, q, r,
+                                 F, tau_phi, tau_theta, tau_psi, g, m, Ixx, Iyy, Izz)
+        k2 = quadrotor_state_dot(u + h2*k1[3], v + h2*k1[4], w + h2*k1[5],
+                                 phi + h2*k1[6], theta + h2*k1[7], psi + h2*k1[8],
+                                 p + h2*k1[9], q + h2*k1[10], r + h2*k1[11],
+                                 F, tau_phi, tau_theta, tau_psi, g, m, Ixx, Iyy, Izz)
+        k3 = quadrotor_state_dot(u + h2*k2[3], v + h2*k2[4], w + h2*k2[5],
+                                 phi + h2*k2[6], theta + h2*k2[7], psi + h2*k2[8],
+                                 p + h2*k2[9], q + h2*k2[10], r + h2*k2[11],
+                                 F, tau_phi, tau_theta, tau_psi, g, m, Ixx, Iyy, Izz)
+        k4 = quadrotor_state_dot(u + dt*k3[3], v + dt*k3[4], w + dt*k3[5],
+                                 phi + dt*k3[6], theta + dt*k3[7], psi + dt*k3[8],
+                                 p + dt*k3[9], q + dt*k3[10], r + dt*k3[11],
+                                 F, tau_phi, tau_theta, tau_psi, g, m, Ixx, Iyy, Izz)
+
+        pN += (k1[0] + 2*k2[0] + 2*k3[0] + k4[0]) * h6
+        pE += (k1[1] + 2*k2[1] + 2*k3[1] + k4[1]) * h6
+        pH += (k1[2] + 2*k2[2] + 2*k3[2] + k4[2]) * h6
+        u += (k1[3] + 2*k2[3] + 2*k3[3] + k4[3]) * h6
+        v += (k1[4] + 2*k2[4] + 2*k3[4] + k4[4]) * h6
+        w += (k1[5] + 2*k2[5] + 2*k3[5] + k4[5]) * h6
+        phi += (k1[6] + 2*k2[6] + 2*k3[6] + k4[6]) * h6
+        theta += (k1[7] + 2*k2[7] + 2*k3[7] + k4[7]) * h6
+        psi += (k1[8] + 2*k2[8] + 2*k3[8] + k4[8]) * h6
+        p += (k1[9] + 2*k2[9] + 2*k3[9] + k4[9]) * h6
+        q += (k1[10] + 2*k2[10] + 2*k3[10] + k4[10]) * h6
+        r += (k1[11] + 2*k2[11] + 2*k3[11] + k4[11]) * h6
+
+    return (pN, pE, pH, u, v, w, phi, theta, psi, p, q, r)
+
+
+@jit_kernel
+def body_to_inertial_velocity(u, v, w, phi, theta, psi):
+    """Transforms body frame (A) velocity into inertial (local NED) frame
+
+    Returns:
+        tuple: vx, vy, vz
+    """
+    c_phi = cos(phi)
+    s_phi = sin(phi)
+    c_theta = cos(theta)
+    s_theta = sin(theta)
+    c_psi = cos(psi)
+    s_psi = sin(psi)
+
+    vx = c_theta*c_psi*u + (s_phi*s_theta*c_psi - c_phi*s_psi)*v + (c_phi*s_theta*c_psi + s_phi*s_psi)*w
+    vy = c_theta*s_psi*u + (s_phi*s_theta*s_psi + c_phi*c_psi)*v + (c_phi*s_theta*s_psi - s_phi*c_psi)*w
+    vz = -s_theta*u + s_phi*c_theta*v + c_phi*c_theta*w
+
+    return (vx, vy, vz)
+
+
+def quadrotor_state_dot_batch(states, wrenches, g, m, Ixx, Iyy, Izz, out=None):
+    """Batched quadrotor_state_dot, evaluates dynamics of many independent quadrotors at once.
+
+    Args:
+        states (np.ndarray): (M, 12) states pN, pE, pH, u, v, w, φ, θ, ψ, p, q, r
+        wrenches (np.ndarray): (M, 4) wrenches F, τφ, τθ, τψ
+        g (float): Acceleration due to gravity
+        m (float): Mass
+        Ixx (float): Moment of inertia about i_A
+        Iyy (float): Moment of inertia about j_A
+        Izz (float): Moment of inertia about k_A
+        out (np.ndarray, optional): (M, 12) array to write state dynamics into. Defaults to None.
+
+    Returns:
+        np.ndarray: (M, 12) state dynamics
+    """
+    if out is None:
+        out = np.empty_like(states)
+    u, v, w, phi, theta, psi, p, q, r = states[:, 3:].T
+    F, tau_phi, tau_theta, tau_psi = wrenches.T
+
+    c_phi = np.cos(phi)
+    s_phi = np.sin(phi)
+    c_theta = np.cos(theta)
+    s_theta = np.sin(theta)
+    t_theta = np.tan(theta)
+    c_psi = np.cos(psi)
+    s_psi = np.sin(psi)
+
+    # pN_dot, pE_dot, pH_dot (body frame A to local NED N)
+    out[:, 0] = c_theta*c_psi*u + (s_phi*s_theta*c_psi - c_phi*s_psi)*v + (c_phi*s_theta*c_psi + s_phi*s_psi)*w
+    out[:, 1] = c_theta*s_psi*u + (s_phi*s_theta*s_psi + c_phi*c_psi)*v + (c_phi*s_theta*s_psi - s_phi*c_psi)*w
+    out[:, 2] = -s_theta*u + s_phi*c_theta*v + c_phi*c_theta*w
+
+    # u_dot, v_dot, w_dot
+    out[:, 3] = (r*v - q*w) - g*s_theta
+    out[:, 4] = (p*w - r*u) + g*c_theta*s_phi
+    out[:, 5] = (q*u - p*v) + g*c_theta*c_phi - F/m
+
+    # phi_dot, theta_dot, psi_dot
+    out[:, 6] = p + s_phi*t_theta*q + c_phi*t_theta*r
+    out[:, 7] = c_phi*q - s_phi*r
+    out[:, 8] = s_phi/(c_theta + 1e-16)*q + c_phi/(c_theta + 1e-16)*r
+
+    # p_dot, q_dot, r_dot (coriolis + τ/I)
+    out[:, 9] = ((Iyy - Izz)/Ixx)*q*r + (1/Ixx)*tau_phi
+    out[:, 10] = ((Izz - Ixx)/Iyy)*p*r + (1/Iyy)*tau_theta
+    out[:, 11] = ((Ixx - Iyy)/Izz)*p*q + (1/Izz)*tau_psi
+
+    return out
+
+
+def integrate_quadrotor_rk4_batch(states, wrenches, g, m, Ixx, Iyy, Izz, dt, num_steps):
+    """Batched integrate_quadrotor_rk4, integrates many independent quadrotors in place.
+
+    Args:
+        states (np.ndarray): (M, 12) states, updated in place
+        wrenches (np.ndarray): (M, 4) wrenches F, τφ, τθ, τψ, constant over the steps
+        g (float): Acceleration due to gravity
+        m (float): Mass
+        Ixx (float): Moment of inertia about i_A
+        Iyy (float): Moment of inertia about j_A
+        Izz (float): Moment of inertia about k_A
+        dt (float): Step size (s)
+        num_steps (int): Number of steps
+
+    Returns:
+        np.ndarray: states
+    """
+    k1 = np.empty_like(states)
+    k2 = np.empty_like(states)
+    k3 = np.empty_like(states)
+    k4 = np.empty_like(states)
+    stage = np.empty_like(states)
+
+    for _ in range(num_steps):
+        quadrotor_state_dot_batch(states, wrenches, g, m, Ixx, Iyy, Izz, out=k1)
+        np.multiply(k1, dt/2, out=stage)
+        stage += states
+        quadrotor_state_dot_batch(stage, wrenches, g, m, Ixx, Iyy, Izz, out=k2)
+        np.multiply(k2, dt/2, out=stage)
+        stage += states
+        quadrotor_state_dot_batch(stage, wrenches, g, m, Ixx, Iyy, Izz, out=k3)
+        np.multiply(k3, dt, out=stage)
+        stage += states
+        quadrotor_state_dot_batch(stage, wrenches, g, m, Ixx, Iyy, Izz, out=k4)
+
+        k2 += k3
+        k2 *= 2
+        k2 += k1
+        k2 += k4
+        k2 *= dt/6
+        states += k2
+
+    return states
+
+
+def body_to_inertial_velocity_batch(states):
+    """Batched body_to_inertial_velocity
+
+    Args:
+        states (np.ndarray): (M, 12) states
+
+    Returns:
+        np.ndarray: (M, 3) vx, vy, vz
+    """
+    vel = np.empty((len(states), 3))
+    u, v, w, phi, theta, psi = states[:, 3:9].T
+
+    c_phi = np.cos(phi)
+    s_phi = np.sin(phi)
+    c_theta = np.cos(theta)
+    s_theta = np.sin(theta)
+    c_psi = np.cos(psi)
+    s_psi = np.sin(psi)
+
+    vel[:, 0] = c_theta*c_psi*u + (s_phi*s_theta*c_psi - c_phi*s_psi)*v + (c_phi*s_theta*c_psi + s_phi*s_psi)*w
+    vel[:, 1] = c_theta*s_psi*u + (s_phi*s_theta*s_psi + c_phi*c_psi)*v + (c_phi*s_theta*s_psi - s_phi*c_psi)*w
+    vel[:, 2] = -s_theta*u + s_phi*c_theta*v + c_phi*c_theta*w
+
+    return vel
@@ -18,6 +18,7 @@ SIMULATOR_TEMP_FOLDER = os.path.join(os.path.abspath(TEMP_FOLDER), 'sim_tmp')
 
 # frame settings
 FPS = 30
+CLOCK_SPIN_THRESHOLD = 500     # microseconds, clock sleeps and then busy-waits only for this last bit
 
 # screen settings
 SCREEN_SIZE = WIDTH, HEIGHT = 1000, 800  # 640, 480 # 800, 600
@@ -105,6 +106,8 @@ K_D_PHI = 10
 K_D_THETA = 10
 K_D_PSI = 10
 K_D_Z = 10.0
+DRONE_RK4_INNER_STEPS = 10      # RK4 steps per frame for quadrotor dynamics
+DRONE_DYNAMICS_USE_NUMBA = 1    # compile quadrotor dynamics kernels with numba, if installed
 
 # altitude control 
 X_DES = WIDTH*0.2
@@ -122,14 +125,17 @@ ACC_GRAVITY = 9.81
 TIME_FONT = 'consolas'
 TIME_FONT_SIZE = 16
 TIME_COLOR = LIGHT_GRAY_2   # used for all simulator texts
-DELTA_TIME = 0.01           # used in full blocking mode
+DELTA_TIME = 0.01           # used in full blocking mode, fast-forward steps exactly this much with no pacing
 FINAL_TIME = 390
+RANDOM_SEED = 0             # seeds random, numpy and OpenCV generators at start of run, None leaves them unseeded
+TRACKER_STEP_INTERVAL = 1   # vision tracker runs every k-th step, target EKFs only predict in between
 
 # Bounding box settings
 BB_COLOR = SAFETY_YELLOW_RGB#BLUE     # pygame color
 
 # Ellipse settings
 ELLIPSE_TOLERANCE = 0.01
+ELLIPSE_FAST_ENCLOSURE = 1      # warm-started enclosure with rank-one inverse updates, 0 uses reference iteration
 ELLIPSE_COLOR = (222, 222, 222)#(66, 61, 78)
 ELLIPSE_MEAS_FP_COLOR = (1, 1, 1)#(51, 51, 51)
 ELLIPSE_ESTD_FP_COLOR = (125, 125, 155)#(51, 51, 255)
@@ -158,6 +164,17 @@ SHOW_EXTRA = 0
 DRAW_KEYPOINT_TRACKS = 1
 DRAW_KEYPOINTS_ONLY_WITHOUT_TRACKS = 1
 TRACK_SCALE = 1.5
+TRACKER_WORKER_BACKEND = 'thread'   # 'thread' (persistent thread pool) or 'serial' (run stages in calling thread)
+TRACKER_NUM_WORKERS = 3             # thread pool size, one per target is enough
+TEMPLATE_MATCH_GRAY = 0             # match keypoint patches on grayscale instead of color
+TEMPLATE_MATCH_PYRAMID_LEVELS = 0   # coarse patch search on this pyramid level first, refined at full resolution (0 disables)
+FEATURE_BACKEND = 'sift'            # re-acquisition features, one of FEATURE_BACKENDS (--features overrides)
+FEATURE_BACKENDS = ('sift', 'orb', 'fast_brief')    # sift (L2), orb and fast_brief (binary, Hamming, cheaper but less robust)
+DESCRIPTOR_MATCH_INDEX = 'brute_l2' # sift matching against cached initial descriptors, 'brute_l2' (exact) or 'flann' (kd-tree built once)
+DESCRIPTOR_MATCH_RATIO = 0          # ratio test threshold for descriptor matches, e.g. 0.8 (0 keeps the backend default)
+USE_PREDICTED_SEARCH = 1            # seed LK flow and center/size search windows with target EKF predicted motion
+PREDICTED_SEARCH_SIGMAS = 3         # search windows enclose this many standard deviations of predicted position
+SEARCH_TARGET_HALF_SIZE = CAR_LENGTH / 2    # target extent added to predicted uncertainty in search window half size (m)
 
 # theme
 DARK_ON = 0
@@ -190,6 +207,32 @@ USE_WORLD_FRAME = 0
 
 # simulator settings
 CLEAR_TOP = 0
+ZERO_COPY_CAPTURE = 1     # convert screen pixels straight from surface memory into reused buffers
+
+# screen saving settings (frames are written in background)
+SAVE_VIDEO = 1                  # stream frames into a video file during the run, 0 writes image files instead
+SAVE_VIDEO_NAME = 'sim_track_control.avi'
+SAVE_VIDEO_CODEC = 'DIVX'
+SAVE_IMAGE_FORMAT = 'png'       # 'png' or 'jpg'
+SAVE_PNG_COMPRESSION = 3        # 0-9, lower is faster with bigger files
+SAVE_JPEG_QUALITY = 95          # 0-100
+SAVE_QUEUE_SIZE = 64            # max frames waiting to be written
+SAVE_DROP_POLICY = 'block'      # 'block' (backpressure), 'drop_newest' or 'drop_oldest'
+SAVE_NUM_WORKERS = 2
+
+# telemetry settings (plot data is logged into a binary file, CSV exported after the run)
+TELEMETRY_FILE = 'plot_info.bin'
+TELEMETRY_BLOCK_SIZE = 1024     # rows kept in memory between flushes
+TELEMETRY_WRITE_SKIP = 5        # log every n-th frame, 1 logs every frame
+TELEMETRY_EXPORT_CSV = 1        # export plot_info.csv when the run ends
+
+# profiler settings (per stage frame timing, enabled with --profile)
+PROFILE_RING_SIZE = 65536       # spans kept, older spans are overwritten
+PROFILE_TRACE_FILE = 'trace.json'   # Chrome trace written with --trace when no path is given
+
+# plot settings (post-run figures in batch mode)
+PLOT_NUM_WORKERS = os.cpu_count()   # figure rendering processes, 1 renders in the main process
+PLOT_CACHE_FOLDER = './sim_outputs/plot_cache'     # last render of each figure, reused when inputs are unchanged
 
 # console settings
 CLEAN_CONSOLE = 1
@@ -220,6 +263,7 @@ USE_MA = 0
 # EKF used by controller
 USE_EXTENDED_KALMAN = 1
 USE_NEW_EKF = 1
+SINGER_CACHE_SIZE = 32       # (dt, alpha) -> (A, Q) entries kept, shared by all Singer model filters
 
 # plot settings
 LINE_WIDTH_1 = 1.0
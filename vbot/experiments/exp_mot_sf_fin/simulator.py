@@ -15,13 +15,14 @@ from .bar import Bar
 from .car import Car
 from .drone_camera import DroneCamera
 from .target import Target
+from .frame_writer import AsyncFrameWriter, AsyncVideoWriter
 from .settings import *
 
 
 from .my_imports import (load_image_rect,
                         _prep_temp_folder,
                         vec_str,
-                        images_assemble,)
+                        convert_to_grayscale,)
 
 
 class Simulator:
@@ -52,29 +53,41 @@ class Simulator:
         self.manager = manager
 
         # initialize screen
-        os.environ['SDL_VIDEO_WINDOW_POS'] = "2,30"
+        self.headless = self.manager.headless
+        if self.headless:
+            # no window system needed, use the dummy video driver
+            os.environ['SDL_VIDEODRIVER'] = 'dummy'
+        else:
+            os.environ['SDL_VIDEO_WINDOW_POS'] = "2,30"
         pygame.init()
 
         # set screen size
-        self.SCREEN_SURFACE = pygame.display.set_mode(SCREEN_SIZE, flags=pygame.DOUBLEBUF)
-
-        # set icon
-        sim_icon, _ = load_image_rect(SIMULATOR_ICON_IMG, colorkey=None, alpha=True)
-        sim_icon = pygame.transform.smoothscale(sim_icon, (32, 32))
-        pygame.display.set_icon(sim_icon)
+        if self.headless:
+            # a display mode is still required for image conversions (convert_alpha)
+            # drawing happens on an off-screen surface that is never flipped
+            pygame.display.set_mode((1, 1))
+            self.SCREEN_SURFACE = pygame.Surface(SCREEN_SIZE)
+        else:
+            self.SCREEN_SURFACE = pygame.display.set_mode(SCREEN_SIZE, flags=pygame.DOUBLEBUF)
+
+            # set icon
+            sim_icon, _ = load_image_rect(SIMULATOR_ICON_IMG, colorkey=None, alpha=True)
+            sim_icon = pygame.transform.smoothscale(sim_icon, (32, 32))
+            pygame.display.set_icon(sim_icon)
+
+            # set display caption
+            pygame.display.set_caption(SCREEN_DISPLAY_TITLE)
 
         # set background fill color
         self.SCREEN_SURFACE.fill(SCREEN_BG_COLOR)
 
-        # set display caption
-        pygame.display.set_caption(SCREEN_DISPLAY_TITLE)
-
         # set event restrictions, and no alpha for speed
         pygame.event.set_allowed([GAME_GLOBALS.QUIT, pygame.KEYDOWN])
         self.SCREEN_SURFACE.set_alpha(None)
 
-        # initialize clock
-        self.clock = HighPrecisionClock()
+        # initialize clock (no waiting needed when delta time is fixed)
+        self.clock = HighPrecisionClock(unthrottled=not self.manager.use_real_clock,
+                                        spin_threshold=CLOCK_SPIN_THRESHOLD)
 
         # load image and rect for each car sprite
         self.car_img_rect = load_image_rect(CAR_IMG, colorkey=BLACK, alpha=True, scale=CAR_SCALE)
@@ -84,8 +97,9 @@ class Simulator:
         # load image and rect for each drone sprite
         self.drone_img_rect = load_image_rect(DRONE_IMG, colorkey=BLACK, alpha=True, scale=DRONE_SCALE)
 
-        # set screen saving to False
+        # set screen saving to False, frame writer is created when first frame is saved
         self.save_screen = False
+        self.frame_writer = None
 
         self.pause = False
         self.time_font = pygame.font.SysFont(TIME_FONT, 16, False, False)
@@ -99,6 +113,12 @@ class Simulator:
         self.time = 0.0
         self.dt = 0.0
 
+        # reusable screen capture buffers, two of each since tracker holds on to the previous frame
+        self._capture_bgr = [np.empty((HEIGHT, WIDTH, 3), dtype=np.uint8) for _ in range(2)]
+        self._capture_gray = [np.empty((HEIGHT, WIDTH), dtype=np.uint8) for _ in range(2)]
+        self._capture_index = 0
+        self._capture_codes = self.get_capture_conversion_codes(self.SCREEN_SURFACE) if ZERO_COPY_CAPTURE else None
+
     def start_new(self):
         """Initializes simulation components.
         """
@@ -142,9 +162,10 @@ class Simulator:
         
 
     def show_drawing(self):
-        """Flip the drawing board to show drawings.
+        """Flip the drawing board to show drawings. Nothing to show in headless mode.
         """
-        pygame.display.flip()
+        if not self.headless:
+            pygame.display.flip()
 
     def handle_events(self):
         """Handles captured events.
@@ -204,8 +225,9 @@ class Simulator:
         self.SCREEN_SURFACE.fill(SCREEN_BG_COLOR)
 
         # make and set the window title
-        sim_fps = '' if self.dt == 0 else f'[@{1/self.dt:.2f} fps]'
-        pygame.display.set_caption(f'{SIMULATOR_TITLE} {sim_fps}')
+        if not self.headless:
+            sim_fps = '' if self.dt == 0 else f'[@{1/self.dt:.2f} fps]'
+            pygame.display.set_caption(f'{SIMULATOR_TITLE} {sim_fps}')
 
         # draw only blocks and cars (in that order). Do not draw drone crosshair yet
         self.block_sprites.draw(self.SCREEN_SURFACE)
@@ -258,14 +280,25 @@ class Simulator:
         # make sure the folder is there and empty
         _prep_temp_folder(path)
 
-        frame_num = 0
-        while True:
-            # construct full path string with incremental next image name
-            frame_num += 1
-            image_name = f'frame_{str(frame_num).zfill(5)}.png'
-            file_path = os.path.join(path, image_name)
+        # frames are assembled and written in background,
+        # either streamed into a video file or written as image files
+        if SAVE_VIDEO:
+            self.frame_writer = AsyncVideoWriter(os.path.join(path, SAVE_VIDEO_NAME),
+                                                 fps=FPS,
+                                                 fourcc_codec=SAVE_VIDEO_CODEC,
+                                                 queue_size=SAVE_QUEUE_SIZE,
+                                                 drop_policy=SAVE_DROP_POLICY)
+        else:
+            self.frame_writer = AsyncFrameWriter(path,
+                                                 image_format=SAVE_IMAGE_FORMAT,
+                                                 png_compression=SAVE_PNG_COMPRESSION,
+                                                 jpeg_quality=SAVE_JPEG_QUALITY,
+                                                 queue_size=SAVE_QUEUE_SIZE,
+                                                 drop_policy=SAVE_DROP_POLICY,
+                                                 num_workers=SAVE_NUM_WORKERS)
 
-            # collect screen capture from simulator
+        while True:
+            # collect screen capture from simulator (fresh array in save mode, writer takes ownership)
             img_sim = self.get_screen_capture(save_mode=True)
 
             # collect tracker output image
@@ -273,32 +306,105 @@ class Simulator:
             if img_track is None:
                 img_track = np.ones_like(img_sim, dtype='uint8') * TRACKER_BLANK
 
-            # assemble simulator and tracker images in a grid
-            img = images_assemble([img_sim, img_track], (1, 2))
-            # img = img_sim
-
-            # write image
-            cv.imwrite(file_path, img)
+            # hand over simulator and tracker images, to be assembled in a grid and written
+            self.frame_writer.submit([img_sim, img_track], (1, 2))
             yield
 
-    def get_screen_capture(self, save_mode=False):
+    def close_screen_saver(self):
+        """Waits for pending frames to be written and reports frame writer counts.
+        """
+        if self.frame_writer is not None:
+            self.frame_writer.close()
+            print(self.frame_writer.get_report())
+            self.frame_writer = None
+
+    @staticmethod
+    def get_capture_conversion_codes(surface):
+        """Helper function, finds OpenCV color conversion codes that convert the raw pixels of given surface 
+        to BGR and grayscale images.
+
+        Args:
+            surface (pygame.Surface): Surface to be captured
+
+        Returns:
+            tuple: (to_bgr_code, to_gray_code) or None if pixel format is not supported
+        """
+        if surface.get_bytesize() != 4:
+            return None
+
+        # byte positions of red, green and blue in each pixel
+        r_byte, g_byte, b_byte = [shift // 8 if sys.byteorder == 'little' else 3 - shift // 8 
+                                  for shift in surface.get_shifts()[:3]]
+        if (r_byte, g_byte, b_byte) == (2, 1, 0):
+            return cv.COLOR_BGRA2BGR, cv.COLOR_BGRA2GRAY
+        if (r_byte, g_byte, b_byte) == (0, 1, 2):
+            return cv.COLOR_RGBA2BGR, cv.COLOR_RGBA2GRAY
+        return None
+
+    def capture_surface_pixels(self, with_gray=False, reuse_buffers=True):
+        """Converts screen surface pixels straight from surface memory (no intermediate copies) 
+        into BGR and optionally grayscale images.
+
+        Args:
+            with_gray (bool, optional): Also compute grayscale image. Defaults to False.
+            reuse_buffers (bool, optional): Write into preallocated buffers (alternating between two sets). Defaults to True.
+
+        Returns:
+            tuple: BGR image, grayscale image (None if not requested)
+        """
+        to_bgr_code, to_gray_code = self._capture_codes
+        if reuse_buffers:
+            self._capture_index = 1 - self._capture_index
+            img = self._capture_bgr[self._capture_index]
+            img_gray = self._capture_gray[self._capture_index] if with_gray else None
+        else:
+            img = np.empty((HEIGHT, WIDTH, 3), dtype=np.uint8)
+            img_gray = np.empty((HEIGHT, WIDTH), dtype=np.uint8) if with_gray else None
+
+        # view surface pixels (surface stays locked while the view is alive)
+        pixels_buffer = self.SCREEN_SURFACE.get_buffer()
+        pixels = np.ndarray(shape=(HEIGHT, WIDTH, 4),
+                            dtype=np.uint8,
+                            buffer=pixels_buffer,
+                            strides=(self.SCREEN_SURFACE.get_pitch(), 4, 1))
+        cv.cvtColor(pixels, to_bgr_code, dst=img)
+        if with_gray:
+            cv.cvtColor(pixels, to_gray_code, dst=img_gray)
+        del pixels, pixels_buffer
+
+        return img, img_gray
+
+    def get_screen_capture(self, save_mode=False, with_gray=False):
         """Get screen capture from pygame and convert it to return opencv compatible images.
+        Note: outside save mode, returned images live in reused buffers, valid until the next but one capture.
         Args:
             save_mode (bool): Indicates if it's save_mode. In save mode scaling up/down or snr noise won't be done.
+            with_gray (bool): Additionally return grayscale image.
         Returns:
-            [np.ndarray]: Captured and converted opencv compatible image.
+            [np.ndarray]: Captured and converted opencv compatible image. (image, grayscale image) if with_gray.
         """
-        data = pygame.image.tostring(self.SCREEN_SURFACE, 'RGB')
-        img = np.frombuffer(data, np.uint8).reshape(HEIGHT, WIDTH, 3)
-        img = cv.cvtColor(img, cv.COLOR_RGB2BGR)
+        if self._capture_codes is not None:
+            img, img_gray = self.capture_surface_pixels(with_gray, reuse_buffers=not save_mode)
+        else:
+            data = pygame.image.tostring(self.SCREEN_SURFACE, 'RGB')
+            img = np.frombuffer(data, np.uint8).reshape(HEIGHT, WIDTH, 3)
+            img = cv.cvtColor(img, cv.COLOR_RGB2BGR)
+            img_gray = None
 
         if not save_mode:
             if not OPTION == 0:
                 img = cv_scale_img(img, SCALE_1)
                 img = cv_scale_img(img, SCALE_2)
+                img_gray = None
             if not SNR == 1.0:
                 img = add_salt_pepper(img, SNR)
                 img = cv.GaussianBlur(img, (5, 5), 0)
+                img_gray = None
+
+        if with_gray:
+            if img_gray is None:
+                img_gray = convert_to_grayscale(img)
+            return img, img_gray
 
         return img
 
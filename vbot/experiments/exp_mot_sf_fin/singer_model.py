@@ -0,0 +1,75 @@
+from functools import lru_cache
+from math import e, pow
+
+import numpy as np
+
+from .settings import SINGER_CACHE_SIZE
+
+
+@lru_cache(maxsize=SINGER_CACHE_SIZE)
+def get_singer_matrices(dt, alpha_acc):
+    """Computes transition matrix and (unit intensity) process noise of the Singer maneuvering target model.
+    Results are cached by (dt, alpha_acc) and shared by all filters, so with a fixed step
+    they are computed once per run. Returned arrays are read-only, scale Q into a new array.
+
+    Args:
+        dt (float): Time step (s)
+        alpha_acc (float): Reciprocal of maneuver(acceleration) time constant
+
+    Returns:
+        tuple(np.ndarray, np.ndarray): (A, Q), both of shape (3, 3)
+    """
+    # set variables for better numerical efficiency
+    adt = alpha_acc * dt   # αΔt
+    adt2 = pow(adt, 2)
+    adt3 = pow(adt, 3)
+    a2 = pow(alpha_acc, 2)
+    a3 = pow(alpha_acc, 3)
+    a4 = pow(alpha_acc, 4)
+    eadt = pow(e, (-adt))
+    e2adt = pow(e, (-2*adt))
+
+    # transition matrix
+    A = np.array([[1.0, dt, (eadt + adt -1) / a2],
+                  [0.0, 1.0, (1 - eadt)/(alpha_acc)],
+                  [0.0, 0.0, eadt]])
+
+    q11 = (1 - e2adt + 2*adt + (2/3)*adt3 - 2*adt2 - 4*adt*eadt) / (a4)
+    q12 = (e2adt + 1 - 2*eadt + 2*adt*eadt - 2*adt + adt**2) / (a3)
+    q13 = (1 - e2adt - 2*adt*eadt) / (a2)
+    q22 = (4*eadt - 3 - e2adt + 2*adt) / (a2)
+    q23 = (e2adt + 1 -2*eadt) / (alpha_acc)
+    q33 = (1 - e2adt)
+
+    # process noise
+    Q = np.array([[q11, q12, q13],
+                  [q12, q22, q23],
+                  [q13, q23, q33]])
+
+    # shared between filters, guard against in place modification
+    A.flags.writeable = False
+    Q.flags.writeable = False
+
+    return A, Q
+
+
+def get_singer_cache_info():
+    """Returns statistics of the Singer model matrices cache
+
+    Returns:
+        functools._CacheInfo: Named tuple (hits, misses, maxsize, currsize)
+    """
+    return get_singer_matrices.cache_info()
+
+
+def get_singer_cache_report():
+    """Returns one line report of the Singer model matrices cache
+
+    Returns:
+        str: Report with hits, misses and hit rate
+    """
+    info = get_singer_cache_info()
+    num_lookups = info.hits + info.misses
+    hit_rate = 100 * info.hits / num_lookups if num_lookups else 0.0
+    return (f'Singer model cache: hits={info.hits} misses={info.misses} ' +
+            f'size={info.currsize}/{info.maxsize} hit rate={hit_rate:0.1f}%')
@@ -0,0 +1,314 @@
+"""Parameter sweep over controller gains and final time (--k1/--k2/--kw/--tf), full vision experiments.
+
+Cells come from a grid (all combinations of given values) or random search (uniform samples within
+the range of given values). Each cell runs headless in a fresh worker process of a process pool,
+inside its own output folder (plot_info.bin, plot_info.csv, run.log, result.json), so concurrent
+runs never share files. Cells with a successful result.json are skipped, an interrupted sweep is
+resumed by running the same command again. Objective metrics of all cells are written into
+summary.csv in the sweep folder. Run from vbot/experiments, for example:
+    python -m exp_mot_sf_fin.sweep --k1 0.5 1 2 --k2 0.1 0.2 --tf 30
+    python -m exp_mot_sf_fin.sweep --k1 0.5 2 --k2 0.1 0.4 --random 20 --seed 1
+"""
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import itertools
+import traceback
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout, redirect_stderr
+
+import numpy as np
+
+from .telemetry import load_telemetry
+from .settings import K_1, K_2, K_W, FINAL_TIME, S_DES, TELEMETRY_FILE
+
+
+SWEEP_PARAMS = ('k1', 'k2', 'kw', 'tf')
+SWEEP_DEFAULTS = {'k1': K_1, 'k2': K_2, 'kw': K_W, 'tf': FINAL_TIME}
+RESULT_FILE = 'result.json'
+SUMMARY_FILE = 'summary.csv'
+
+# objective metrics computed from run telemetry, in summary column order
+METRIC_NAMES = ('TIME_IN_C_DES',        # fraction of time control area is within C_DES
+                'MEAN_S_ERROR',         # mean |S_DES - S| (px)
+                'MEAN_TRACKING_ERROR',  # mean distance between estimated and true target positions (m)
+                'MAX_TRACKING_ERROR',   # max distance between estimated and true target positions (m)
+                'FINAL_ALTITUDE',       # Z_W at the end of the run
+                'WALL_TIME')            # run wall time (s)
+
+
+def grid_cells(values):
+    """Returns all combinations of parameter values
+
+    Args:
+        values (dict): Parameter name to list of values
+
+    Returns:
+        list: Cells, dicts of parameter name to value
+    """
+    return [dict(zip(SWEEP_PARAMS, combination))
+            for combination in itertools.product(*(values[name] for name in SWEEP_PARAMS))]
+
+
+def random_cells(values, num_cells, seed=0):
+    """Returns cells sampled uniformly within [min, max] of given parameter values.
+    Sampled values are rounded to 6 significant digits, so cells (and their folders) are
+    reproduced exactly from the same seed.
+
+    Args:
+        values (dict): Parameter name to list of values, single value keeps the parameter fixed
+        num_cells (int): Number of cells
+        seed (int, optional): Random generator seed. Defaults to 0.
+
+    Returns:
+        list: Cells, dicts of parameter name to value
+    """
+    rng = np.random.default_rng(seed)
+    samples = {name: rng.uniform(min(values[name]), max(values[name]), size=num_cells)
+               for name in SWEEP_PARAMS}
+    return [{name: float(f'{samples[name][i]:.6g}') for name in SWEEP_PARAMS} for i in range(num_cells)]
+
+
+def get_cell_name(cell):
+    """Returns folder name of a cell, for example 'k1_0.5_k2_0.1_kw_1_tf_30'"""
+    return '_'.join(f'{name}_{cell[name]:g}' for name in SWEEP_PARAMS)
+
+
+def load_result(run_folder):
+    """Returns stored result of a cell, None if the cell has not completed"""
+    try:
+        with open(os.path.join(run_folder, RESULT_FILE), 'r') as result_file:
+            return json.load(result_file)
+    except (OSError, ValueError):
+        return None
+
+
+def is_completed(run_folder):
+    result = load_result(run_folder)
+    return result is not None and result.get('status') == 'ok'
+
+
+def compute_metrics(data):
+    """Computes objective metrics of one run from its telemetry
+
+    Args:
+        data (np.recarray): Telemetry records (load_telemetry)
+
+    Returns:
+        dict: METRIC_NAMES (except WALL_TIME) to values, NaN when there is no data
+    """
+    metrics = {name: float('nan') for name in METRIC_NAMES if name != 'WALL_TIME'}
+    if len(data) == 0:
+        return metrics
+
+    metrics['TIME_IN_C_DES'] = float(np.mean(data['C'] <= data['C_DES']))
+    metrics['MEAN_S_ERROR'] = float(np.nanmean(np.abs(S_DES - data['S'])))
+
+    # line of sight (r, θ) estimated vs true, position error from law of cosines (θ logged in degrees)
+    errors = []
+    for target_num in (1, 2, 3):
+        r_est = data[f'T_{target_num}_R_EST']
+        r_true = data[f'T_{target_num}_TRUE_R']
+        d_theta = np.radians(data[f'T_{target_num}_THETA_EST'] - data[f'T_{target_num}_TRUE_THETA'])
+        errors.append(np.sqrt(np.maximum(r_est**2 + r_true**2 - 2*r_est*r_true*np.cos(d_theta), 0.0)))
+    errors = np.concatenate(errors)
+    errors = errors[np.isfinite(errors)]
+    if len(errors):
+        metrics['MEAN_TRACKING_ERROR'] = float(errors.mean())
+        metrics['MAX_TRACKING_ERROR'] = float(errors.max())
+
+    metrics['FINAL_ALTITUDE'] = float(data['Z_W'][-1])
+
+    return metrics
+
+
+def run_cell(cell, run_folder):
+    """Runs one headless experiment inside run_folder and stores its result.
+    Meant to run in a fresh worker process: working directory is changed and console output is
+    redirected into run.log for the lifetime of the process.
+
+    Args:
+        cell (dict): Parameter name to value
+        run_folder (str): Absolute path of the cell output folder
+
+    Returns:
+        dict: Result with cell, status and metrics
+    """
+    from .exp_manager import ExperimentManager
+
+    os.makedirs(run_folder, exist_ok=True)
+    os.chdir(run_folder)
+    result = {'cell': cell, 'status': 'failed'}
+    wall_start = time.perf_counter()
+
+    with open('run.log', 'w') as log_file, redirect_stdout(log_file), redirect_stderr(log_file):
+        try:
+            args = argparse.Namespace(norun=False, plot=False, batch=True, headless=True, **cell)
+            manager = ExperimentManager(save_on=False,
+                                        write_plot=True,
+                                        control_on=True,
+                                        tracker_on=True,
+                                        tracker_display_on=True,
+                                        use_true_kin=False,
+                                        use_real_clock=False,
+                                        draw_occlusion_bars=False,
+                                        headless=True,
+                                        args=args)
+            manager.run()
+            result['metrics'] = compute_metrics(load_telemetry(TELEMETRY_FILE))
+            result['status'] = 'ok'
+        except Exception:
+            traceback.print_exc()
+            result['error'] = traceback.format_exc(limit=1).strip().splitlines()[-1]
+
+    result.setdefault('metrics', {})['WALL_TIME'] = time.perf_counter() - wall_start
+    with open(RESULT_FILE, 'w') as result_file:
+        json.dump(result, result_file, indent=2)
+
+    return result
+
+
+class ParameterSweep:
+    """Runs sweep cells in a process pool, one fresh process and one output folder per cell.
+    """
+
+    def __init__(self, cells, out_folder, num_workers=None):
+        """
+        Args:
+            cells (list): Cells, dicts of parameter name to value
+            out_folder (str): Sweep output folder, cell folders are created inside
+            num_workers (int, optional): Number of concurrent runs. Defaults to None, os.cpu_count().
+        """
+        self.cells = cells
+        self.out_folder = os.path.abspath(out_folder)
+        self.num_workers = num_workers or os.cpu_count()
+
+    def get_run_folder(self, cell):
+        return os.path.join(self.out_folder, get_cell_name(cell))
+
+    def get_pending_cells(self):
+        """Returns cells without a successful result (not run, interrupted or failed)"""
+        return [cell for cell in self.cells if not is_completed(self.get_run_folder(cell))]
+
+    def run(self):
+        """Runs pending cells, reports progress as runs complete, then writes the summary table.
+        """
+        os.makedirs(self.out_folder, exist_ok=True)
+        pending = self.get_pending_cells()
+        print(f'{len(self.cells)} cells, {len(self.cells) - len(pending)} completed, {len(pending)} to run ' +
+              f'[{self.num_workers} process(es)]')
+
+        if pending:
+            # fresh process per run: pygame, OpenCV windows and module state are not shared between runs
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=min(self.num_workers, len(pending)),
+                                     mp_context=context,
+                                     max_tasks_per_child=1) as pool:
+                futures = {pool.submit(run_cell, cell, self.get_run_folder(cell)): cell for cell in pending}
+                for num_done, future in enumerate(as_completed(futures), start=1):
+                    cell = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as error:     # worker process died
+                        result = {'status': 'failed', 'error': repr(error), 'metrics': {}}
+                    print(f'[{num_done}/{len(pending)}] {get_cell_name(cell)} {result["status"]} ' +
+                          f'({result["metrics"].get("WALL_TIME", float("nan")):0.1f} s)' +
+                          (f' {result["error"]}' if result['status'] != 'ok' else ''))
+
+        self.write_summary()
+
+    def get_summary(self):
+        """Collects results of all cells
+
+        Returns:
+            list: Rows (dicts) with run name, status, parameters and metrics
+        """
+        rows = []
+        for cell in self.cells:
+            result = load_result(self.get_run_folder(cell)) or {'status': 'missing'}
+            metrics = result.get('metrics', {})
+            row = {'RUN': get_cell_name(cell), 'STATUS': result['status']}
+            row.update({name.upper(): cell[name] for name in SWEEP_PARAMS})
+            row.update({name: metrics.get(name, float('nan')) for name in METRIC_NAMES})
+            rows.append(row)
+        return rows
+
+    def write_summary(self):
+        """Writes summary.csv into the sweep folder and prints it as a table"""
+        rows = self.get_summary()
+        summary_path = os.path.join(self.out_folder, SUMMARY_FILE)
+        with open(summary_path, 'w', newline='') as summary_file:
+            writer = csv.DictWriter(summary_file, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+
+        print(format_summary(rows))
+        print(f'\nSummary written to {summary_path}')
+
+
+def format_summary(rows):
+    """Formats sweep summary as a table
+
+    Args:
+        rows (list): Rows from ParameterSweep.get_summary
+
+    Returns:
+        str: Table, one row per cell
+    """
+    names = [name for name in rows[0] if name != 'RUN']
+    lines = [' '.join(f'{name:>19}' for name in names)]
+    for row in rows:
+        lines.append(' '.join(f'{row[name]:>19}' if isinstance(row[name], str) else f'{row[name]:19.4f}'
+                              for name in names))
+    return '\n'.join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='exp_mot_sf_fin.sweep',
+                                     description='Parameter sweep over controller gains and final time')
+    for name in SWEEP_PARAMS:
+        parser.add_argument(f'--{name}',
+                            nargs='+',
+                            type=float,
+                            default=[SWEEP_DEFAULTS[name]],
+                            metavar='VALUE',
+                            help=f'{name} values (default: {SWEEP_DEFAULTS[name]:g} from settings)')
+    parser.add_argument('--random',
+                        type=int,
+                        default=0,
+                        metavar='N',
+                        help='sample N cells within [min, max] of given values instead of the grid')
+    parser.add_argument('--seed',
+                        type=int,
+                        default=0,
+                        help='random search seed')
+    parser.add_argument('--workers',
+                        type=int,
+                        default=os.cpu_count(),
+                        help='number of concurrent runs')
+    parser.add_argument('--out',
+                        default='./sim_outputs/sweep',
+                        help='sweep output folder')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    values = {name: getattr(args, name) for name in SWEEP_PARAMS}
+    if args.random > 0:
+        cells = random_cells(values, args.random, args.seed)
+    else:
+        cells = grid_cells(values)
+
+    sweep = ParameterSweep(cells, args.out, num_workers=args.workers)
+    sweep_start = time.perf_counter()
+    sweep.run()
+    print(f'Sweep finished in {time.perf_counter() - sweep_start:0.1f} s wall time')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
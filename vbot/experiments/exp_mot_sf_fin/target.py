@@ -6,7 +6,10 @@ from .optical_flow_config import MAX_NUM_CORNERS
 from .settings import (NO_OCC,
                       PARTIAL_OCC,
                       TOTAL_OCC,
-                      NONE_KINEMATICS)
+                      NONE_KINEMATICS,
+                      USE_PREDICTED_SEARCH,
+                      PREDICTED_SEARCH_SIGMAS,
+                      SEARCH_TARGET_HALF_SIZE)
 
 class Target:
     """Encapsulates necessary and sufficient attributes to define a visual object/target
@@ -30,11 +33,15 @@ class Target:
         self.feature_found_statuses = np.array([[1]]*MAX_NUM_CORNERS)
         self.cross_feature_errors_old = np.array([[0]]*MAX_NUM_CORNERS)
         self.cross_feature_errors_new = np.array([[0]]*MAX_NUM_CORNERS)
+        self.flow_output = None     # precomputed (batched) flow output, consumed by tracker
+        self.predicted_displacement = None  # EKF predicted image motion since old frame (px), None if not predicted
+        self.predicted_std = None           # standard deviations of EKF predicted image position (px)
         
         self.good_keypoints_new = None
         self.good_distances = None
         self.distances = None
-        self.matches = None
+        self.match_indices = None
+        self.described_keypoints = None
 
         self.occlusion_case_old = None
         self.occlusion_case_new = NO_OCC
@@ -46,11 +53,12 @@ class Target:
         self.centroid_adjustment = None
         self.initial_centroid = None
         self.initial_target_descriptors = None
+        self.descriptor_index = None
         self.initial_target_template_gray = None
         self.initial_target_template_color = None
         self.initial_patches_color = None
         self.initial_patches_gray = None
-        self.template_matchers = None
+        self.template_matcher = None
         self.patches_gray = None
         self.template_points = None
         self.template_scores = None
@@ -81,7 +89,7 @@ class Target:
 
         self.ID = manager.generate_target_id()
 
-        self.EKF = TargetEKF(self.manager, self)
+        self.EKF = TargetEKF(self.manager, self, bank=self.manager.multi_tracker.target_ekf_bank)
         self.update_true_bounding_box()
 
     def update_true_bounding_box(self):
@@ -100,6 +108,15 @@ class Target:
         self.bb_top_left_offset[1] = self.bounding_box[1] - self.sprite_obj.rect.centery
 
     def update_estimated_bounding_box(self):
+        if USE_PREDICTED_SEARCH and self.predicted_displacement is not None:
+            # centered at predicted centroid, enclosing the predicted position uncertainty ellipse widened by
+            # target extent, so windows shrink as the prediction gets certain
+            center = self.centroid_new.flatten() + self.predicted_displacement
+            d_x, d_y = np.ceil(SEARCH_TARGET_HALF_SIZE / self.manager.simulator.pxm_fac
+                               + PREDICTED_SEARCH_SIGMAS * self.predicted_std).astype(int)
+            self.bounding_box = (int(center[0]) - d_x, int(center[1]) - d_y, 2*d_x, 2*d_y)
+            return
+
         if self.occlusion_case_old == TOTAL_OCC:
             size = int(5 + self.EKF.cov_x.flatten()[0] / 0.13)
         else:
@@ -118,6 +135,12 @@ class Target:
 
 
     def update_measurements_and_estimations(self):
+        # filter this target alone, other targets keep their pending measurements for the bank step
+        self.update_measurements()
+        self.EKF.bank.step(targets=[self.EKF.index])
+        self.update_estimations()
+
+    def get_drone_inertial_state(self):
         # convert kinematics to inertial frame
         cam_origin_x, cam_origin_y = self.manager.get_cam_origin()
 
@@ -130,6 +153,13 @@ class Target:
         drone_speed = (drone_vel_x**2 + drone_vel_y**2)**0.5
         drone_alpha = atan2(drone_vel_y, drone_vel_x)
 
+        return drone_pos_x, drone_pos_y, drone_speed, drone_alpha
+
+    def update_measurements(self):
+        # measurements are added to the EKF bank, filtered for all targets at once in the next bank step
+        cam_origin_x, cam_origin_y = self.manager.get_cam_origin()
+        drone_pos_x, drone_pos_y, _, _ = self.get_drone_inertial_state()
+
         # target (measured)
         self.measured_pos_x, self.measured_pos_y = self.kinematics[0]
         # target_vel_x, target_vel_y = self.kinematics[1]
@@ -146,7 +176,13 @@ class Target:
             self.theta_meas = atan2(self.measured_pos_y - drone_pos_y, self.measured_pos_x - drone_pos_x)
 
         # use EKF to filter measurements self.measured_pos_x and self.measured_pos_y
-        self.EKF.add(self.measured_pos_x, self.measured_pos_y)
+        self.EKF.add_measurement(self.measured_pos_x, self.measured_pos_y)
+
+    def update_estimations(self):
+        # collect filtered state after the EKF bank step
+        drone_pos_x, drone_pos_y, drone_speed, drone_alpha = self.get_drone_inertial_state()
+
+        self.EKF.collect_estimations()
         self.x_est, self.vx_est, self.ax_est, self.y_est, self.vy_est, self.ay_est = self.EKF.get_estimated_state()
         
         self.beta_est = atan2(self.vy_est, self.vx_est)
@@ -1,31 +1,216 @@
 import numpy as np
-import numpy.linalg as LA
-from math import e, pow
+
+from .singer_model import get_singer_matrices
+
+class TargetEKFBank:
+    """Implement continuous-continuous EKF for many targets at once, in stateful fashion.
+    Each target contributes two filter channels (x and y), stacked as rows:
+    row 2*i filters target i position x component, row 2*i+1 its position y component.
+    All channels share dt and alpha_acc, so transition matrix and process noise are computed once per step
+    and all channels are predicted and corrected with batched matrix products.
+    """
+
+    def __init__(self, manager, alpha_acc=0.1, sigma_square_x=0.1, sigma_square_y=0.05):
+        """
+        Args:
+            manager (ExperimentManager): Experiment manager, provides simulation dt
+            alpha_acc (float, optional): Reciprocal of maneuver(acceleration) time constant. Defaults to 0.1.
+            sigma_square_x (float, optional): Process noise intensity of x channels. Defaults to 0.1.
+            sigma_square_y (float, optional): Process noise intensity of y channels. Defaults to 0.05.
+        """
+        self.manager = manager
+
+        self.alpha_acc = alpha_acc    # reciprocal of maneuver(acceleration) time constant. 1/60-lazy turn, 1/20-evasive,  1-atmospheric turbulence
+        self.sigma_square_x = sigma_square_x
+        self.sigma_square_y = sigma_square_y
+
+        self.R_measured = 1         # measurement noise when measurement is available
+        self.R_occluded = 10        # measurement noise when previous estimate stands in for measurement
+
+        self.num_targets = 0
+        self.state = np.zeros((0, 3))           # (2N, 3) [position, velocity, acceleration] per channel
+        self.P = np.zeros((0, 3, 3))            # (2N, 3, 3) covariance per channel
+        self.measurement = np.zeros(0)          # (2N,) NaN when measurement is not available
+        self.sigma_square = np.zeros(0)         # (2N,) process noise intensity per channel
+        self.initialized = np.zeros(0, dtype=bool)  # (N,)
+        self.pending = np.zeros(0, dtype=bool)      # (N,) measurement added, waiting for step
+
+    def add_target(self):
+        """Adds filter channels for a new target
+
+        Returns:
+            int: Index of the target in the bank
+        """
+        index = self.num_targets
+        self.num_targets += 1
+
+        self.state = np.concatenate((self.state, np.zeros((2, 3))))
+        self.P = np.concatenate((self.P, np.zeros((2, 3, 3))))
+        self.measurement = np.concatenate((self.measurement, np.full(2, np.nan)))
+        self.sigma_square = np.concatenate((self.sigma_square, [self.sigma_square_x, self.sigma_square_y]))
+        self.initialized = np.append(self.initialized, False)
+        self.pending = np.append(self.pending, False)
+
+        return index
+
+    def initialize_target(self, index, x, y, vx, vy):
+        """Initializes filter channels of a target. Meant to run only once at first.
+
+        Args:
+            index (int): Index of the target in the bank
+            x (float32): target position x component in inertial frame (m)
+            y (float32): target position y component in inertial frame (m)
+            vx (float32): target velocity vx component in inertial frame (m/s)
+            vy (float32): target velocity vy component in inertial frame (m/s)
+        """
+        self.state[2*index] = (x, vx, 0.0)
+        self.state[2*index + 1] = (y, vy, 0.0)
+        self.initialized[index] = True
+
+    def add_measurement(self, index, x, y):
+        """Stores measurement of a target, to be filtered in the next step
+
+        Args:
+            index (int): Index of the target in the bank
+            x (float32): target position x component in inertial frame (m), None if not available
+            y (float32): target position y component in inertial frame (m), None if not available
+        """
+        self.measurement[2*index] = np.nan if x is None else x
+        self.measurement[2*index + 1] = np.nan if y is None else y
+        self.pending[index] = True
+
+    def preprocess(self, dt):
+        """fetch transition matrix and process noise (cached per dt)"""
+        self.A, self.Q = get_singer_matrices(dt, self.alpha_acc)
+
+    @staticmethod
+    def get_rows(targets):
+        """Returns channel rows (x, y interleaved) of given target indices"""
+        return np.stack((2*targets, 2*targets + 1), axis=1).ravel()
+
+    def predict_rows(self, rows, dt=None):
+        """Predicts given channels one step ahead, does not modify the bank
+
+        Args:
+            rows (np.ndarray): Channel rows
+            dt (float, optional): Prediction horizon (s). Defaults to None (step prepared by preprocess).
+
+        Returns:
+            tuple(np.ndarray, np.ndarray): predicted state (len(rows), 3) and covariance (len(rows), 3, 3)
+        """
+        A, Q = (self.A, self.Q) if dt is None else get_singer_matrices(dt, self.alpha_acc)
+
+        state = self.state[rows]
+        state[:, 2] = 0.0       # acceleration estimate is not carried over into the next prediction
+
+        state_pre = state @ A.T
+        P_pre = A @ self.P[rows] @ A.T + self.sigma_square[rows, None, None] * Q
+
+        return state_pre, P_pre
+
+    def predict_motion(self, dt):
+        """Predicts motion of all targets dt ahead of their latest estimations, does not modify the bank
+
+        Args:
+            dt (float): Prediction horizon (s)
+
+        Returns:
+            tuple(np.ndarray, np.ndarray): predicted displacements (m) and standard deviations of predicted
+                positions (m), shape (N, 2) (x, y) in inertial frame
+        """
+        rows = np.arange(2 * self.num_targets)
+        state_pre, P_pre = self.predict_rows(rows, dt)
+
+        displacements = (state_pre[:, 0] - self.state[rows, 0]).reshape(-1, 2)
+        stds = np.sqrt(P_pre[:, 0, 0]).reshape(-1, 2)
+
+        return displacements, stds
+
+    def predict(self):
+        """Predicts all channels of initialized targets one step ahead, without correction.
+        Used between frames when tracker does not run every step.
+
+        Returns:
+            np.ndarray: Indices of targets that were predicted
+        """
+        predicted = np.flatnonzero(self.initialized)
+        if len(predicted) == 0:
+            return predicted
+
+        rows = self.get_rows(predicted)
+        self.preprocess(self.manager.get_sim_dt())
+        self.state[rows], self.P[rows] = self.predict_rows(rows)
+
+        return predicted
+
+    def step(self, targets=None):
+        """Predicts and corrects all channels of targets with pending measurements, in one batched pass.
+        Targets seen for the first time are expected to be initialized (initialize_target) instead.
+
+        Args:
+            targets (np.ndarray, optional): Indices of targets to step, others keep pending measurements.
+                Defaults to None (all targets).
+
+        Returns:
+            np.ndarray: Indices of targets that were filtered
+        """
+        selected = self.pending.copy()
+        if targets is not None:
+            selected &= np.isin(np.arange(self.num_targets), targets)
+        stepped = np.flatnonzero(selected & self.initialized)
+        self.pending[selected] = False
+        if len(stepped) == 0:
+            return stepped
+
+        rows = self.get_rows(stepped)
+        self.preprocess(self.manager.get_sim_dt())
+
+        # predict
+        state_pre, P_pre = self.predict_rows(rows)
+
+        # set R and measurement appropriate to occlusion state (previous estimate stands in when occluded)
+        measurement = self.measurement[rows]
+        occluded = np.isnan(measurement)
+        R = np.where(occluded, self.R_occluded, self.R_measured)
+        measurement = np.where(occluded, self.state[rows, 0], measurement)
+
+        # H = [1, 0, 0], so S = P_pre[0,0] + R and K = P_pre[:,0] / S
+        S = P_pre[:, 0, 0] + R
+        K = P_pre[:, :, 0] / S[:, None]
+
+        # correct
+        self.state[rows] = state_pre + K * (measurement - state_pre[:, 0])[:, None]
+        self.P[rows] = P_pre - K[:, :, None] * P_pre[:, None, 0, :]
+
+        return stepped
+
 
 class TargetEKF:
-    """Implement continuous-continuous EKF for target in stateful fashion
+    """Implement continuous-continuous EKF for target in stateful fashion.
+    Filtering of all targets sharing a bank is batched: measurements are added per target,
+    bank steps once, then each target collects its estimations.
     """
 
-    def __init__(self, manager, target=None):
+    def __init__(self, manager, target=None, bank=None):
+        """
+        Args:
+            manager (ExperimentManager): Experiment manager
+            target (Target, optional): Target being filtered. Defaults to None.
+            bank (TargetEKFBank, optional): Shared filter bank. Defaults to None, a private bank is used.
+        """
         self.manager = manager
         self.target = target
 
+        self.bank = bank if bank is not None else TargetEKFBank(manager)
+        self.index = self.bank.add_target()
+
         self.old_x = None
         self.old_y = None
         self.x = None
         self.y = None
 
-        self.H = np.array([[1.0, 0.0, 0.0]])
-
-        self.P_x = np.diag([0.0, 0.0, 0.0])
-        self.P_y = np.diag([0.0, 0.0, 0.0])
-
-        self.cov_x = np.array([[self.P_x[0,0]], [self.P_x[1,1]], [self.P_x[2,2]]])
-        self.cov_y = np.array([[self.P_y[0,0]], [self.P_y[1,1]], [self.P_y[2,2]]])
-        
-        self.alpha_acc = 0.1    # reciprocal of maneuver(acceleration) time constant. 1/60-lazy turn, 1/20-evasive,  1-atmospheric turbulence
-        self.sigma_square_x = 0.1 
-        self.sigma_square_y = 0.05
+        self.cov_x = np.zeros((3, 1))
+        self.cov_y = np.zeros((3, 1))
 
         self.filter_initialized_flag = False
         self.ready = False
@@ -47,17 +232,18 @@ class TargetEKF:
             vx (float32): target velocity vx component in inertial frame (m/s)
             vy (float32): target velocity vy component in inertial frame (m/s)
         """
+        self.bank.initialize_target(self.index, x, y, vx, vy)
         self.prev_x = x
         self.prev_y = y
         self.prev_vx = vx
         self.prev_vy = vy
         self.prev_ax = 0.0
         self.prev_ay = 0.0
-        
+
         self.filter_initialized_flag = True
 
-    def add(self, x, y):
-        """Add measurements and auxiliary data for filtering
+    def add_measurement(self, x, y):
+        """Add measurements for filtering in the next bank step. First call initializes the filter instead.
 
         Args:
             x (float32): target position x component in inertial frame (m)
@@ -76,11 +262,23 @@ class TargetEKF:
         # store measurement
         self.x = x
         self.y = y
+        self.bank.add_measurement(self.index, x, y)
 
-        # perform predictor and filter step
-        self.preprocess()
-        self.estimate_x()
-        self.estimate_y()
+    def collect_estimations(self):
+        """Collects estimations from the bank after it has stepped, remembers previous ones.
+        """
+        if not self.ready:
+            return
+
+        x_channel = 2 * self.index
+        y_channel = x_channel + 1
+        self.x, self.vx, self.ax = self.bank.state[x_channel].tolist()
+        self.y, self.vy, self.ay = self.bank.state[y_channel].tolist()
+
+        P_x = self.bank.P[x_channel]
+        P_y = self.bank.P[y_channel]
+        self.cov_x = np.array([[P_x[0,0]], [P_x[1,1]], [P_x[1,1]]])
+        self.cov_y = np.array([[P_y[0,0]], [P_y[1,1]], [P_y[1,1]]])
 
         # remember state estimations
         self.old_x = self.prev_x
@@ -90,99 +288,17 @@ class TargetEKF:
         self.prev_vx = self.vx
         self.prev_vy = self.vy
 
+    def add(self, x, y):
+        """Add measurements and auxiliary data for filtering, filter this target alone right away
 
-    def preprocess(self):
-        """pre compute transition matrix and process noise"""
-        # set variables for better numerical efficiency
-        dt = self.manager.get_sim_dt()
-        adt = self.alpha_acc * dt   # αΔt
-        adt2 = pow(adt, 2)
-        adt3 = pow(adt, 3)
-        a2 = pow(self.alpha_acc, 2)
-        a3 = pow(self.alpha_acc, 3)
-        a4 = pow(self.alpha_acc, 4)
-        eadt = pow(e, (-adt))
-        e2adt = pow(e, (-2*adt))
-
-        # transition matrix
-        self.A = np.array([[1.0, dt, (eadt + adt -1) / a2],
-                           [0.0, 1.0, (1 - eadt)/(self.alpha_acc)],
-                           [0.0, 0.0, eadt]])
-
-        self.q11 = (1 - e2adt + 2*adt + (2/3)*adt3 - 2*adt2 - 4*adt*eadt) / (a4)
-        self.q12 = (e2adt + 1 - 2*eadt + 2*adt*eadt - 2*adt + adt**2) / (a3)
-        self.q13 = (1 - e2adt - 2*adt*eadt) / (a2)
-        self.q22 = (4*eadt - 3 - e2adt + 2*adt) / (a2)
-        self.q23 = (e2adt + 1 -2*eadt) / (self.alpha_acc)
-        self.q33 = (1 - e2adt)
-
-        # process noise
-        self.Q = np.array([[self.q11, self.q12, self.q13],
-                           [self.q12, self.q22, self.q23],
-                           [self.q13, self.q23, self.q33]])
-
-
-    def estimate_x(self):
-        # set R and x appropriate to occlusion state
-        if self.x is None:
-            self.R_x = 10 #100
-            self.x_measured = self.prev_x
-        else:
-            self.R_x = 1 #1
-            self.x_measured = self.x
-
-        self.Q_x = self.sigma_square_x * self.Q
-        
-        # form state vector
-        state_est = np.array([[self.prev_x], [self.prev_vx], [self.prev_ax]])
-
-        # predict
-        state_est_pre = self.A @ state_est
-        P_pre = self.A @ self.P_x @ self.A.T + self.Q_x
-        S = self.H @ P_pre @ self.H.T + self.R_x
-        K = P_pre @ self.H.T @ LA.pinv(S)
-
-        # correct
-        state_est = state_est_pre + K @ (self.x_measured - self.H @ state_est_pre)
-        self.P_x = (np.eye(3) - K @ self.H) @ P_pre
-        self.cov_x = np.array([[self.P_x[0,0]], [self.P_x[1,1]], [self.P_x[1,1]]])
-
-        # extract estimations from state vector
-        self.x = state_est.flatten()[0]
-        self.vx = state_est.flatten()[1]
-        self.ax = state_est.flatten()[2]
-
-
-    def estimate_y(self):
-        # set R and y appropriate to occlusion state
-        if self.y is None:
-            self.R_y = 10 #1000
-            self.y_measured = self.prev_y
-        else:
-            self.R_y = 1 #10
-            self.y_measured = self.y
-
-        self.Q_y = self.sigma_square_y * self.Q
-
-        # form state vector
-        state_est = np.array([[self.prev_y], [self.prev_vy], [self.prev_ay]])
-
-        # predict
-        state_est_pre = self.A @ state_est
-        P_pre = self.A @ self.P_y @ self.A.T + self.Q_y
-        S = self.H @ P_pre @ self.H.T + self.R_y
-        K = P_pre @ self.H.T @ LA.pinv(S)
-
-        # correct
-        state_est = state_est_pre + K @ (self.y_measured - self.H @ state_est_pre)
-        self.P_y = (np.eye(3) - K @ self.H) @ P_pre
-        self.cov_y = np.array([[self.P_y[0,0]], [self.P_y[1,1]], [self.P_y[1,1]]])
-
-        # extract estimations from state vector
-        self.y = state_est.flatten()[0]
-        self.vy = state_est.flatten()[1]
-        self.ay = state_est.flatten()[2]
-        
+        Args:
+            x (float32): target position x component in inertial frame (m)
+            y (float32): target position y component in inertial frame (m)
+        """
+        self.add_measurement(x, y)
+        if self.ready:
+            self.bank.step(targets=[self.index])
+            self.collect_estimations()
 
     def get_estimated_state(self):
         """return estimated state information.
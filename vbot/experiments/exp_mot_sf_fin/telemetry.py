@@ -0,0 +1,177 @@
+import os
+
+import numpy as np
+
+
+def _focal_point_columns(fp_num):
+    return [f'FP_{fp_num}_{name}' for name in ('X', 'Y', 'VX', 'VY', 'AX', 'AY', 'R', 'THETA',
+                                               'V_R', 'V_THETA', 'SPEED', 'HEADING', 'ACC', 'DELTA')]
+
+
+def _target_columns(target_num):
+    return [f'T_{target_num}_{name}' for name in ('OCCLUSION_CASE', 'X_MEAS', 'Y_MEAS', 'R_MEAS', 'THETA_MEAS',
+                                                  'X_EST', 'Y_EST', 'VX_EST', 'VY_EST', 'AX_EST', 'AY_EST',
+                                                  'R_EST', 'THETA_EST', 'V_R_EST', 'V_THETA_EST', 'SPEED_EST',
+                                                  'BETA_EST', 'ACC_EST', 'DELTA_EST',
+                                                  'TRUE_R', 'TRUE_THETA', 'TRUE_V_R', 'TRUE_V_THETA')]
+
+
+# telemetry schema, shared by writer and readers (same column order as plot_info.csv)
+TELEMETRY_COLUMNS = (
+    ['TIME'] +
+    _focal_point_columns(1) +           # controller data  0-13
+    _focal_point_columns(2) +           # controller data 14-27
+    ['Y_1', 'Y_2', 'A_LAT', 'A_LNG',    # controller data 28-41
+     'S', 'C', 'Z_W', 'S_DOT', 'C_DOT', 'Z_W_DOT',
+     'AZ_S', 'AZ_C', 'AZ_Z', 'AZ'] +
+    _target_columns(1) +                # tracker data  0-22
+    _target_columns(2) +                # tracker data 23-45
+    _target_columns(3) +                # tracker data 46-68
+    ['DRONE_POS_X', 'DRONE_POS_Y', 'DRONE_VEL_X', 'DRONE_VEL_Y',
+     'CAM_ORIGIN_X', 'CAM_ORIGIN_Y', 'DRONE_POS_X_W', 'DRONE_POS_Y_W',
+     'DRONE_SPEED', 'DRONE_ALPHA'] +
+    ['C_DES', 'SCZ_IND',                # controller data 42-47
+     'ELLIPSE_MAJOR', 'ELLIPSE_MINOR', 'ELLIPSE_ROT_ANG', 'A_LAT_LONG_DENOM']
+)
+TELEMETRY_COLUMNS = tuple(TELEMETRY_COLUMNS)
+NUM_TELEMETRY_COLUMNS = len(TELEMETRY_COLUMNS)
+COLUMN_INDEX = {name: i for i, name in enumerate(TELEMETRY_COLUMNS)}
+TELEMETRY_DTYPE = np.dtype([(name, '<f8') for name in TELEMETRY_COLUMNS])
+
+# angles are logged in radians and stored in degrees, converted once per block
+DEGREE_COLUMNS = tuple(
+    [f'FP_{i}_{name}' for i in (1, 2) for name in ('THETA', 'HEADING')] +
+    [f'T_{i}_{name}' for i in (1, 2, 3) for name in ('THETA_MEAS', 'THETA_EST', 'BETA_EST', 'TRUE_THETA')] +
+    ['DRONE_ALPHA']
+)
+DEGREE_COLUMN_INDICES = np.array([COLUMN_INDEX[name] for name in DEGREE_COLUMNS])
+
+
+class TelemetryLog:
+    """Telemetry sink. Rows are filled in place in a preallocated block (one float64 per column),
+    the block is flushed to a binary file of raw TELEMETRY_DTYPE records once full.
+    No text formatting happens while logging; CSV can be exported on demand.
+    """
+
+    def __init__(self, path, block_size=1024):
+        """
+        Args:
+            path (str): Binary telemetry file to be written (overwritten if exists)
+            block_size (int, optional): Number of rows kept in memory before flushing. Defaults to 1024.
+        """
+        self.path = path
+        self.block_size = block_size
+        self.rows_written = 0
+
+        self._block = np.full((block_size, NUM_TELEMETRY_COLUMNS), np.nan, dtype=np.float64)
+        self._num_rows = 0
+        self._file = open(path, 'wb')
+
+    def new_row(self):
+        """Returns next row of the block, to be filled in place (angles in radians).
+        Row is initialized with NaN, None values assigned to it are stored as NaN.
+
+        Returns:
+            np.ndarray: Row view of shape (NUM_TELEMETRY_COLUMNS,)
+        """
+        if self._num_rows == self.block_size:
+            self.flush()
+        row = self._block[self._num_rows]
+        self._num_rows += 1
+        return row
+
+    def flush(self):
+        """Converts angle columns of the rows logged so far and appends them to the file.
+        """
+        if self._num_rows == 0:
+            return
+        rows = self._block[:self._num_rows]
+        rows[:, DEGREE_COLUMN_INDICES] = np.degrees(rows[:, DEGREE_COLUMN_INDICES])
+        rows.tofile(self._file)
+        self._file.flush()
+
+        self.rows_written += self._num_rows
+        self._num_rows = 0
+        self._block.fill(np.nan)
+
+    def close(self):
+        """Flushes remaining rows and closes the file.
+        """
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+    def export_csv(self, csv_path):
+        """Writes all flushed rows into a CSV file, with header (same layout as plot_info.csv).
+
+        Args:
+            csv_path (str): CSV file path
+        """
+        export_telemetry_csv(load_telemetry(self.path), csv_path)
+
+
+def load_telemetry(path):
+    """Loads a binary telemetry file in one call.
+
+    Args:
+        path (str): Binary telemetry file written by TelemetryLog
+
+    Returns:
+        np.recarray: Record array, columns addressable by name, for example data['TIME'] or data.TIME
+    """
+    return np.fromfile(path, dtype=TELEMETRY_DTYPE).view(np.recarray)
+
+
+def export_telemetry_csv(data, csv_path):
+    """Writes telemetry records into a CSV file, with header.
+
+    Args:
+        data (np.ndarray): Telemetry records (TELEMETRY_DTYPE)
+        csv_path (str): CSV file path
+    """
+    table = data.view(np.float64).reshape(-1, NUM_TELEMETRY_COLUMNS)
+    np.savetxt(csv_path, table, fmt='%.17g', delimiter=',', header=','.join(TELEMETRY_COLUMNS), comments='')
+
+
+def load_plot_info(csv_path, use_cache=True):
+    """Loads a plot_info CSV file (header + float rows) in one vectorized call.
+    Parsed records are cached in a binary sidecar next to the CSV file ('<name>_cache.npz'),
+    which is reused as long as the CSV file size and modification time are unchanged.
+
+    Args:
+        csv_path (str): CSV file path
+        use_cache (bool, optional): Read and write the binary sidecar. Defaults to True.
+
+    Returns:
+        np.recarray: Record array, columns addressable by header names, for example data['TIME'] or data.TIME
+    """
+    cache_path = f'{os.path.splitext(csv_path)[0]}_cache.npz'
+    csv_stat = os.stat(csv_path)
+    signature = np.array([csv_stat.st_size, csv_stat.st_mtime_ns], dtype=np.int64)
+
+    if use_cache and os.path.isfile(cache_path):
+        try:
+            with np.load(cache_path) as cache:
+                if np.array_equal(cache['signature'], signature):
+                    return cache['data'].view(np.recarray)
+        except (OSError, ValueError, KeyError):
+            pass    # unreadable sidecar, parse the CSV again
+
+    with open(csv_path, 'r') as csv_file:
+        names = [name.strip() for name in csv_file.readline().split(',')]
+    dtype = np.dtype([(name, '<f8') for name in names])
+
+    table = np.loadtxt(csv_path, dtype=np.float64, delimiter=',', skiprows=1, ndmin=2)
+    if table.size == 0:
+        data = np.empty(0, dtype=dtype)
+    else:
+        data = np.ascontiguousarray(table).view(dtype).reshape(-1)
+
+    if use_cache:
+        try:
+            np.savez(cache_path, data=data, signature=signature)
+        except OSError:
+            pass    # caching is optional, e.g. read-only folder
+
+    return data.view(np.recarray)